@@ -11,38 +11,35 @@ Version: 1.0.0
 __version__ = "1.0.0"
 __author__ = "Apple Ad Performance Dashboard Team"
 
-# Core ETL modules (only import what exists)
-from .data_generator import DataGenerator, DataGenerationConfig
-
-# Utility functions
-try:
-    from .utils import (
-        setup_logging,
-        get_database_connection,
-        validate_data_quality,
-        calculate_etl_metrics
-    )
-except ImportError:
-    # utils module doesn't exist yet, define minimal functions
-    def setup_logging(level="INFO"):
-        import logging
-        logging.basicConfig(level=getattr(logging, level.upper()))
-        return logging.getLogger()
-    
-    def get_database_connection():
-        import psycopg2
-        import os
-        return psycopg2.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            port=int(os.getenv('DB_PORT', '5432')),
-            database=os.getenv('DB_NAME', 'ad_dashboard'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD')
-        )
+# Public names are resolved lazily on first access (PEP 562) so that importing
+# the package, or a light submodule, does not pay for pandas, NumPy, Faker or
+# psycopg2 until they are actually used.
+_LAZY_EXPORTS = {
+    'DataGenerator': 'data_generator',
+    'DataGenerationConfig': 'data_generator',
+    'setup_logging': 'utils',
+    'get_database_connection': 'utils',
+    'validate_data_quality': 'utils',
+    'calculate_etl_metrics': 'utils',
+}
 
 __all__ = [
     'DataGenerator',
     'DataGenerationConfig',
     'setup_logging',
     'get_database_connection'
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        module = importlib.import_module(f".{_LAZY_EXPORTS[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value  # Cache so __getattr__ is only hit once
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -0,0 +1,274 @@
+"""
+A/B test statistics for agg_ab_test_results
+
+The fact_ad_performance rows tagged with an ab_test_id are summed per test and
+variant. Each non-control variant is then compared with its test's control
+(the 'Control' variant, or else the first variant by name) on three metrics:
+
+- CTR (clicks / impressions) and CVR (conversions / clicks) use z-tests on the
+  ratio of sums, with delta-method variances computed over the ad cells
+  (campaign x geo x day). Variants are assigned per cell, and rates vary
+  between cells far more than binomial noise, so the cells rather than the
+  impressions are the independent units; a pooled two-proportion test would
+  overstate significance.
+- Revenue per click uses a percentile bootstrap over the same cells, which
+  are resampled with Poisson(1) weights.
+
+Every test and variant is evaluated in the same array expressions. The
+bootstrap draws a resamples x rows weight matrix in bounded blocks and
+reduces it to per-variant sums with np.add.reduceat, so the cost does not grow
+with the number of tests.
+
+A load batch can hold only part of a test's rows, so the warehouse table is not
+loaded from the batch's file. After a load, refresh_ab_test_results reads every
+warehouse row of the tests the batch touched, recomputes their results and
+replaces them in one transaction.
+"""
+
+import logging
+import math
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+from .compression import data_file, open_csv, output_file
+
+logger = logging.getLogger(__name__)
+
+AB_TEST_TABLE = 'agg_ab_test_results'
+AB_TEST_COLUMNS = [
+    'ab_test_id', 'metric', 'control_variant', 'treatment_variant',
+    'control_value', 'treatment_value', 'absolute_lift', 'relative_lift',
+    'ci_lower', 'ci_upper', 'z_score', 'p_value', 'confidence_level', 'is_significant',
+    'control_sample', 'treatment_sample', 'test_method',
+]
+CONTROL_VARIANT = 'Control'
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 2_000
+BOOTSTRAP_BLOCK_CELLS = 4_000_000  # Weight matrix entries drawn at a time
+
+_AB_COLUMNS = ['ab_test_id', 'ab_test_variant', 'impressions', 'clicks',
+               'attributed_conversions', 'attributed_revenue']
+
+AB_TEST_ROWS_SQL = """
+SELECT {columns}
+FROM {schema}.fact_ad_performance
+WHERE ab_test_id IS NOT NULL AND ab_test_variant IS NOT NULL{test_filter}
+"""
+DELETE_AB_TESTS_SQL = "DELETE FROM {schema}.agg_ab_test_results{where_clause}"
+INSERT_AB_TESTS_SQL = "INSERT INTO {schema}.agg_ab_test_results ({columns}) VALUES ({values})"
+# Poisson(1) quantiles at 2**16 evenly spaced probabilities: a 16-bit uniform
+# indexes a weight, several times faster than Generator.poisson
+_POISSON_CDF = np.cumsum([math.exp(-1) / math.factorial(k) for k in range(16)])
+_POISSON_WEIGHTS = np.searchsorted(_POISSON_CDF, (np.arange(2 ** 16) + 0.5) / 2 ** 16).astype(float)
+
+
+def variant_totals(ad_performance: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Test rows sorted by (test, control first, variant) and their per-variant totals"""
+    rows = ad_performance.loc[
+        ad_performance['ab_test_id'].notna() & ad_performance['ab_test_variant'].notna(), _AB_COLUMNS
+    ]
+    test = rows['ab_test_id'].to_numpy(dtype=object)
+    variant = rows['ab_test_variant'].to_numpy(dtype=object)
+    order = np.lexsort((variant.astype(str), variant != CONTROL_VARIANT, test.astype(str)))
+    rows = rows.iloc[order].reset_index(drop=True)
+
+    totals = rows.groupby(['ab_test_id', 'ab_test_variant'], sort=False).agg(
+        impressions=('impressions', 'sum'),
+        clicks=('clicks', 'sum'),
+        conversions=('attributed_conversions', 'sum'),
+        revenue=('attributed_revenue', 'sum'),
+        cells=('impressions', 'size'),
+    ).reset_index()
+    return rows, totals
+
+
+def ratio_tests(numerator: np.ndarray, denominator: np.ndarray, group_starts: np.ndarray,
+                control: np.ndarray, treatment: np.ndarray,
+                confidence: float = DEFAULT_CONFIDENCE) -> pd.DataFrame:
+    """Two-sided z-tests of sum(numerator) / sum(denominator) per contiguous row group, treatment vs control.
+
+    Each group's variance is the delta-method (linearized) variance of its
+    ratio with rows as the independent units:
+    n / (n - 1) * sum((y - R x)^2) / sum(x)^2.
+    """
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    rows = np.diff(np.r_[group_starts, len(numerator)])
+    totals = np.add.reduceat(denominator, group_starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.add.reduceat(numerator, group_starts) / totals
+        residuals = numerator - np.repeat(ratio, rows) * denominator
+        variance = rows / (rows - 1) * np.add.reduceat(residuals ** 2, group_starts) / totals ** 2
+        diff = ratio[treatment] - ratio[control]
+        se = np.sqrt(variance[treatment] + variance[control])
+        z = np.where(se > 0, diff / se, 0.0)
+
+    critical = ndtri(0.5 + confidence / 2)
+    return pd.DataFrame({
+        'control_value': ratio[control],
+        'treatment_value': ratio[treatment],
+        'absolute_lift': diff,
+        'ci_lower': diff - critical * se,
+        'ci_upper': diff + critical * se,
+        'z_score': z,
+        'p_value': 2 * ndtr(-np.abs(z)),
+    })
+
+
+def bootstrap_ratios(numerator: np.ndarray, denominator: np.ndarray, group_starts: np.ndarray,
+                     n_resamples: int = DEFAULT_RESAMPLES,
+                     rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Resamples x groups matrix of sum(numerator) / sum(denominator) per contiguous row group.
+
+    Rows are reweighted with Poisson(1) counts (the large-sample equivalent of
+    resampling each group with replacement); blocks of resamples are drawn so
+    the weight matrix stays under BOOTSTRAP_BLOCK_CELLS entries.
+    """
+    rng = rng or np.random.default_rng()
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    ratios = np.empty((n_resamples, len(group_starts)))
+    block = max(1, BOOTSTRAP_BLOCK_CELLS // max(len(numerator), 1))
+
+    for start in range(0, n_resamples, block):
+        draws = rng.integers(0, 2 ** 16, size=(min(block, n_resamples - start), len(numerator)),
+                             dtype=np.uint16)
+        weights = _POISSON_WEIGHTS[draws]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios[start:start + len(weights)] = (
+                np.add.reduceat(weights * numerator, group_starts, axis=1)
+                / np.add.reduceat(weights * denominator, group_starts, axis=1)
+            )
+    return ratios
+
+
+def ab_test_results(ad_performance: pd.DataFrame, confidence: float = DEFAULT_CONFIDENCE,
+                    n_resamples: int = DEFAULT_RESAMPLES, seed: int = 0) -> pd.DataFrame:
+    """Treatment-vs-control lift, confidence interval and p-value per test, metric and variant"""
+    rows, totals = variant_totals(ad_performance)
+    if totals.empty:
+        return pd.DataFrame(columns=AB_TEST_COLUMNS)
+
+    # Each variant's control is the first variant of its test
+    test_code, _ = pd.factorize(totals['ab_test_id'])
+    group_starts = np.r_[0, np.cumsum(totals['cells'].to_numpy())[:-1]]
+    control = np.r_[0, np.flatnonzero(np.diff(test_code)) + 1][test_code]
+    treatment = np.flatnonzero(np.arange(len(totals)) != control)
+    control = control[treatment]
+
+    def column(name, positions):
+        return totals[name].to_numpy()[positions]
+
+    def frame(metric, stats, sample, method):
+        return stats.assign(
+            ab_test_id=column('ab_test_id', treatment),
+            metric=metric,
+            control_variant=column('ab_test_variant', control),
+            treatment_variant=column('ab_test_variant', treatment),
+            control_sample=column(sample, control),
+            treatment_sample=column(sample, treatment),
+            test_method=method,
+        )
+
+    ctr = ratio_tests(rows['clicks'].to_numpy(), rows['impressions'].to_numpy(),
+                      group_starts, control, treatment, confidence)
+    cvr = ratio_tests(rows['attributed_conversions'].to_numpy(), rows['clicks'].to_numpy(),
+                      group_starts, control, treatment, confidence)
+
+    # Revenue per click: bootstrap every variant at once, then difference the columns
+    samples = bootstrap_ratios(rows['attributed_revenue'].to_numpy(), rows['clicks'].to_numpy(),
+                               group_starts, n_resamples, np.random.default_rng(seed))
+    diffs = samples[:, treatment] - samples[:, control]
+    point = totals['revenue'].to_numpy() / totals['clicks'].to_numpy()
+    alpha = 1 - confidence
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = np.nanstd(diffs, axis=0, ddof=1)
+        absolute_lift = point[treatment] - point[control]
+        rpc = pd.DataFrame({
+            'control_value': point[control],
+            'treatment_value': point[treatment],
+            'absolute_lift': absolute_lift,
+            'ci_lower': np.nanquantile(diffs, alpha / 2, axis=0),
+            'ci_upper': np.nanquantile(diffs, 1 - alpha / 2, axis=0),
+            'z_score': np.where(spread > 0, absolute_lift / spread, 0.0),
+            'p_value': np.minimum(1.0, 2 * np.minimum(np.nanmean(diffs <= 0, axis=0),
+                                                      np.nanmean(diffs >= 0, axis=0))),
+        })
+
+    results = pd.concat([
+        frame('ctr', ctr, 'impressions', 'delta_method'),
+        frame('cvr', cvr, 'clicks', 'delta_method'),
+        frame('revenue_per_click', rpc, 'clicks', 'bootstrap'),
+    ], ignore_index=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results['relative_lift'] = results['absolute_lift'] / results['control_value']
+    results['confidence_level'] = confidence
+    results['is_significant'] = results['p_value'] < alpha
+
+    significant = results.groupby('metric')['is_significant'].sum()
+    logger.info(f"Compared {len(treatment):,} variants across {test_code.max() + 1:,} tests; "
+                f"significant: {', '.join(f'{m} {n}' for m, n in significant.items())}")
+    return results.round(6).replace([np.inf, -np.inf], np.nan)[AB_TEST_COLUMNS]
+
+
+def ab_test_files(raw_path: str, confidence: float = DEFAULT_CONFIDENCE,
+                  n_resamples: int = DEFAULT_RESAMPLES, seed: int = 0,
+                  chunksize: int = 1_000_000, compression: Optional[str] = None) -> pd.DataFrame:
+    """Build agg_ab_test_results.csv from fact_ad_performance.csv, keeping only test rows in memory"""
+    with pd.read_csv(data_file(raw_path, 'fact_ad_performance'), usecols=_AB_COLUMNS,
+                     chunksize=chunksize) as reader:
+        ad_performance = pd.concat([chunk[chunk['ab_test_id'].notna()] for chunk in reader],
+                                   ignore_index=True)
+
+    results = ab_test_results(ad_performance, confidence, n_resamples, seed)
+    filename = output_file(raw_path, AB_TEST_TABLE, compression)
+    with open_csv(filename) as f:
+        results.to_csv(f, index=False)
+    logger.info(f"💾 Saved {len(results):,} rows to {filename}")
+    return results
+
+
+def refresh_ab_test_results(conn, ab_test_ids: Optional[Iterable[str]] = None, schema: str = "ad_dashboard",
+                            confidence: float = DEFAULT_CONFIDENCE, n_resamples: int = DEFAULT_RESAMPLES,
+                            seed: int = 0) -> int:
+    """Recompute agg_ab_test_results for the given tests from every warehouse row, in one transaction.
+
+    Passing no tests rebuilds every test. Returns the number of result rows written.
+    """
+    params = {}
+    test_filter = ""
+    if ab_test_ids is not None:
+        params['ab_test_ids'] = sorted(str(test_id) for test_id in ab_test_ids)
+        if not params['ab_test_ids']:
+            logger.info("No affected A/B tests, skipping A/B test refresh")
+            return 0
+        test_filter = " AND ab_test_id = ANY(%(ab_test_ids)s)"
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(AB_TEST_ROWS_SQL.format(columns=', '.join(_AB_COLUMNS), schema=schema,
+                                                   test_filter=test_filter), params)
+            ad_performance = pd.DataFrame(cursor.fetchall(), columns=_AB_COLUMNS)
+            for column in _AB_COLUMNS[2:]:
+                ad_performance[column] = pd.to_numeric(ad_performance[column])
+            results = ab_test_results(ad_performance, confidence, n_resamples, seed)
+
+            where_clause = " WHERE ab_test_id = ANY(%(ab_test_ids)s)" if test_filter else ""
+            cursor.execute(DELETE_AB_TESTS_SQL.format(schema=schema, where_clause=where_clause), params)
+            if len(results):
+                rows = results.astype(object).where(results.notna(), None).to_numpy().tolist()
+                cursor.executemany(INSERT_AB_TESTS_SQL.format(
+                    schema=schema, columns=', '.join(AB_TEST_COLUMNS),
+                    values=', '.join(['%s'] * len(AB_TEST_COLUMNS))), rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    scope = f"{len(params['ab_test_ids'])} tests" if test_filter else "all tests"
+    logger.info(f"🔁 Refreshed {len(results):,} A/B test result rows ({scope})")
+    return len(results)
@@ -0,0 +1,164 @@
+"""
+Pre-aggregated summary tables for the dashboard
+
+The heaviest dashboard views re-aggregate fact_ad_performance by date, campaign,
+geo and platform at query time. Since the generator already holds the facts in
+memory, the rollups are built here with vectorized group-bys and written and
+loaded alongside the fact tables, so Tableau reads thousands of rows instead of
+scanning millions.
+
+agg_monthly_campaign is written like the others but not loaded from the batch:
+a batch can cover part of a month, so the warehouse's monthly rows are
+recomputed from fact_ad_performance after each load (etl.refresh).
+"""
+
+import logging
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Additive metrics: fact column -> summary column
+METRIC_COLUMNS = {
+    'impressions': 'total_impressions',
+    'clicks': 'total_clicks',
+    'spend': 'total_spend',
+    'attributed_conversions': 'total_conversions',
+    'attributed_revenue': 'total_revenue',
+}
+
+# Load order for the summary tables (after all facts)
+SUMMARY_TABLES = [
+    'agg_daily_campaign_country',
+    'agg_monthly_campaign',
+    'agg_daily_platform',
+]
+
+# Summary tables recomputed in the warehouse after a load instead of loaded from files
+REFRESHED_SUMMARY_TABLES = ['agg_monthly_campaign']
+
+
+def build_summary_tables(dimensions: Dict[str, pd.DataFrame],
+                         facts: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """Build all summary tables from generated dimension and fact frames"""
+    ad_perf = facts['fact_ad_performance']
+    logger.info(f"Building summary tables from {len(ad_perf):,} ad performance rows...")
+
+    base = _prepare_base(ad_perf, dimensions['dim_geo'], dimensions['dim_campaign'])
+
+    summaries = {
+        'agg_daily_campaign_country': _daily_campaign_country(base),
+        'agg_monthly_campaign': _monthly_campaign(base),
+        'agg_daily_platform': _daily_platform(base),
+    }
+
+    for name, df in summaries.items():
+        logger.info(f"   {name}: {len(df):,} rows")
+
+    return summaries
+
+
+def build_summary_tables_from_store(dimensions: Dict[str, pd.DataFrame],
+                                    store) -> Dict[str, pd.DataFrame]:
+    """Build all summary tables by scanning a ColumnarStore month by month.
+
+    Every rollup groups by day or month, so partitions aggregate independently
+    and only the needed ad performance columns are read.
+    """
+    columns = ['date_key', 'campaign_key', 'geo_key'] + list(METRIC_COLUMNS)
+    logger.info(f"Building summary tables from {store.row_count('fact_ad_performance'):,} stored rows...")
+
+    parts = {name: [] for name in SUMMARY_TABLES}
+    for _, data in store.scan('fact_ad_performance', columns):
+        base = _prepare_base(pd.DataFrame(data), dimensions['dim_geo'], dimensions['dim_campaign'])
+        parts['agg_daily_campaign_country'].append(_daily_campaign_country(base))
+        parts['agg_monthly_campaign'].append(_monthly_campaign(base))
+        parts['agg_daily_platform'].append(_daily_platform(base))
+
+    summaries = {name: pd.concat(frames, ignore_index=True) for name, frames in parts.items() if frames}
+
+    for name, df in summaries.items():
+        logger.info(f"   {name}: {len(df):,} rows")
+
+    return summaries
+
+
+def _prepare_base(ad_perf: pd.DataFrame, geo_df: pd.DataFrame,
+                  campaign_df: pd.DataFrame) -> pd.DataFrame:
+    """Attach the grouping attributes needed by the rollups to the fact rows"""
+    geo = geo_df.set_index('geo_key')
+    campaigns = campaign_df.set_index('campaign_key')
+
+    base = ad_perf[['date_key', 'campaign_key', 'geo_key'] + list(METRIC_COLUMNS)].rename(
+        columns=METRIC_COLUMNS
+    )
+    base['country'] = base['geo_key'].map(geo['country'])
+    base['country_code'] = base['geo_key'].map(geo['country_code'])
+    base['platform'] = base['campaign_key'].map(campaigns['platform'])
+
+    date_key = base['date_key'].to_numpy()
+    base['year'] = date_key // 10000
+    base['month'] = date_key // 100 % 100
+
+    return base
+
+
+def _daily_campaign_country(base: pd.DataFrame) -> pd.DataFrame:
+    """Daily x campaign x country rollup"""
+    keys = ['date_key', 'campaign_key', 'country', 'country_code']
+    summary = base.groupby(keys, sort=True, observed=True).agg(
+        **_metric_aggs(),
+        record_count=('date_key', 'size'),
+    ).reset_index()
+    return _add_kpis(summary)
+
+
+def _monthly_campaign(base: pd.DataFrame) -> pd.DataFrame:
+    """Monthly x campaign rollup"""
+    keys = ['year', 'month', 'campaign_key']
+    summary = base.groupby(keys, sort=True, observed=True).agg(
+        **_metric_aggs(),
+        active_days=('date_key', 'nunique'),
+        unique_geos=('geo_key', 'nunique'),
+        record_count=('date_key', 'size'),
+    ).reset_index()
+    return _add_kpis(summary)
+
+
+def _daily_platform(base: pd.DataFrame) -> pd.DataFrame:
+    """Date x platform rollup"""
+    keys = ['date_key', 'platform']
+    summary = base.groupby(keys, sort=True, observed=True).agg(
+        **_metric_aggs(),
+        active_campaigns=('campaign_key', 'nunique'),
+        record_count=('date_key', 'size'),
+    ).reset_index()
+    return _add_kpis(summary)
+
+
+def _metric_aggs() -> Dict[str, tuple]:
+    """Named aggregations summing every additive metric"""
+    return {column: (column, 'sum') for column in METRIC_COLUMNS.values()}
+
+
+def _add_kpis(summary: pd.DataFrame) -> pd.DataFrame:
+    """Derive ratio KPIs from summed metrics (same rules as the dashboard views)"""
+    summary['total_spend'] = summary['total_spend'].round(2)
+    summary['total_revenue'] = summary['total_revenue'].round(2)
+
+    summary['ctr_percent'] = _safe_ratio(summary['total_clicks'], summary['total_impressions'], 100, 4)
+    summary['avg_cpc'] = _safe_ratio(summary['total_spend'], summary['total_clicks'], 1, 2)
+    summary['avg_cpa'] = _safe_ratio(summary['total_spend'], summary['total_conversions'], 1, 2)
+    summary['roas'] = _safe_ratio(summary['total_revenue'], summary['total_spend'], 1, 2)
+    return summary
+
+
+def _safe_ratio(numerator: pd.Series, denominator: pd.Series,
+                scale: float, decimals: int) -> np.ndarray:
+    """Vectorized ratio that yields 0 where the denominator is 0"""
+    num = numerator.to_numpy(dtype=float)
+    den = denominator.to_numpy(dtype=float)
+    ratio = np.divide(num * scale, den, out=np.zeros_like(num), where=den > 0)
+    return np.round(ratio, decimals)
@@ -0,0 +1,133 @@
+"""
+Seeded attribute provider for dimension generation
+
+Faker's provider dispatch is slow and cannot be vectorized, so Faker is only
+used once to build small pools of city and region names. Rows then sample
+indices into those pools with NumPy. Keys, hashed ids and dates are drawn as
+whole arrays from the same seeded generator, so dimensions are reproducible
+from `seed` and generation runs in array time.
+"""
+
+import json
+import logging
+import os
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 1000
+
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype='S1')
+
+# Character positions of the 32 hex digits within a 36-character UUID string
+_UUID_HEX_POSITIONS = np.array(
+    [i for i in range(36) if i not in (8, 13, 18, 23)]
+)
+
+
+class AttributeProvider:
+    """Vectorized, seeded source of dimension attributes"""
+
+    def __init__(self, seed: int, pool_size: int = DEFAULT_POOL_SIZE,
+                 cache_dir: Optional[str] = None):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.pools = load_attribute_pools(
+            seed, pool_size, cache_dir or os.getenv('ETL_CACHE_DIR')
+        )
+
+    def sample_pool(self, name: str, n: int) -> np.ndarray:
+        """Sample n values from a named pool"""
+        pool = self.pools[name]
+        return pool[self.rng.integers(0, len(pool), size=n)]
+
+    def choice(self, options: Sequence, n: int, p: Optional[Sequence[float]] = None) -> np.ndarray:
+        """Sample n values from options with optional weights"""
+        return np.asarray(options)[self.rng.choice(len(options), size=n, p=p)]
+
+    def uniform(self, low: float, high: float, n: int, decimals: int = 2) -> np.ndarray:
+        """Uniform values rounded to the given number of decimals"""
+        return np.round(self.rng.uniform(low, high, size=n), decimals)
+
+    def dates_between(self, start: date, end: date, n: int) -> np.ndarray:
+        """n dates uniformly drawn from [start, end], as datetime.date objects"""
+        start_day = np.datetime64(start, 'D')
+        span = (np.datetime64(end, 'D') - start_day).astype(int)
+        offsets = self.rng.integers(0, max(span, 0) + 1, size=n)
+        return (start_day + offsets).astype(object)
+
+    def hashes(self, n: int) -> np.ndarray:
+        """n random SHA-256-style hex digests (unique with overwhelming probability)"""
+        raw = self.rng.integers(0, 256, size=(n, 32), dtype=np.uint8)
+        return _to_hex(raw).view('S64').ravel().astype(str)
+
+    def uuids(self, n: int) -> np.ndarray:
+        """n random version 4 UUID strings"""
+        return random_uuids(self.rng, n)
+
+
+def random_uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """n version 4 UUID strings drawn from rng"""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # Version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+
+    chars = np.full((n, 36), b'-', dtype='S1')
+    chars[:, _UUID_HEX_POSITIONS] = _to_hex(raw)
+    return chars.view('S36').ravel().astype(str)
+
+
+def load_attribute_pools(seed: int, pool_size: int = DEFAULT_POOL_SIZE,
+                         cache_dir: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Return the city/region pools for seed, building them at most once.
+
+    Pools are memoized in-process and, when cache_dir is set, persisted as JSON
+    so later runs skip Faker entirely.
+    """
+    pools = _load_cached_pools(seed, pool_size, cache_dir)
+    return {name: np.asarray(values, dtype=object) for name, values in pools.items()}
+
+
+@lru_cache(maxsize=16)
+def _load_cached_pools(seed: int, pool_size: int, cache_dir: Optional[str]) -> Dict[str, tuple]:
+    """Read pools from the on-disk cache or build and store them"""
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, 'attribute_pools', f"pools_{seed}_{pool_size}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                return {name: tuple(values) for name, values in json.load(f).items()}
+
+    pools = _build_pools(seed, pool_size)
+
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({name: list(values) for name, values in pools.items()}, f)
+
+    return pools
+
+
+def _build_pools(seed: int, pool_size: int) -> Dict[str, tuple]:
+    """Build attribute pools with a seeded Faker instance"""
+    from faker import Faker
+
+    logger.info(f"Building attribute pools (size {pool_size})...")
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        'city': tuple(fake.city() for _ in range(pool_size)),
+        'region': tuple(fake.state() for _ in range(pool_size)),
+    }
+
+
+def _to_hex(raw: np.ndarray) -> np.ndarray:
+    """Map an (n, k) uint8 array to an (n, 2k) array of hex digit characters"""
+    chars = np.empty((raw.shape[0], raw.shape[1] * 2), dtype='S1')
+    chars[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    chars[:, 1::2] = _HEX_DIGITS[raw & 0x0F]
+    return chars
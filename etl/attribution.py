@@ -0,0 +1,280 @@
+"""
+Multi-touch attribution for fact_conversions
+
+Each conversion is joined to the same user's paid sessions (the ad
+click-throughs in fact_web_analytics) that started within a lookback window
+before it, and the conversion is credited to those touchpoints under four
+models: last click, first click, linear and time decay.
+
+The join is one searchsorted over touchpoints sorted by (user, time). Every
+(conversion, touchpoint) pair in a window is then expanded with np.repeat and
+the models are array expressions over the pairs, so there are no
+per-conversion Python loops and tens of millions of touchpoints cost a sort.
+
+A batch only holds its own sessions. Without more history, conversions in the
+first lookback_days of a batch cannot match touchpoints from an earlier batch
+and stay unattributed. For incremental loads, pass a warehouse connection
+(--warehouse-touchpoints): the paid sessions of the lookback window before the
+batch's first day are then read from fact_web_analytics and matched as well.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compression import data_file, open_csv, output_file
+
+logger = logging.getLogger(__name__)
+
+ATTRIBUTION_MODELS = ('last_click', 'first_click', 'linear', 'time_decay')
+ATTRIBUTION_TABLE = 'agg_campaign_attribution'
+
+DEFAULT_LOOKBACK_DAYS = 30  # Standard 30-day click window
+DEFAULT_HALF_LIFE_DAYS = 7.0  # Time decay: a touch 7 days earlier gets half the credit
+
+_SECONDS_PER_DAY = 86_400
+# Session columns the touchpoint join and the last-click copy read
+TOUCH_COLUMNS = ['session_id', 'session_start_timestamp', 'user_key', 'campaign_key']
+
+PRIOR_SESSIONS_SQL = """
+SELECT session_id, session_start_timestamp, user_key, campaign_key
+FROM {schema}.fact_web_analytics
+WHERE date_key >= %(first_date_key)s AND date_key < %(before_date_key)s
+  AND campaign_key IS NOT NULL AND user_key IS NOT NULL
+"""
+
+
+def match_touchpoints(sessions: pd.DataFrame, conversions: pd.DataFrame,
+                      lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> pd.DataFrame:
+    """(conversion, touchpoint) pairs for every paid session in each conversion's window.
+
+    Returns one row per pair with the conversion's row position, the session's
+    row position, the touch's age in seconds, its rank within the window and
+    the window's touch count. Conversions without a user or touch get no rows.
+    """
+    paid = sessions['campaign_key'].notna().to_numpy() & sessions['user_key'].notna().to_numpy()
+    touch_rows = np.flatnonzero(paid)
+    convert_rows = np.flatnonzero(conversions['user_key'].notna().to_numpy())
+
+    # Integer user codes shared by both sides
+    user_codes, _ = pd.factorize(pd.concat([
+        sessions['user_key'].iloc[touch_rows], conversions['user_key'].iloc[convert_rows]
+    ], ignore_index=True))
+    touch_users = user_codes[:len(touch_rows)].astype(np.int64)
+    convert_users = user_codes[len(touch_rows):].astype(np.int64)
+
+    touch_times = _epoch_seconds(sessions['session_start_timestamp'].iloc[touch_rows])
+    convert_times = _epoch_seconds(conversions['conversion_timestamp'].iloc[convert_rows])
+    if len(touch_rows) == 0 or len(convert_rows) == 0:
+        return _pairs(*(np.empty(0, dtype=np.int64),) * 5)
+
+    # Composite (user, time) key: each user owns a block of `span` seconds
+    origin = min(touch_times.min(), convert_times.min())
+    span = max(touch_times.max(), convert_times.max()) - origin + 1
+    if (user_codes.max() + 1) * span >= np.iinfo(np.int64).max:
+        raise ValueError("Too many users x seconds for a 64-bit attribution key")
+    touch_key = touch_users * span + (touch_times - origin)
+    order = np.argsort(touch_key)
+    touch_key = touch_key[order]
+    touch_rows = touch_rows[order]
+    touch_times = touch_times[order]
+
+    # Searching in key order keeps the binary searches cache-friendly
+    convert_offset = convert_times - origin
+    convert_order = np.argsort(convert_users * span + convert_offset)
+    convert_rows = convert_rows[convert_order]
+    convert_times = convert_times[convert_order]
+    convert_users = convert_users[convert_order]
+    convert_offset = convert_offset[convert_order]
+
+    window_start = np.maximum(convert_offset - lookback_days * _SECONDS_PER_DAY, 0)
+    left = np.searchsorted(touch_key, convert_users * span + window_start, side='left')
+    right = np.searchsorted(touch_key, convert_users * span + convert_offset, side='right')
+    counts = right - left
+
+    # Expand each conversion's window [left, right) into pairs
+    pair_conversion = np.repeat(np.arange(len(convert_rows)), counts)
+    rank = np.arange(len(pair_conversion)) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_touch = left[pair_conversion] + rank
+    age = convert_times[pair_conversion] - touch_times[pair_touch]
+
+    return _pairs(convert_rows[pair_conversion], touch_rows[pair_touch], age,
+                  rank, counts[pair_conversion])
+
+
+def attribution_credit(pairs: pd.DataFrame, model: str,
+                       half_life_days: float = DEFAULT_HALF_LIFE_DAYS) -> np.ndarray:
+    """Share of its conversion credited to each pair; shares sum to 1 per conversion"""
+    rank = pairs['rank'].to_numpy()
+    touches = pairs['touches'].to_numpy()
+
+    if model == 'last_click':
+        return (rank == touches - 1).astype(float)
+    if model == 'first_click':
+        return (rank == 0).astype(float)
+    if model == 'linear':
+        return 1.0 / np.maximum(touches, 1)
+    if model == 'time_decay':
+        weights = 0.5 ** (pairs['age_seconds'].to_numpy() / (half_life_days * _SECONDS_PER_DAY))
+        _, conversion = np.unique(pairs['conversion_row'].to_numpy(), return_inverse=True)
+        totals = np.bincount(conversion, weights=weights)
+        return weights / totals[conversion]
+    raise ValueError(f"Unknown attribution model {model!r}; expected one of {list(ATTRIBUTION_MODELS)}")
+
+
+def build_attribution_table(sessions: pd.DataFrame, conversions: pd.DataFrame, pairs: pd.DataFrame,
+                            models: Iterable[str] = ATTRIBUTION_MODELS,
+                            half_life_days: float = DEFAULT_HALF_LIFE_DAYS) -> pd.DataFrame:
+    """Conversion date x campaign x model rollup of credited conversions and revenue"""
+    conversion_rows = pairs['conversion_row'].to_numpy()
+    base = pd.DataFrame({
+        'date_key': conversions['date_key'].to_numpy()[conversion_rows],
+        'campaign_key': sessions['campaign_key'].to_numpy()[pairs['touch_row'].to_numpy()],
+    })
+    values = conversions['conversion_value'].to_numpy(dtype=float)[conversion_rows]
+
+    frames = []
+    for model in models:
+        credit = attribution_credit(pairs, model, half_life_days)
+        frames.append(base.assign(
+            attribution_model=model,
+            attributed_conversions=credit,
+            attributed_revenue=credit * values,
+            touchpoints=(credit > 0).astype(np.int64),
+        ))
+
+    columns = ['date_key', 'campaign_key', 'attribution_model',
+               'attributed_conversions', 'attributed_revenue', 'touchpoints']
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    table = pd.concat(frames, ignore_index=True).groupby(
+        ['date_key', 'campaign_key', 'attribution_model'], sort=True
+    )[['attributed_conversions', 'attributed_revenue', 'touchpoints']].sum().reset_index()
+    # Drop groups a model gives no credit (e.g. assisting campaigns under last click)
+    table = table[table['touchpoints'] > 0].reset_index(drop=True)
+    return table.round({'attributed_conversions': 4, 'attributed_revenue': 2})[columns]
+
+
+def apply_last_click(conversions: pd.DataFrame, sessions: pd.DataFrame,
+                     pairs: pd.DataFrame) -> pd.DataFrame:
+    """Copy of conversions credited to their last paid click.
+
+    campaign_key and session_id come from the last touch in the window and
+    time_to_conversion_hours is measured from the first, as documented in the
+    data dictionary.
+    """
+    last = pairs[pairs['rank'].to_numpy() == pairs['touches'].to_numpy() - 1]
+    first = pairs[pairs['rank'].to_numpy() == 0]
+    rows = last['conversion_row'].to_numpy()
+    touches = last['touch_row'].to_numpy()
+
+    campaign_key = np.full(len(conversions), None, dtype=object)
+    session_id = np.full(len(conversions), None, dtype=object)
+    campaign_key[rows] = sessions['campaign_key'].to_numpy()[touches]
+    session_id[rows] = sessions['session_id'].to_numpy()[touches]
+
+    # Unattributed conversions keep their generated time to convert
+    hours = conversions['time_to_conversion_hours'].to_numpy().copy()
+    hours[first['conversion_row'].to_numpy()] = first['age_seconds'].to_numpy() // 3600
+
+    attributed = conversions.copy()
+    # Same column order as the fact_conversions DDL
+    position = attributed.columns.get_loc('user_key') + 1
+    for column, values in (('campaign_key', campaign_key), ('session_id', session_id)):
+        if column in attributed:
+            attributed[column] = values
+        else:
+            attributed.insert(position, column, values)
+    attributed['attribution_model'] = 'last_click'
+    attributed['time_to_conversion_hours'] = hours
+    return attributed
+
+
+def prior_paid_sessions(conn, batch_start: pd.Timestamp, lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+                        schema: str = "ad_dashboard") -> pd.DataFrame:
+    """Warehouse paid sessions in the lookback window before a batch's first day"""
+    params = {
+        'first_date_key': int((batch_start - pd.Timedelta(days=lookback_days)).strftime('%Y%m%d')),
+        'before_date_key': int(batch_start.strftime('%Y%m%d')),
+    }
+    with conn.cursor() as cursor:
+        cursor.execute(PRIOR_SESSIONS_SQL.format(schema=schema), params)
+        sessions = pd.DataFrame(cursor.fetchall(), columns=TOUCH_COLUMNS)
+    sessions['session_start_timestamp'] = pd.to_datetime(sessions['session_start_timestamp'])
+    for column in ('session_id', 'user_key', 'campaign_key'):
+        sessions[column] = sessions[column].astype(str)
+    logger.info(f"   {len(sessions):,} earlier paid sessions read from the warehouse")
+    return sessions
+
+
+def run_attribution(facts: Dict[str, pd.DataFrame],
+                    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+                    half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+                    warehouse=None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Last-click fact_conversions and the per-model attribution rollup.
+
+    Without a warehouse connection only the batch's sessions are touchpoints,
+    so conversions in the first lookback_days of the batch whose touches are in
+    an earlier batch stay unattributed.
+    """
+    sessions = facts['fact_web_analytics']
+    conversions = facts['fact_conversions']
+    logger.info(f"Attributing {len(conversions):,} conversions with a {lookback_days}-day lookback...")
+    if warehouse is not None and len(conversions):
+        date_keys = np.r_[sessions['date_key'].to_numpy(), conversions['date_key'].to_numpy()]
+        batch_start = pd.to_datetime(str(int(date_keys.min())), format='%Y%m%d')
+        sessions = pd.concat([sessions[TOUCH_COLUMNS],
+                              prior_paid_sessions(warehouse, batch_start, lookback_days)], ignore_index=True)
+
+    pairs = match_touchpoints(sessions, conversions, lookback_days)
+    attributed = pairs['conversion_row'].nunique()
+    share = attributed / len(conversions) if len(conversions) else 0.0
+    logger.info(f"   {len(pairs):,} touchpoints credited; {attributed:,} conversions ({share:.1%}) attributed")
+
+    return (apply_last_click(conversions, sessions, pairs),
+            build_attribution_table(sessions, conversions, pairs, half_life_days=half_life_days))
+
+
+def attribute_files(raw_path: str, lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+                    half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+                    compression: Optional[str] = None, warehouse=None) -> pd.DataFrame:
+    """Attribute generated CSVs in place: rewrite fact_conversions and write the rollup.
+
+    Used when the facts are not in memory together (out-of-core or merged
+    shards); only the session columns the join needs are read. warehouse is
+    passed to run_attribution for touchpoints before the batch.
+    """
+    sessions = pd.read_csv(
+        data_file(raw_path, 'fact_web_analytics'),
+        usecols=TOUCH_COLUMNS + ['date_key'],
+        parse_dates=['session_start_timestamp'],
+    )
+    conversions = pd.read_csv(data_file(raw_path, 'fact_conversions'), parse_dates=['conversion_timestamp'])
+
+    conversions, table = run_attribution(
+        {'fact_web_analytics': sessions, 'fact_conversions': conversions}, lookback_days, half_life_days,
+        warehouse
+    )
+    with open_csv(output_file(raw_path, 'fact_conversions', compression)) as f:
+        conversions.to_csv(f, index=False)
+    with open_csv(output_file(raw_path, ATTRIBUTION_TABLE, compression)) as f:
+        table.to_csv(f, index=False)
+    logger.info(f"💾 Saved {len(table):,} rows to {ATTRIBUTION_TABLE}")
+    return table
+
+
+def _epoch_seconds(timestamps: pd.Series) -> np.ndarray:
+    """Timestamps as int64 seconds since the epoch"""
+    return timestamps.to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+
+def _pairs(conversion_row, touch_row, age_seconds, rank, touches) -> pd.DataFrame:
+    return pd.DataFrame({
+        'conversion_row': conversion_row,
+        'touch_row': touch_row,
+        'age_seconds': age_seconds,
+        'rank': rank,
+        'touches': touches,
+    })
@@ -0,0 +1,224 @@
+"""
+Content-addressed cache of generated datasets
+
+Generated dimension and fact tables are stored on disk keyed by a hash of the
+DataGenerationConfig and GENERATOR_VERSION. Each column is written as its own
+.npy file so that numeric columns are memory-mapped back on a hit instead of
+being regenerated. Entries are evicted least-recently-used first once the
+cache exceeds its size or entry budget.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_generator import DataGenerator, DataGenerationConfig, GENERATOR_VERSION
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv('ETL_CACHE_DIR', os.path.join('data', 'cache'))
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+MANIFEST_FILE = "manifest.json"
+
+Tables = Dict[str, pd.DataFrame]
+
+
+def config_fingerprint(config: DataGenerationConfig) -> str:
+    """Hash of the generation config and generator version"""
+    payload = json.dumps(
+        {'config': asdict(config), 'generator_version': GENERATOR_VERSION},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class GenerationCache:
+    """On-disk columnar cache of generated datasets with LRU/size eviction"""
+
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_entries: Optional[int] = None):
+        self.root = cache_dir or DEFAULT_CACHE_DIR
+        self.cache_dir = os.path.join(self.root, 'generated')
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Tables]]:
+        """Load a cached dataset, or None on a miss"""
+        entry_dir = os.path.join(self.cache_dir, key)
+        manifest_path = os.path.join(entry_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+        groups = {}
+        for group, tables in manifest['groups'].items():
+            groups[group] = {
+                table: _read_table(os.path.join(entry_dir, group, table), spec)
+                for table, spec in tables.items()
+            }
+
+        # Touch the manifest to record the access for LRU eviction
+        os.utime(manifest_path)
+        return groups
+
+    def put(self, key: str, groups: Dict[str, Tables]):
+        """Store a dataset under key, then evict down to the budget"""
+        entry_dir = os.path.join(self.cache_dir, key)
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        manifest = {'key': key, 'created_at': datetime.now().isoformat(), 'groups': {}}
+        for group, tables in groups.items():
+            manifest['groups'][group] = {
+                table: _write_table(df, os.path.join(tmp_dir, group, table))
+                for table, df in tables.items()
+            }
+
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Publish atomically so readers never see a partial entry
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        self.evict()
+
+    def evict(self):
+        """Remove least-recently-used entries beyond the size/entry budget"""
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            manifest_path = os.path.join(self.cache_dir, key, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                entries.append((os.path.getmtime(manifest_path), key,
+                                _dir_size(os.path.join(self.cache_dir, key))))
+
+        entries.sort()  # Oldest access first
+        total_bytes = sum(size for _, _, size in entries)
+
+        while entries and (total_bytes > self.max_bytes or
+                           (self.max_entries is not None and len(entries) > self.max_entries)):
+            _, key, size = entries.pop(0)
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            total_bytes -= size
+            logger.info(f"🧹 Evicted cached dataset {key[:12]} ({size / 1024 / 1024:.1f} MB)")
+
+    def clear(self):
+        """Remove every cached dataset"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+
+def cached_generate(config: DataGenerationConfig,
+                    cache: Optional[GenerationCache] = None) -> Tuple[Tables, Tables]:
+    """Return (dimensions, facts) for config, generating only on a cache miss"""
+    cache = cache or GenerationCache()
+    key = config_fingerprint(config)
+
+    start = time.perf_counter()
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"⚡ Loaded cached dataset {key[:12]} in {time.perf_counter() - start:.2f}s")
+        return cached['dimensions'], cached['facts']
+
+    # Attribute pools are kept next to the datasets, so a miss still skips Faker
+    generator = DataGenerator(config, cache_dir=cache.root)
+    dimensions = generator.generate_dimension_data()
+    facts = generator.generate_fact_data()
+    cache.put(key, {'dimensions': dimensions, 'facts': facts})
+    logger.info(f"💾 Cached dataset {key[:12]}")
+    return dimensions, facts
+
+
+def _write_table(df: pd.DataFrame, table_dir: str) -> Dict:
+    """Write one .npy file per column and return the table spec"""
+    os.makedirs(table_dir, exist_ok=True)
+    columns = []
+
+    for position, column in enumerate(df.columns):
+        stem = os.path.join(table_dir, f"c{position}")
+        series = df[column]
+        kind = _column_kind(series)
+
+        if kind == 'native':
+            np.save(f"{stem}.npy", series.to_numpy())
+        elif kind == 'date':
+            np.save(f"{stem}.npy", pd.to_datetime(series).to_numpy().astype('datetime64[D]'))
+        elif kind == 'category':
+            codes, categories = pd.factorize(series, use_na_sentinel=True)
+            np.save(f"{stem}.npy", codes.astype(np.int32))
+            np.save(f"{stem}.categories.npy", np.asarray(categories, dtype=str))
+        elif kind == 'string':
+            mask = series.isna().to_numpy()
+            np.save(f"{stem}.npy", np.asarray(series.fillna('').astype(str).to_numpy(), dtype=str))
+            np.save(f"{stem}.mask.npy", mask)
+        else:
+            np.save(f"{stem}.npy", series.to_numpy(dtype=object), allow_pickle=True)
+
+        columns.append({'name': column, 'file': f"c{position}", 'kind': kind, 'dtype': str(series.dtype)})
+
+    return {'rows': len(df), 'columns': columns}
+
+
+def _read_table(table_dir: str, spec: Dict) -> pd.DataFrame:
+    """Rebuild a DataFrame, memory-mapping every fixed-width column"""
+    data = {}
+    for column in spec['columns']:
+        stem = os.path.join(table_dir, column['file'])
+        kind = column['kind']
+
+        if kind == 'native':
+            # Plain ndarray view over the mapped file (no copy)
+            data[column['name']] = np.asarray(np.load(f"{stem}.npy", mmap_mode='r'))
+        elif kind == 'date':
+            values = np.load(f"{stem}.npy", mmap_mode='r').astype(object)
+            data[column['name']] = pd.Series(values, dtype=object)
+        elif kind == 'category':
+            codes = np.load(f"{stem}.npy", mmap_mode='r')
+            # Missing values have code -1, which indexes the trailing None
+            categories = np.append(np.load(f"{stem}.categories.npy").astype(object), None)
+            values = categories[codes]
+            data[column['name']] = pd.Series(values, dtype=object).astype(column['dtype'])
+        elif kind == 'string':
+            values = np.load(f"{stem}.npy", mmap_mode='r').astype(object)
+            values[np.load(f"{stem}.mask.npy")] = None
+            data[column['name']] = pd.Series(values, dtype=object).astype(column['dtype'])
+        else:
+            data[column['name']] = pd.Series(np.load(f"{stem}.npy", allow_pickle=True), dtype=object)
+
+    return pd.DataFrame(data, columns=[c['name'] for c in spec['columns']], copy=False)
+
+
+def _column_kind(series: pd.Series) -> str:
+    """Pick the on-disk encoding for a column"""
+    if series.dtype.kind in 'biufcmM':
+        return 'native'
+
+    inferred = pd.api.types.infer_dtype(series, skipna=True)
+    if inferred == 'date':
+        return 'date'
+    if inferred != 'string':
+        return 'pickle'
+    if series.nunique() <= len(series) // 2:
+        return 'category'
+    return 'string'
+
+
+def _dir_size(path: str) -> int:
+    """Total size of files under path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
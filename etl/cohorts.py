@@ -0,0 +1,277 @@
+"""
+Customer retention cohorts for fact_customer_retention
+
+Users are grouped into monthly acquisition cohorts by dim_user.first_session_date.
+Their sessions and conversions become activity rows keyed by (user, months
+since acquisition), and one grouped aggregation yields a retention row per active
+user-period with transaction counts and revenue. Every user also gets a period 0
+row, so v_cohort_retention can count cohort sizes.
+
+All steps are array operations: users are matched with a hash index, and
+grouping is one sort-based groupby. Nothing loops per user. Passing `months`
+restricts the output to those activity months. By default the pipeline limits
+a file build to the batch's months: the months that have sessions or
+conversions in the generated files (activity_months). --months (parse_months)
+selects the periods explicitly.
+
+The file is not loaded into the warehouse. A batch can hold only part of a
+month, so after a load refresh_customer_retention rebuilds the months the batch
+touched from all of the warehouse's users, sessions and conversions (the same
+rules in SQL), deleting and reinserting them in one transaction.
+"""
+
+import logging
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .compression import data_file, open_csv, output_file
+
+logger = logging.getLogger(__name__)
+
+RETENTION_TABLE = 'fact_customer_retention'
+RETENTION_COLUMNS = [
+    'user_key', 'acquisition_date_key', 'retention_date_key', 'acquisition_campaign_key',
+    'period_number', 'is_active', 'transactions_count', 'revenue_amount',
+]
+
+DELETE_RETENTION_SQL = "DELETE FROM {schema}.fact_customer_retention WHERE {retention_filter}"
+
+REBUILD_RETENTION_SQL = """
+INSERT INTO {schema}.fact_customer_retention (
+    user_key, acquisition_date_key, retention_date_key, acquisition_campaign_key,
+    period_number, is_active, transactions_count, revenue_amount
+)
+WITH users AS (
+    SELECT
+        user_key,
+        TO_CHAR(first_session_date, 'YYYYMMDD')::INTEGER as acquisition_date_key,
+        EXTRACT(YEAR FROM first_session_date)::INTEGER * 12
+            + EXTRACT(MONTH FROM first_session_date)::INTEGER as acquisition_month
+    FROM {schema}.dim_user
+    WHERE first_session_date IS NOT NULL
+),
+activity AS (
+    SELECT user_key, acquisition_date_key as date_key, 0 as transactions, 0::NUMERIC as revenue
+    FROM users
+    WHERE {acquisition_filter}
+    UNION ALL
+    SELECT user_key, date_key, 0, 0
+    FROM {schema}.fact_web_analytics
+    WHERE {activity_filter}
+    UNION ALL
+    SELECT user_key, date_key, 1, conversion_value
+    FROM {schema}.fact_conversions
+    WHERE {activity_filter}
+),
+first_paid AS (
+    SELECT DISTINCT ON (user_key) user_key, campaign_key
+    FROM {schema}.fact_web_analytics
+    WHERE campaign_key IS NOT NULL AND user_key IN (SELECT user_key FROM activity)
+    ORDER BY user_key, session_start_timestamp
+)
+SELECT
+    u.user_key,
+    u.acquisition_date_key,
+    MIN(a.date_key),
+    fp.campaign_key,
+    a.date_key / 10000 * 12 + a.date_key / 100 % 100 - u.acquisition_month as period_number,
+    TRUE,
+    SUM(a.transactions),
+    ROUND(SUM(a.revenue), 2)
+FROM activity a
+JOIN users u ON u.user_key = a.user_key
+LEFT JOIN first_paid fp ON fp.user_key = u.user_key
+WHERE a.date_key >= u.acquisition_date_key
+GROUP BY u.user_key, u.acquisition_date_key, u.acquisition_month, fp.campaign_key, period_number
+"""
+
+# The date_key range lets the planner prune before the exact month match
+MONTHS_FILTER = "{column} BETWEEN %(first_date_key)s AND %(last_date_key)s AND {column} / 100 = ANY(%(months)s)"
+
+
+def build_customer_retention(users: pd.DataFrame, sessions: pd.DataFrame, conversions: pd.DataFrame,
+                             months: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """Retention rows per user and period, limited to YYYYMM activity months if given"""
+    first_session = pd.to_datetime(users['first_session_date']).to_numpy(dtype='datetime64[D]')
+    acquired = ~np.isnat(first_session)
+    user_keys = users['user_key'].to_numpy(dtype=object)[acquired]
+    first_session = first_session[acquired]
+    acquisition_date_key = _date_keys(first_session)
+    acquisition_month = first_session.astype('datetime64[M]').astype(np.int64)
+
+    # Activity: sessions count as visits, conversions as transactions with revenue
+    activity = pd.concat([
+        pd.DataFrame({
+            'user_key': sessions['user_key'].to_numpy(dtype=object),
+            'date_key': sessions['date_key'].to_numpy(dtype=np.int64),
+            'transactions': 0,
+            'revenue': 0.0,
+        }),
+        pd.DataFrame({
+            'user_key': conversions['user_key'].to_numpy(dtype=object),
+            'date_key': conversions['date_key'].to_numpy(dtype=np.int64),
+            'transactions': 1,
+            'revenue': conversions['conversion_value'].to_numpy(dtype=float),
+        }),
+    ], ignore_index=True)
+
+    user_code = pd.Index(user_keys).get_indexer(activity['user_key'])
+    acquisition_campaign = _first_paid_campaigns(sessions, user_code[:len(sessions)], len(user_keys))
+    date_key = activity['date_key'].to_numpy()
+    period = _month_index(date_key) - acquisition_month[user_code]
+    activity = activity.drop(columns='user_key').assign(user_code=user_code, period_number=period)
+    # Drop unknown users and activity before the user's first session
+    activity = activity[(user_code >= 0) & (date_key >= acquisition_date_key[user_code])]
+
+    # Acquisition (period 0) rows for every user, active by definition
+    acquisitions = pd.DataFrame({
+        'date_key': acquisition_date_key,
+        'transactions': 0,
+        'revenue': 0.0,
+        'user_code': np.arange(len(user_keys)),
+        'period_number': 0,
+    })
+    rows = pd.concat([acquisitions, activity], ignore_index=True)
+    if months is not None:
+        rows = rows[np.isin(rows['date_key'].to_numpy() // 100, np.fromiter(months, dtype=np.int64))]
+
+    grouped = rows.groupby(['user_code', 'period_number'], sort=True).agg(
+        retention_date_key=('date_key', 'min'),
+        transactions_count=('transactions', 'sum'),
+        revenue_amount=('revenue', 'sum'),
+    ).reset_index()
+
+    code = grouped['user_code'].to_numpy()
+    retention = pd.DataFrame({
+        'user_key': user_keys[code],
+        'acquisition_date_key': acquisition_date_key[code],
+        'retention_date_key': grouped['retention_date_key'].to_numpy(),
+        'acquisition_campaign_key': acquisition_campaign[code],
+        'period_number': grouped['period_number'].to_numpy(),
+        'is_active': True,
+        'transactions_count': grouped['transactions_count'].to_numpy(),
+        'revenue_amount': grouped['revenue_amount'].round(2).to_numpy(),
+    })
+    logger.info(f"Built {len(retention):,} retention rows for {len(user_keys):,} users "
+                f"({retention['period_number'].max() + 1 if len(retention) else 0} periods)")
+    return retention[RETENTION_COLUMNS]
+
+
+def build_retention_files(raw_path: str, months: Optional[Iterable[int]] = None,
+                          compression: Optional[str] = None) -> pd.DataFrame:
+    """Build fact_customer_retention.csv from the generated files for months (default: the batch's months)"""
+    users = pd.read_csv(data_file(raw_path, 'dim_user'),
+                        usecols=['user_key', 'first_session_date'])
+    sessions = pd.read_csv(
+        data_file(raw_path, 'fact_web_analytics'),
+        usecols=['user_key', 'campaign_key', 'date_key', 'session_start_timestamp'],
+        parse_dates=['session_start_timestamp'],
+    )
+    conversions = pd.read_csv(data_file(raw_path, 'fact_conversions'),
+                              usecols=['user_key', 'date_key', 'conversion_value'])
+
+    if months is None:
+        months = activity_months(sessions, conversions)
+    retention = build_customer_retention(users, sessions, conversions, months)
+    filename = output_file(raw_path, RETENTION_TABLE, compression)
+    with open_csv(filename) as f:
+        retention.to_csv(f, index=False)
+    logger.info(f"💾 Saved {len(retention):,} rows to {filename}")
+    return retention
+
+
+def activity_months(sessions: pd.DataFrame, conversions: pd.DataFrame) -> List[int]:
+    """YYYYMM months with sessions or conversions in a batch"""
+    date_keys = np.concatenate([sessions['date_key'].to_numpy(dtype=np.int64),
+                                conversions['date_key'].to_numpy(dtype=np.int64)])
+    return [int(month) for month in np.unique(date_keys // 100)]
+
+
+def parse_months(value: str) -> List[int]:
+    """YYYYMM months from '202403,202405' or '202401-202406' (inclusive ranges), sorted"""
+    months = set()
+    for part in filter(None, (part.strip() for part in value.split(','))):
+        start, _, end = part.partition('-')
+        try:
+            first, last = int(start), int(end or start)
+        except ValueError:
+            raise ValueError(f"Invalid month {part!r}; expected YYYYMM or YYYYMM-YYYYMM") from None
+        if not (1 <= first % 100 <= 12 and 1 <= last % 100 <= 12) or last < first:
+            raise ValueError(f"Invalid month {part!r}; expected YYYYMM or YYYYMM-YYYYMM")
+        index = first // 100 * 12 + first % 100 - 1
+        while index <= last // 100 * 12 + last % 100 - 1:
+            months.add(index // 12 * 100 + index % 12 + 1)
+            index += 1
+    if not months:
+        raise ValueError("No months given")
+    return sorted(months)
+
+
+def retention_months(csv_file: str) -> list:
+    """YYYYMM activity months present in a retention CSV"""
+    date_keys = pd.read_csv(csv_file, usecols=['retention_date_key'])['retention_date_key']
+    return sorted(int(month) for month in np.unique(date_keys.to_numpy() // 100))
+
+
+def refresh_customer_retention(conn, months: Optional[Iterable[int]] = None,
+                               schema: str = "ad_dashboard") -> int:
+    """Rebuild warehouse retention rows for YYYYMM activity months (default: all) in one transaction.
+
+    Returns the number of rows inserted.
+    """
+    params = {}
+    filters = dict.fromkeys(['retention_filter', 'acquisition_filter', 'activity_filter'], 'TRUE')
+    if months is not None:
+        months = sorted(int(month) for month in months)
+        if not months:
+            logger.info("No affected months, skipping retention refresh")
+            return 0
+        params = {'first_date_key': months[0] * 100 + 1, 'last_date_key': months[-1] * 100 + 31,
+                  'months': months}
+        filters = {
+            'retention_filter': MONTHS_FILTER.format(column='retention_date_key'),
+            'acquisition_filter': MONTHS_FILTER.format(column='acquisition_date_key'),
+            'activity_filter': MONTHS_FILTER.format(column='date_key'),
+        }
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(DELETE_RETENTION_SQL.format(schema=schema, **filters), params)
+            deleted = cursor.rowcount
+            cursor.execute(REBUILD_RETENTION_SQL.format(schema=schema, **filters), params)
+            inserted = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    scope = f"{len(months)} months" if months is not None else "all months"
+    logger.info(f"🔁 Rebuilt {inserted:,} retention rows, replacing {deleted:,} ({scope})")
+    return inserted
+
+
+def _first_paid_campaigns(sessions: pd.DataFrame, user_code: np.ndarray, n_users: int) -> np.ndarray:
+    """Campaign of each user's first paid session (first-touch acquisition), by user code"""
+    campaigns = np.full(n_users, None, dtype=object)
+    paid = np.flatnonzero(sessions['campaign_key'].notna().to_numpy() & (user_code >= 0))
+    order = paid[np.argsort(sessions['session_start_timestamp'].to_numpy()[paid], kind='stable')]
+    # np.unique returns the first (earliest) occurrence of each user
+    users, first = np.unique(user_code[order], return_index=True)
+    campaigns[users] = sessions['campaign_key'].to_numpy(dtype=object)[order[first]]
+    return campaigns
+
+
+def _month_index(date_keys: np.ndarray) -> np.ndarray:
+    """Months since 1970-01 of YYYYMMDD date keys (same scale as datetime64[M])"""
+    return (date_keys // 10000 - 1970) * 12 + (date_keys // 100 % 100 - 1)
+
+
+def _date_keys(days: np.ndarray) -> np.ndarray:
+    """YYYYMMDD integer keys of datetime64[D] values"""
+    years = days.astype('datetime64[Y]').astype(np.int64) + 1970
+    month_start = days.astype('datetime64[M]')
+    months = month_start.astype(np.int64) % 12 + 1
+    day = (days - month_start.astype('datetime64[D]')).astype(np.int64) + 1
+    return years * 10000 + months * 100 + day
@@ -0,0 +1,282 @@
+"""
+Out-of-core columnar fact store
+
+Generated fact tables are appended to flat binary files, one per column per
+partition (calendar month), described by a small JSON manifest:
+
+    <root>/manifest.json
+    <root>/<table>/<partition>/<column>.bin            fixed-width values
+    <root>/<table>/<partition>/<column>.offsets.bin    string end offsets (int64)
+    <root>/<table>/<partition>/<column>.nulls.bin      string null flags (bool)
+
+Fixed-width columns are opened as read-only np.memmap views, so validators and
+aggregators scan only the columns they need without loading a table into RAM.
+Row counts in the manifest are updated after the column files are flushed, so
+readers never see a partially appended batch.
+"""
+
+import json
+import logging
+import os
+import shutil
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compression import open_csv
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+FACT_TABLES = ['fact_ad_performance', 'fact_web_analytics', 'fact_conversions']
+
+Columns = Dict[str, np.ndarray]
+
+
+class ColumnarStore:
+    """Append-only, month-partitioned columnar store backed by np.memmap"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.manifest = self._read_manifest()
+
+    def tables(self) -> List[str]:
+        """Tables present in the store"""
+        return list(self.manifest['tables'])
+
+    def partitions(self, table: str) -> List[str]:
+        """Partition names of a table, in order"""
+        return sorted(self.manifest['tables'].get(table, {}).get('partitions', {}))
+
+    def columns(self, table: str) -> List[str]:
+        """Column names of a table"""
+        return list(self.manifest['tables'][table]['columns'])
+
+    def row_count(self, table: str) -> int:
+        """Total rows of a table across partitions"""
+        return sum(self.manifest['tables'].get(table, {}).get('partitions', {}).values())
+
+    def append(self, table: str, partition: str, df: pd.DataFrame):
+        """Append a batch of rows to one partition of a table"""
+        meta = self.manifest['tables'].setdefault(table, {'columns': {}, 'partitions': {}})
+        if not meta['columns']:
+            meta['columns'] = {column: _column_spec(df[column]) for column in df.columns}
+        elif list(df.columns) != list(meta['columns']):
+            raise ValueError(f"Columns of {table} batch do not match the store schema")
+
+        part_dir = os.path.join(self.root, table, partition)
+        os.makedirs(part_dir, exist_ok=True)
+
+        for column, spec in meta['columns'].items():
+            stem = os.path.join(part_dir, column)
+            if spec['kind'] == 'fixed':
+                _append_array(f"{stem}.bin", df[column].to_numpy(dtype=spec['dtype']))
+            else:
+                _append_strings(stem, df[column])
+
+        # Publish the rows only once every column file holds them
+        meta['partitions'][partition] = meta['partitions'].get(partition, 0) + len(df)
+        self._write_manifest()
+
+    def drop_partition(self, table: str, partition: str):
+        """Remove one partition of a table"""
+        meta = self.manifest['tables'].get(table)
+        if meta is None or partition not in meta['partitions']:
+            return
+        del meta['partitions'][partition]
+        self._write_manifest()
+        shutil.rmtree(os.path.join(self.root, table, partition), ignore_errors=True)
+
+    def read_partition(self, table: str, partition: str,
+                       columns: Optional[Iterable[str]] = None) -> Columns:
+        """Column arrays of one partition (fixed-width columns are memory-mapped)"""
+        meta = self.manifest['tables'][table]
+        rows = meta['partitions'][partition]
+        part_dir = os.path.join(self.root, table, partition)
+
+        data = {}
+        for column in (columns or meta['columns']):
+            spec = meta['columns'][column]
+            stem = os.path.join(part_dir, column)
+            if spec['kind'] == 'fixed':
+                data[column] = _map_array(f"{stem}.bin", spec['dtype'], rows)
+            else:
+                data[column] = _read_strings(stem, rows)
+        return data
+
+    def scan(self, table: str, columns: Optional[Iterable[str]] = None,
+             partitions: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Columns]]:
+        """Yield (partition, column arrays) for each partition of a table"""
+        columns = list(columns) if columns is not None else None
+        for partition in (partitions or self.partitions(table)):
+            yield partition, self.read_partition(table, partition, columns)
+
+    def to_frame(self, table: str, columns: Optional[Iterable[str]] = None,
+                 partitions: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Materialize (part of) a table as a DataFrame"""
+        columns = list(columns) if columns is not None else self.columns(table)
+        frames = [pd.DataFrame(data, columns=columns)
+                  for _, data in self.scan(table, columns, partitions)]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def export_csv(self, table: str, path: str) -> int:
+        """Stream a table to CSV (gzip-compressed for a .gz path) one partition at a time"""
+        total_rows = 0
+        with open_csv(path) as f:
+            pd.DataFrame(columns=self.columns(table)).to_csv(f, index=False)
+            for _, data in self.scan(table):
+                df = pd.DataFrame(data)
+                df.to_csv(f, index=False, header=False)
+                total_rows += len(df)
+        return total_rows
+
+    def disk_size(self, table: str) -> int:
+        """Bytes used on disk by a table"""
+        total = 0
+        for root, _, files in os.walk(os.path.join(self.root, table)):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return total
+
+    def _read_manifest(self) -> Dict:
+        path = os.path.join(self.root, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {'tables': {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        path = os.path.join(self.root, MANIFEST_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def generate_facts_to_store(generator, store: ColumnarStore,
+                            dates: Optional[pd.DatetimeIndex] = None,
+                            chunker=None) -> Dict[str, int]:
+    """Generate fact tables month by month straight into the store.
+
+    At most one month of facts is held in memory at a time; with an
+    AdaptiveChunker (sized in days) a month is generated in smaller batches.
+    Existing partitions for the generated months are replaced, so reruns are
+    idempotent.
+    """
+    dates = generator.fact_dates if dates is None else dates
+    totals = {table: 0 for table in FACT_TABLES}
+
+    for month, month_dates in pd.Series(dates, index=dates).groupby(dates.strftime('%Y%m')):
+        month_dates = pd.DatetimeIndex(month_dates.to_numpy())
+        for table in FACT_TABLES:
+            store.drop_partition(table, month)
+
+        start = 0
+        while start < len(month_dates):
+            days = chunker.next_size() if chunker else len(month_dates)
+            facts = generator.generate_fact_data(month_dates[start:start + days])
+            for table, df in facts.items():
+                store.append(table, month, df)
+                totals[table] += len(df)
+            if chunker:
+                chunker.observe(min(days, len(month_dates) - start),
+                                sum(int(df.memory_usage(deep=True).sum()) for df in facts.values()))
+            start += days
+        logger.info(f"💾 Stored facts for {month}")
+
+    return totals
+
+
+def validate_store_table(store: ColumnarStore, table: str) -> Dict:
+    """Streaming data quality report for a stored table"""
+    columns = store.columns(table)
+    null_counts = dict.fromkeys(columns, 0)
+    total_rows = 0
+
+    for _, data in store.scan(table):
+        for column, values in data.items():
+            null_counts[column] += int(pd.isna(values).sum())
+        total_rows += len(next(iter(data.values()))) if data else 0
+
+    results = {
+        'table_name': table,
+        'total_rows': total_rows,
+        'total_columns': len(columns),
+        'partitions': len(store.partitions(table)),
+        'null_counts': null_counts,
+        'null_percentages': {
+            column: (count / total_rows) * 100 if total_rows > 0 else 0
+            for column, count in null_counts.items()
+        },
+        'disk_size_mb': store.disk_size(table) / 1024 / 1024,
+    }
+
+    logger.info(f"📊 Data Quality Report for {table} (columnar store):")
+    logger.info(f"   Rows: {results['total_rows']:,} in {results['partitions']} partitions")
+    logger.info(f"   Columns: {results['total_columns']}")
+    logger.info(f"   Disk: {results['disk_size_mb']:.2f} MB")
+
+    return results
+
+
+def _column_spec(series: pd.Series) -> Dict[str, str]:
+    """Storage kind and dtype for a column"""
+    if series.dtype.kind in 'biufmM':
+        return {'kind': 'fixed', 'dtype': str(series.dtype)}
+    return {'kind': 'string', 'dtype': 'str'}
+
+
+def _append_array(path: str, values: np.ndarray):
+    """Append raw fixed-width values to a column file"""
+    with open(path, 'ab') as f:
+        np.ascontiguousarray(values).tofile(f)
+
+
+def _map_array(path: str, dtype: str, rows: int) -> np.ndarray:
+    """Read-only memory map of the first `rows` values of a column file"""
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+
+
+def _append_strings(stem: str, series: pd.Series):
+    """Append strings as UTF-8 bytes plus end offsets and null flags"""
+    nulls = series.isna().to_numpy()
+    encoded = np.char.encode(series.fillna('').to_numpy(dtype=str), 'utf-8')
+    lengths = np.char.str_len(encoded).astype(np.int64)
+
+    # Pack the padded fixed-width buffer down to just the string bytes
+    width = encoded.dtype.itemsize
+    if width:
+        matrix = encoded.view(np.uint8).reshape(len(encoded), width)
+        data = matrix[np.arange(width) < lengths[:, None]]
+    else:
+        data = np.empty(0, dtype=np.uint8)
+
+    data_path = f"{stem}.bin"
+    base = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+    _append_array(data_path, data)
+    _append_array(f"{stem}.offsets.bin", base + np.cumsum(lengths))
+    _append_array(f"{stem}.nulls.bin", nulls)
+
+
+def _read_strings(stem: str, rows: int) -> np.ndarray:
+    """Decode a string column into an object array (None for nulls)"""
+    if rows == 0:
+        return np.empty(0, dtype=object)
+
+    ends = _map_array(f"{stem}.offsets.bin", 'int64', rows)
+    starts = np.concatenate(([0], ends[:-1]))
+    lengths = ends - starts
+    width = max(int(lengths.max()), 1)
+
+    data = np.fromfile(f"{stem}.bin", dtype=np.uint8, count=int(ends[-1]))
+    matrix = np.zeros((rows, width), dtype=np.uint8)
+    matrix[np.arange(width) < lengths[:, None]] = data
+    values = np.char.decode(matrix.view(f'S{width}').ravel(), 'utf-8').astype(object)
+
+    values[_map_array(f"{stem}.nulls.bin", 'bool', rows)] = None
+    return values
@@ -0,0 +1,129 @@
+"""
+Block-compressed output for the generated CSV files
+
+With files.formats.compression set to 'gzip', raw tables are written as
+<table>.csv.gz. The writer cuts the CSV byte stream into fixed-size blocks and
+compresses each one as an independent gzip member in a thread pool. zlib
+releases the GIL, so the blocks compress in parallel, and the members are
+written in order. Concatenated gzip members are a valid gzip file, which
+pandas, gzip.open and zcat all read as one stream.
+
+Chunks are written as they arrive: at most two blocks per worker are in flight,
+so memory stays bounded however large the table is. Readers decompress in a
+streaming way as well; pd.read_csv infers gzip from the suffix and its chunked
+iterator inflates only what each chunk needs.
+
+data_file resolves a table to whichever of <table>.csv and <table>.csv.gz
+exists (the newer if both do), so every step reads either format. Writers go
+through output_file, which removes the table's file in the other format, so a
+table never has two copies once the pipeline has written it.
+"""
+
+import io
+import logging
+import os
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+CSV_SUFFIX = '.csv'
+CODEC_SUFFIXES = {'gzip': '.gz'}  # files.formats.compression -> file suffix
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024  # Uncompressed bytes per gzip member
+DEFAULT_LEVEL = 6
+
+
+def csv_path(directory: str, table: str, compression: Optional[str] = None) -> str:
+    """Path to write a table to, with the codec's suffix when compression is set"""
+    if compression and compression not in CODEC_SUFFIXES:
+        raise ValueError(f"Unsupported compression {compression!r}; expected one of {list(CODEC_SUFFIXES)}")
+    return os.path.join(directory, f"{table}{CSV_SUFFIX}{CODEC_SUFFIXES.get(compression, '')}")
+
+
+def output_file(directory: str, table: str, compression: Optional[str] = None) -> str:
+    """csv_path for writing a table, after removing its file in any other format"""
+    path = csv_path(directory, table, compression)
+    for codec in [None, *CODEC_SUFFIXES]:
+        other = csv_path(directory, table, codec)
+        if other != path and os.path.exists(other):
+            os.remove(other)
+    return path
+
+
+def data_file(directory: str, table: str) -> str:
+    """Existing file holding a table (the newer of .csv and .csv.gz), or its .csv path if neither exists"""
+    candidates = [csv_path(directory, table, codec) for codec in [None, *CODEC_SUFFIXES]]
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return candidates[0]
+    return max(existing, key=lambda path: os.stat(path).st_mtime_ns)
+
+
+def open_csv(path: str, workers: Optional[int] = None, block_size: int = DEFAULT_BLOCK_SIZE) -> TextIO:
+    """Text handle for writing a CSV, compressed in parallel blocks when path ends in .gz"""
+    if not path.endswith(CODEC_SUFFIXES['gzip']):
+        return open(path, 'w', newline='')
+    return io.TextIOWrapper(ParallelGzipWriter(path, workers, block_size), encoding='utf-8', newline='')
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    """Binary writer that compresses fixed-size blocks concurrently into concatenated gzip members"""
+
+    def __init__(self, path: str, workers: Optional[int] = None, block_size: int = DEFAULT_BLOCK_SIZE,
+                 level: int = DEFAULT_LEVEL):
+        super().__init__()
+        self.workers = workers or os.cpu_count() or 1
+        self.block_size = block_size
+        self.level = level
+        self.bytes_in = self.bytes_out = 0
+        self._file = open(path, 'wb')
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='gzip')
+        self._pending: Deque[Future] = deque()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        """Buffer data, handing each full block to the pool"""
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[:self.block_size]))
+            del self._buffer[:self.block_size]
+        return len(data)
+
+    def close(self):
+        """Compress the final partial block and write every outstanding member"""
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._write_next()
+        finally:
+            self._pool.shutdown()
+            self._file.close()
+            super().close()
+
+    def _submit(self, block: bytes):
+        """Queue a block, first writing finished members so at most two per worker are in flight"""
+        while len(self._pending) >= 2 * self.workers:
+            self._write_next()
+        self.bytes_in += len(block)
+        self._pending.append(self._pool.submit(gzip_member, block, self.level))
+
+    def _write_next(self):
+        """Write the oldest member, waiting for it if needed"""
+        member = self._pending.popleft().result()
+        self._file.write(member)
+        self.bytes_out += len(member)
+
+
+def gzip_member(block: bytes, level: int = DEFAULT_LEVEL) -> bytes:
+    """One complete gzip member (header, deflate stream, trailer) for a block"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(block) + compressor.flush()
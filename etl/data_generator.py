@@ -7,18 +7,29 @@ for EMEA region with proper statistical distributions and correlations.
 
 import pandas as pd
 import numpy as np
-from faker import Faker
-from datetime import datetime, timedelta
-import random
-import uuid
-from typing import Dict, List, Tuple, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 import logging
 from dataclasses import dataclass
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from .attribute_pools import AttributeProvider, random_uuids
+from .date_dimension import DEFAULT_FISCAL_YEAR_START_MONTH, build_date_dimension, volume_effects
+from .dimension_index import DimensionIndex
+from .sharding import shard_dates
+from .workload import (WORKLOAD_STREAM, WorkloadProfile, day_multipliers, launch_multipliers,
+                       resolve_workload)
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever a change alters generated output, so cached datasets are invalidated
+GENERATOR_VERSION = "1.3.0"
+
+# Independent random streams per fact table (combined with seed and date_key)
+AD_PERFORMANCE_STREAM = 1
+WEB_ANALYTICS_STREAM = 2
+CONVERSIONS_STREAM = 3
+EVENT_STREAM = 4  # Event timestamps for the streaming simulator
+
 @dataclass
 class DataGenerationConfig:
     """Configuration for data generation parameters"""
@@ -29,8 +40,26 @@ class DataGenerationConfig:
     daily_volume_scale: str = "medium"  # small, medium, large
     seed: int = 42
     emea_countries: List[str] = None
+    campaign_types: List[str] = None
+    platforms: List[str] = None
+    objectives: List[str] = None
+    daily_sessions_range: Tuple[int, int] = (100, 2000)
+    ab_test_percentage: float = 0.2
+    shard_index: int = 0  # This host's shard, 0 <= shard_index < shard_count
+    shard_count: int = 1
+    workload: Optional[WorkloadProfile] = None  # Profile or preset name: uniform, skewed, hot_keys
+    fiscal_year_start_month: int = DEFAULT_FISCAL_YEAR_START_MONTH
     
     def __post_init__(self):
+        if pd.Timestamp(self.end_date) < pd.Timestamp(self.start_date):
+            raise ValueError(
+                f"end_date ({self.end_date}) must not be before start_date ({self.start_date})"
+            )
+        if self.shard_count < 1 or not 0 <= self.shard_index < self.shard_count:
+            raise ValueError(
+                f"Invalid shard {self.shard_index}/{self.shard_count}"
+            )
+        self.workload = resolve_workload(self.workload)
         if self.emea_countries is None:
             self.emea_countries = [
                 'United Kingdom', 'Germany', 'France', 'Italy', 'Spain',
@@ -38,16 +67,22 @@ class DataGenerationConfig:
                 'Norway', 'Denmark', 'Finland', 'Poland', 'Czech Republic',
                 'Hungary', 'Romania', 'Greece', 'Portugal', 'Ireland'
             ]
+        if self.campaign_types is None:
+            self.campaign_types = ['Search', 'Social', 'Display', 'Video']
+        if self.platforms is None:
+            self.platforms = ['Google Ads', 'Facebook', 'LinkedIn', 'Twitter']
+        if self.objectives is None:
+            self.objectives = ['Awareness', 'Conversion', 'Traffic', 'Engagement']
 
 class DataGenerator:
     """Generate realistic simulated data for ad performance dashboard"""
     
-    def __init__(self, config: DataGenerationConfig):
+    def __init__(self, config: DataGenerationConfig, cache_dir: Optional[str] = None):
         self.config = config
-        self.fake = Faker()
-        Faker.seed(config.seed)
-        np.random.seed(config.seed)
-        random.seed(config.seed)
+        
+        # Vectorized, seeded source of dimension attributes (keys, names, dates);
+        # its name pools persist under cache_dir (default: ETL_CACHE_DIR, if set)
+        self.attributes = AttributeProvider(config.seed, cache_dir=cache_dir)
         
         # Volume scaling factors
         self.volume_scales = {
@@ -59,11 +94,14 @@ class DataGenerator:
         # Initialize campaign and geo data
         self.campaigns_df = None
         self.geo_df = None
+        self.index: Optional[DimensionIndex] = None
         self.date_range = pd.date_range(
             start=config.start_date, 
             end=config.end_date, 
             freq='D'
         )
+        # Dates whose facts this shard generates (all dates when unsharded)
+        self.fact_dates = shard_dates(self.date_range, config.shard_index, config.shard_count)
         
     def generate_dimension_data(self) -> Dict[str, pd.DataFrame]:
         """Generate all dimension tables"""
@@ -77,324 +115,330 @@ class DataGenerator:
             'dim_user': self._generate_user_dimension()
         }
         
-        # Store for use in fact table generation
-        self.campaigns_df = dimensions['dim_campaign']
-        self.geo_df = dimensions['dim_geo']
+        self.set_dimension_data(dimensions)
         
         return dimensions
     
-    def generate_fact_data(self) -> Dict[str, pd.DataFrame]:
-        """Generate all fact tables"""
+    def set_dimension_data(self, dimensions: Dict[str, pd.DataFrame]):
+        """Store dimension tables for use in fact table generation"""
+        self.campaigns_df = dimensions['dim_campaign']
+        self.geo_df = dimensions['dim_geo']
+        self.index = DimensionIndex.from_dimensions(
+            dimensions, self.config.workload, self._day_rng(0, WORKLOAD_STREAM)
+        )
+    
+    def generate_fact_data(self, dates: Optional[pd.DatetimeIndex] = None) -> Dict[str, pd.DataFrame]:
+        """Generate all fact tables for this shard's dates, or for the given dates.
+        
+        Each day draws from its own random stream, so any subset of dates yields
+        exactly the rows that day has in a full-range run.
+        """
         logger.info("Generating fact data...")
         
-        if self.campaigns_df is None or self.geo_df is None:
+        if self.index is None:
             raise ValueError("Must generate dimension data first")
-            
+        
+        dates = self.fact_dates if dates is None else dates
         facts = {
-            'fact_ad_performance': self._generate_ad_performance_data(),
-            'fact_web_analytics': self._generate_web_analytics_data(),
-            'fact_conversions': self._generate_conversions_data()
+            'fact_ad_performance': self._generate_ad_performance_data(dates),
+            'fact_web_analytics': self._generate_web_analytics_data(dates),
+            'fact_conversions': self._generate_conversions_data(dates)
         }
         
         return facts
     
     def _generate_date_dimension(self) -> pd.DataFrame:
-        """Generate date dimension with calendar attributes"""
-        dates = []
-        
-        for date in self.date_range:
-            dates.append({
-                'date_key': int(date.strftime('%Y%m%d')),
-                'date_value': date.date(),
-                'day_of_week': date.weekday() + 1,
-                'day_name': date.strftime('%A'),
-                'month': date.month,
-                'month_name': date.strftime('%B'),
-                'quarter': (date.month - 1) // 3 + 1,
-                'year': date.year,
-                'week_of_year': date.isocalendar()[1],
-                'is_weekend': date.weekday() >= 5,
-                'is_holiday': self._is_holiday(date)
-            })
-        
-        return pd.DataFrame(dates)
+        """Generate date dimension with calendar, holiday and fiscal attributes"""
+        return build_date_dimension(self.date_range, self.config.emea_countries,
+                                    self.config.fiscal_year_start_month)
     
     def _generate_campaign_dimension(self) -> pd.DataFrame:
         """Generate campaign dimension with realistic campaign data"""
-        campaigns = []
-        
-        campaign_types = ['Search', 'Social', 'Display', 'Video']
-        platforms = ['Google Ads', 'Facebook', 'LinkedIn', 'Twitter']
-        objectives = ['Awareness', 'Conversion', 'Traffic', 'Engagement']
+        campaign_types = self.config.campaign_types
+        platforms = self.config.platforms
+        objectives = self.config.objectives
         
         # Convert string dates to datetime.date objects
         start_date = datetime.strptime(self.config.start_date, '%Y-%m-%d').date()
         end_date = datetime.strptime(self.config.end_date, '%Y-%m-%d').date()
         
-        for i in range(self.config.num_campaigns):
-            campaign_type = random.choice(campaign_types)
-            platform = random.choice(platforms)
-            
-            campaigns.append({
-                'campaign_key': str(uuid.uuid4()),
-                'source_campaign_id': f'cmp_{i:04d}',
-                'campaign_name': f'{campaign_type} Campaign {i+1} - {platform}',
-                'campaign_type': campaign_type,
-                'campaign_objective': random.choice(objectives),
-                'platform': platform,
-                'status': random.choices(['Active', 'Paused'], weights=[0.8, 0.2])[0],
-                'budget': round(random.uniform(1000, 50000), 2),
-                'daily_budget': round(random.uniform(50, 1000), 2),
-                'start_date': self.fake.date_between(
-                    start_date=start_date,
-                    end_date=end_date
-                )
-            })
-        
-        return pd.DataFrame(campaigns)
+        n = self.config.num_campaigns
+        attrs = self.attributes
+        campaign_type = pd.Series(attrs.choice(campaign_types, n), dtype=object)
+        platform = pd.Series(attrs.choice(platforms, n), dtype=object)
+        number = pd.Series(np.arange(1, n + 1)).astype(str)
+        
+        return pd.DataFrame({
+            'campaign_key': attrs.uuids(n),
+            'source_campaign_id': 'cmp_' + pd.Series(np.arange(n)).astype(str).str.zfill(4),
+            'campaign_name': campaign_type + ' Campaign ' + number + ' - ' + platform,
+            'campaign_type': campaign_type,
+            'campaign_objective': attrs.choice(objectives, n),
+            'platform': platform,
+            'status': attrs.choice(['Active', 'Paused'], n, p=[0.8, 0.2]),
+            'budget': attrs.uniform(1000, 50000, n),
+            'daily_budget': attrs.uniform(50, 1000, n),
+            'start_date': attrs.dates_between(start_date, end_date, n)
+        })
     
     def _generate_geo_dimension(self) -> pd.DataFrame:
         """Generate geographic dimension focused on EMEA"""
-        geo_data = []
-        
-        for country in self.config.emea_countries:
-            # Add country-level entry
-            geo_data.append({
-                'geo_key': str(uuid.uuid4()),
-                'country': country,
-                'country_code': self._get_country_code(country),
-                'region': None,
-                'city': None,
-                'is_emea': True,
-                'timezone': self._get_timezone(country),
-                'currency_code': self._get_currency(country)
-            })
-            
-            # Add some major cities for variety
-            for _ in range(random.randint(1, 3)):
-                geo_data.append({
-                    'geo_key': str(uuid.uuid4()),
-                    'country': country,
-                    'country_code': self._get_country_code(country),
-                    'region': self.fake.state(),
-                    'city': self.fake.city(),
-                    'is_emea': True,
-                    'timezone': self._get_timezone(country),
-                    'currency_code': self._get_currency(country)
-                })
-        
-        return pd.DataFrame(geo_data)
+        countries = np.asarray(self.config.emea_countries, dtype=object)
+        attrs = self.attributes
+        
+        # One country-level row plus 1-3 major cities per country, kept together
+        cities_per_country = attrs.rng.integers(1, 4, size=len(countries))
+        rows_per_country = cities_per_country + 1
+        country_idx = np.repeat(np.arange(len(countries)), rows_per_country)
+        first_row = np.repeat(np.cumsum(rows_per_country) - rows_per_country, rows_per_country)
+        is_city = np.arange(len(country_idx)) != first_row
+        
+        n = len(country_idx)
+        n_cities = int(is_city.sum())
+        region = np.full(n, None, dtype=object)
+        city = np.full(n, None, dtype=object)
+        region[is_city] = attrs.sample_pool('region', n_cities)
+        city[is_city] = attrs.sample_pool('city', n_cities)
+        
+        country = pd.Series(countries[country_idx])
+        return pd.DataFrame({
+            'geo_key': attrs.uuids(n),
+            'country': country,
+            'country_code': country.map(self._get_country_code),
+            'region': region,
+            'city': city,
+            'is_emea': True,
+            'timezone': country.map(self._get_timezone),
+            'currency_code': country.map(self._get_currency)
+        })
     
     def _generate_device_dimension(self) -> pd.DataFrame:
         """Generate device dimension"""
-        devices = [
+        devices = pd.DataFrame([
             {'device_type': 'Mobile', 'operating_system': 'iOS', 'browser': 'Safari'},
             {'device_type': 'Mobile', 'operating_system': 'Android', 'browser': 'Chrome'},
             {'device_type': 'Desktop', 'operating_system': 'Windows', 'browser': 'Chrome'},
             {'device_type': 'Desktop', 'operating_system': 'macOS', 'browser': 'Safari'},
             {'device_type': 'Tablet', 'operating_system': 'iOS', 'browser': 'Safari'},
             {'device_type': 'Tablet', 'operating_system': 'Android', 'browser': 'Chrome'},
-        ]
-        
-        device_data = []
-        for device in devices:
-            device_data.append({
-                'device_key': str(uuid.uuid4()),
-                'device_type': device['device_type'],
-                'operating_system': device['operating_system'],
-                'browser': device['browser'],
-                'device_category': device['device_type']
-            })
-        
-        return pd.DataFrame(device_data)
+        ])
+        
+        devices.insert(0, 'device_key', self.attributes.uuids(len(devices)))
+        devices['device_category'] = devices['device_type']
+        return devices
     
     def _generate_user_dimension(self) -> pd.DataFrame:
         """Generate pseudonymized user dimension"""
-        users = []
-        
         # Convert string dates to datetime.date objects
         start_date = datetime.strptime(self.config.start_date, '%Y-%m-%d').date()
         end_date = datetime.strptime(self.config.end_date, '%Y-%m-%d').date()
         
-        for i in range(self.config.num_users):
-            users.append({
-                'user_key': str(uuid.uuid4()),
-                'source_user_id_hashed': self.fake.sha256(),
-                'first_session_date': self.fake.date_between(
-                    start_date=start_date,
-                    end_date=end_date
-                ),
-                'customer_segment': random.choices(
-                    ['New', 'Returning', 'VIP'], 
-                    weights=[0.5, 0.4, 0.1]
-                )[0]
-            })
-        
-        return pd.DataFrame(users)
+        n = self.config.num_users
+        attrs = self.attributes
+        return pd.DataFrame({
+            'user_key': attrs.uuids(n),
+            'source_user_id_hashed': attrs.hashes(n),
+            'first_session_date': attrs.dates_between(start_date, end_date, n),
+            'customer_segment': attrs.choice(
+                ['New', 'Returning', 'VIP'], n, p=[0.5, 0.4, 0.1]
+            )
+        })
     
-    def _generate_ad_performance_data(self) -> pd.DataFrame:
+    def _generate_ad_performance_data(self, dates: pd.DatetimeIndex) -> pd.DataFrame:
         """Generate realistic ad performance data with correlations"""
         logger.info("Generating ad performance data...")
         
-        ad_data = []
+        # Day-of-week and seasonal effects for every date at once
+        effects = volume_effects(dates)
+        return _concat_days(
+            [self._ad_performance_for_day(date, effect) for date, effect in zip(dates, effects)],
+            AD_PERFORMANCE_COLUMNS
+        )
+    
+    def _ad_performance_for_day(self, date: pd.Timestamp, date_effect: float) -> Dict[str, np.ndarray]:
+        """Ad performance rows for one day: active campaigns x 3-8 geos each"""
+        date_key = int(date.strftime('%Y%m%d'))
+        rng = self._day_rng(date_key, AD_PERFORMANCE_STREAM)
         scale = self.volume_scales[self.config.daily_volume_scale]
+        index = self.index
+        
+        # Sample distinct active campaigns, then distinct geos per campaign
+        campaign_pos = index.sample_campaigns(rng, 30)
+        max_geos = min(8, len(index.geo_keys))
+        geos_per_campaign = np.minimum(rng.integers(3, 9, size=len(campaign_pos)), max_geos)
+        geo_sets = index.sample_geo_sets(rng, len(campaign_pos), max_geos)
+        
+        campaign_idx = np.repeat(campaign_pos, geos_per_campaign)
+        geo_idx = geo_sets[np.arange(max_geos) < geos_per_campaign[:, None]]
+        n = len(campaign_idx)
+        
+        # Generate base metrics with realistic distributions
+        base_impressions = np.maximum(1, rng.lognormal(np.log(scale['base_impressions']), 0.5, n).astype(np.int64))
+        
+        # Apply day-of-week, seasonal and workload effects (hot keys, launch spikes)
+        effect = date_effect * self._workload_multiplier(date)
+        row_volume = self._row_volume(date, campaign_idx, geo_idx)
+        if row_volume is not None:
+            effect = effect * row_volume
+        impressions = np.maximum(1, (base_impressions * effect).astype(np.int64))
         
-        for date in self.date_range:
-            date_key = int(date.strftime('%Y%m%d'))
-            
-            # Generate data for active campaigns
-            active_campaigns = self.campaigns_df[
-                self.campaigns_df['status'] == 'Active'
-            ].sample(n=min(30, len(self.campaigns_df)))
-            
-            for _, campaign in active_campaigns.iterrows():
-                # Sample geos and devices
-                geo_sample = self.geo_df.sample(n=random.randint(3, 8))
-                
-                for _, geo in geo_sample.iterrows():
-                    # Generate base metrics with realistic distributions
-                    base_impressions = max(1, int(np.random.lognormal(
-                        np.log(scale['base_impressions']), 0.5
-                    )))
-                    
-                    # Apply day-of-week and seasonal effects
-                    day_effect = self._get_day_effect(date)
-                    seasonal_effect = self._get_seasonal_effect(date)
-                    
-                    impressions = int(base_impressions * day_effect * seasonal_effect)
-                    
-                    # Calculate correlated metrics
-                    ctr = max(0.1, min(15.0, np.random.lognormal(np.log(2.5), 0.3)))
-                    clicks = max(1, int(impressions * ctr / 100))
-                    
-                    cpc = max(0.1, np.random.lognormal(np.log(1.5), 0.4))
-                    spend = round(clicks * cpc, 2)
-                    
-                    cvr = max(0.1, min(10.0, np.random.lognormal(np.log(2.0), 0.4)))
-                    conversions = max(0, int(clicks * cvr / 100))
-                    
-                    aov = max(10, np.random.lognormal(np.log(75), 0.3))
-                    revenue = round(conversions * aov, 2)
-                    
-                    # A/B test assignment (20% of campaigns)
-                    ab_test_id = None
-                    ab_test_variant = None
-                    if random.random() < 0.2:
-                        ab_test_id = f'test_{random.randint(1, 10):03d}'
-                        ab_test_variant = random.choice(['A', 'B'])
-                    
-                    ad_data.append({
-                        'date_key': date_key,
-                        'campaign_key': campaign['campaign_key'],
-                        'geo_key': geo['geo_key'],
-                        'device_key': random.choice(self.geo_df.index),  # Simplified
-                        'impressions': impressions,
-                        'clicks': clicks,
-                        'spend': spend,
-                        'attributed_conversions': conversions,
-                        'attributed_revenue': revenue,
-                        'ab_test_id': ab_test_id,
-                        'ab_test_variant': ab_test_variant
-                    })
-        
-        return pd.DataFrame(ad_data)
+        # Calculate correlated metrics
+        ctr = np.clip(rng.lognormal(np.log(2.5), 0.3, n), 0.1, 15.0)
+        clicks = np.minimum(impressions, np.maximum(1, (impressions * ctr / 100).astype(np.int64)))
+        
+        cpc = np.maximum(0.1, rng.lognormal(np.log(1.5), 0.4, n))
+        spend = np.round(clicks * cpc, 2)
+        
+        cvr = np.clip(rng.lognormal(np.log(2.0), 0.4, n), 0.1, 10.0)
+        conversions = np.maximum(0, (clicks * cvr / 100).astype(np.int64))
+        
+        aov = np.maximum(10, rng.lognormal(np.log(75), 0.3, n))
+        revenue = np.round(conversions * aov, 2)
+        
+        # A/B test assignment (20% of rows by default)
+        in_test = rng.random(n) < self.config.ab_test_percentage
+        test_numbers = rng.integers(1, 11, size=n)
+        variants = rng.choice(np.array(['A', 'B'], dtype=object), size=n)
+        ab_test_id = np.where(in_test, np.char.add('test_', np.char.zfill(test_numbers.astype(str), 3)).astype(object), None)
+        ab_test_variant = np.where(in_test, variants, None)
+        
+        return {
+            'date_key': np.full(n, date_key, dtype=np.int64),
+            'campaign_key': index.campaign_keys[campaign_idx],
+            'geo_key': index.geo_keys[geo_idx],
+            'device_key': index.device_keys[index.sample_devices(rng, n)],
+            'impressions': impressions,
+            'clicks': clicks,
+            'spend': spend,
+            'attributed_conversions': conversions,
+            'attributed_revenue': revenue,
+            'ab_test_id': ab_test_id,
+            'ab_test_variant': ab_test_variant
+        }
     
-    def _generate_web_analytics_data(self) -> pd.DataFrame:
+    def _generate_web_analytics_data(self, dates: pd.DatetimeIndex) -> pd.DataFrame:
         """Generate web analytics data correlated with ad performance"""
         logger.info("Generating web analytics data...")
         
-        web_data = []
-        
-        for date in self.date_range:
-            date_key = int(date.strftime('%Y%m%d'))
-            
-            # Generate sessions based on ad clicks (simplified correlation)
-            num_sessions = random.randint(100, 2000)
-            
-            for _ in range(num_sessions):
-                session_id = str(uuid.uuid4())
-                
-                # Generate session metrics
-                page_views = max(1, int(np.random.lognormal(np.log(3), 0.5)))
-                session_duration = max(10, int(np.random.lognormal(np.log(120), 0.8)))
-                
-                # Bounce rate logic
-                is_bounce = (page_views == 1) or (session_duration < 30)
-                
-                web_data.append({
-                    'session_id': session_id,
-                    'session_start_timestamp': date + timedelta(
-                        seconds=random.randint(0, 86400)
-                    ),
-                    'date_key': date_key,
-                    'page_views': page_views,
-                    'session_duration_seconds': session_duration,
-                    'is_bounce': is_bounce,
-                    'goals_completed': random.randint(0, 2) if not is_bounce else 0,
-                    'utm_source': random.choice(['google', 'facebook', 'direct']),
-                    'utm_medium': random.choice(['cpc', 'social', 'organic'])
-                })
-        
-        return pd.DataFrame(web_data)
+        return _concat_days(
+            [self._web_analytics_for_day(date) for date in dates],
+            WEB_ANALYTICS_COLUMNS
+        )
     
-    def _generate_conversions_data(self) -> pd.DataFrame:
+    def _web_analytics_for_day(self, date: pd.Timestamp) -> Dict[str, np.ndarray]:
+        """Web sessions for one day"""
+        date_key = int(date.strftime('%Y%m%d'))
+        rng = self._day_rng(date_key, WEB_ANALYTICS_STREAM)
+        index = self.index
+        
+        # Generate sessions based on ad clicks (simplified correlation)
+        min_sessions, max_sessions = self.config.daily_sessions_range
+        n = self._scale_count(int(rng.integers(min_sessions, max_sessions + 1)), date)
+        
+        # Generate session metrics
+        page_views = np.maximum(1, rng.lognormal(np.log(3), 0.5, n).astype(np.int64))
+        session_duration = np.maximum(10, rng.lognormal(np.log(120), 0.8, n).astype(np.int64))
+        
+        # Bounce rate logic (matches the bounce_logic constraint in create_tables.sql)
+        is_bounce = (page_views <= 1) | (session_duration < 10)
+        goals_completed = np.where(is_bounce, 0, rng.integers(0, 3, size=n))
+        
+        utm_source = rng.choice(np.array(['google', 'facebook', 'direct'], dtype=object), size=n)
+        utm_medium = rng.choice(np.array(['cpc', 'social', 'organic'], dtype=object), size=n)
+        
+        # Paid sessions are attributed to an active campaign, organic ones are not
+        campaign_key = np.full(n, None, dtype=object)
+        paid = utm_medium != 'organic'
+        if len(index.campaign_keys):
+            campaign_pos = rng.choice(len(index.campaign_keys), size=int(paid.sum()), p=index.campaign_weights)
+            campaign_key[paid] = index.campaign_keys[campaign_pos]
+        
+        return {
+            'session_id': random_uuids(rng, n),
+            'session_start_timestamp': _day_timestamps(date, rng, n),
+            'date_key': np.full(n, date_key, dtype=np.int64),
+            'user_key': index.sample_users(rng, n),
+            'campaign_key': campaign_key,
+            'geo_key': index.geo_keys[index.sample_geos(rng, n)],
+            'device_key': index.device_keys[index.sample_devices(rng, n)],
+            'page_views': page_views,
+            'session_duration_seconds': session_duration,
+            'is_bounce': is_bounce,
+            'goals_completed': goals_completed,
+            'utm_source': utm_source,
+            'utm_medium': utm_medium
+        }
+    
+    def _generate_conversions_data(self, dates: pd.DatetimeIndex) -> pd.DataFrame:
         """Generate conversion events data"""
         logger.info("Generating conversions data...")
         
-        conversions = []
-        
-        for date in self.date_range:
-            date_key = int(date.strftime('%Y%m%d'))
-            
-            # Generate conversions for the day
-            num_conversions = random.randint(10, 100)
-            
-            for _ in range(num_conversions):
-                conversion_value = max(10, np.random.lognormal(np.log(75), 0.4))
-                
-                conversions.append({
-                    'conversion_id': str(uuid.uuid4()),
-                    'conversion_timestamp': date + timedelta(
-                        seconds=random.randint(0, 86400)
-                    ),
-                    'date_key': date_key,
-                    'conversion_type': random.choices(
-                        ['Purchase', 'Lead', 'Signup'], 
-                        weights=[0.6, 0.3, 0.1]
-                    )[0],
-                    'conversion_value': round(conversion_value, 2),
-                    'quantity': random.randint(1, 3),
-                    'attribution_model': 'last_click',
-                    'time_to_conversion_hours': random.randint(1, 168)
-                })
-        
-        return pd.DataFrame(conversions)
+        return _concat_days(
+            [self._conversions_for_day(date) for date in dates],
+            CONVERSIONS_COLUMNS
+        )
+    
+    def _conversions_for_day(self, date: pd.Timestamp) -> Dict[str, np.ndarray]:
+        """Conversion events for one day"""
+        date_key = int(date.strftime('%Y%m%d'))
+        rng = self._day_rng(date_key, CONVERSIONS_STREAM)
+        index = self.index
+        
+        # Generate conversions for the day
+        n = self._scale_count(int(rng.integers(10, 101)), date)
+        conversion_value = np.maximum(10, rng.lognormal(np.log(75), 0.4, n))
+        
+        return {
+            'conversion_id': random_uuids(rng, n),
+            'conversion_timestamp': _day_timestamps(date, rng, n),
+            'date_key': np.full(n, date_key, dtype=np.int64),
+            'user_key': index.sample_users(rng, n),
+            'geo_key': index.geo_keys[index.sample_geos(rng, n)],
+            'device_key': index.device_keys[index.sample_devices(rng, n)],
+            'conversion_type': rng.choice(
+                np.array(['Purchase', 'Lead', 'Signup'], dtype=object),
+                size=n,
+                p=[0.6, 0.3, 0.1]
+            ),
+            'conversion_value': np.round(conversion_value, 2),
+            'quantity': rng.integers(1, 4, size=n),
+            'attribution_model': np.full(n, 'last_click', dtype=object),
+            'time_to_conversion_hours': rng.integers(1, 169, size=n)
+        }
+    
+    def _day_rng(self, date_key: int, stream: int) -> np.random.Generator:
+        """Random stream for one table and day, independent of the date range"""
+        return np.random.default_rng([self.config.seed, stream, date_key])
     
-    def _is_holiday(self, date: datetime) -> bool:
-        """Simple holiday detection"""
-        # Major holidays (simplified)
-        holidays = [
-            (1, 1),   # New Year
-            (12, 25), # Christmas
-            (12, 26), # Boxing Day
-        ]
-        return (date.month, date.day) in holidays
+    def _workload_multiplier(self, date: pd.Timestamp) -> float:
+        """Daily volume multiplier from the workload's growth trend and burst days"""
+        workload = self.config.workload
+        if not workload.has_day_effects:
+            return 1.0
+        days_elapsed = (date - pd.Timestamp(self.config.start_date)).days
+        date_key = int(date.strftime('%Y%m%d'))
+        return float(day_multipliers(workload, [date_key], [days_elapsed], self.config.seed)[0])
     
-    def _get_day_effect(self, date: datetime) -> float:
-        """Get day-of-week effect on performance"""
-        # Lower performance on weekends
-        if date.weekday() >= 5:  # Weekend
-            return 0.7
-        return 1.0
+    def _row_volume(self, date: pd.Timestamp, campaign_idx: np.ndarray,
+                    geo_idx: np.ndarray) -> Optional[np.ndarray]:
+        """Per-row volume multipliers for hot campaigns, hot geos and launch spikes"""
+        workload = self.config.workload
+        index = self.index
+        volume = None
+        if workload.campaign_zipf:
+            volume = index.campaign_volume[campaign_idx]
+        if workload.geo_zipf:
+            volume = index.geo_volume[geo_idx] if volume is None else volume * index.geo_volume[geo_idx]
+        if workload.has_launch_spikes and index.campaign_start_days is not None:
+            days_since_launch = (np.datetime64(date.date(), 'D') - index.campaign_start_days[campaign_idx]).astype(np.int64)
+            spikes = launch_multipliers(workload, days_since_launch)
+            volume = spikes if volume is None else volume * spikes
+        return volume
     
-    def _get_seasonal_effect(self, date: datetime) -> float:
-        """Get seasonal effect on performance"""
-        # Higher performance in Q4 (holiday season)
-        if date.month in [11, 12]:
-            return 1.3
-        elif date.month in [7, 8]:  # Summer slowdown
-            return 0.8
-        return 1.0
+    def _scale_count(self, n: int, date: pd.Timestamp) -> int:
+        """Apply the workload's daily multiplier to a per-day event count"""
+        multiplier = self._workload_multiplier(date)
+        return n if multiplier == 1.0 else max(1, int(round(n * multiplier)))
     
     def _get_country_code(self, country: str) -> str:
         """Get ISO 2-letter country code"""
@@ -428,8 +472,37 @@ class DataGenerator:
         }
         return currencies.get(country, 'EUR')
 
+AD_PERFORMANCE_COLUMNS = [
+    'date_key', 'campaign_key', 'geo_key', 'device_key', 'impressions', 'clicks', 'spend',
+    'attributed_conversions', 'attributed_revenue', 'ab_test_id', 'ab_test_variant'
+]
+WEB_ANALYTICS_COLUMNS = [
+    'session_id', 'session_start_timestamp', 'date_key', 'user_key', 'campaign_key', 'geo_key',
+    'device_key', 'page_views', 'session_duration_seconds', 'is_bounce', 'goals_completed',
+    'utm_source', 'utm_medium'
+]
+CONVERSIONS_COLUMNS = [
+    'conversion_id', 'conversion_timestamp', 'date_key', 'user_key', 'geo_key', 'device_key',
+    'conversion_type', 'conversion_value', 'quantity', 'attribution_model', 'time_to_conversion_hours'
+]
+
+def _concat_days(days: List[Dict[str, np.ndarray]], columns: List[str]) -> pd.DataFrame:
+    """Concatenate per-day column arrays into one DataFrame"""
+    if not days:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame({
+        column: np.concatenate([day[column] for day in days]) for column in columns
+    })
+
+def _day_timestamps(date: pd.Timestamp, rng: np.random.Generator, n: int) -> np.ndarray:
+    """n timestamps uniformly spread over one day"""
+    return np.datetime64(date.date(), 's') + rng.integers(0, 86400, size=n).astype('timedelta64[s]')
+
 def main():
     """Main function for testing data generation"""
+    from .utils import setup_logging
+    setup_logging()
+    
     config = DataGenerationConfig()
     generator = DataGenerator(config)
     
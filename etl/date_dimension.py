@@ -0,0 +1,262 @@
+"""
+Vectorized date dimension, holiday calendars and per-date volume effects
+
+dim_date is built from DatetimeIndex accessors in whole-column operations, so
+its cost does not depend on per-row strftime or isocalendar calls.
+
+Each EMEA country has a HolidayCalendar of national public holidays. A
+holiday is one of:
+
+- a fixed (month, day)
+- a day offset from Easter Sunday (Orthodox Easter for Greece and Romania)
+- the nth, or last, weekday of a month, like the UK bank holidays
+
+Easter dates are computed for all years at once with the Gregorian and Julian
+computus in integer array arithmetic. holiday_masks returns a date x country
+boolean frame. is_holiday marks the dates that are public holidays in at least
+half of the configured countries. Substitute days for holidays that fall on a
+weekend are not modelled.
+
+Fiscal periods follow a fiscal year that starts on the first day of
+fiscal_year_start_month and is named for the calendar year it ends in. The
+default is October, so October 2024 is Q1 of FY2025.
+
+volume_effects gives the day-of-week and seasonal volume multiplier for a
+range of dates as one array. The fact generators read it instead of working
+out the effect for each day.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATE_COLUMNS = [
+    'date_key', 'date_value', 'day_of_week', 'day_name', 'month', 'month_name', 'quarter',
+    'year', 'week_of_year', 'is_weekend', 'is_holiday', 'fiscal_quarter', 'fiscal_year',
+]
+DEFAULT_FISCAL_YEAR_START_MONTH = 10
+HOLIDAY_QUORUM = 0.5  # Share of countries that must observe a holiday for is_holiday
+
+WEEKEND_EFFECT = 0.7
+# Volume multiplier by calendar month: summer slowdown, Q4 holiday season
+SEASONAL_EFFECTS = np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.8, 0.8, 1.0, 1.0, 1.3, 1.3])
+
+# Days from Easter Sunday
+MAUNDY_THURSDAY, GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY = -3, -2, 0, 1
+ASCENSION, WHIT_SUNDAY, WHIT_MONDAY, CORPUS_CHRISTI = 39, 49, 50, 60
+CLEAN_MONDAY = -48
+MONDAY = 0
+LAST = -1
+
+
+@dataclass(frozen=True)
+class HolidayCalendar:
+    """Public holidays of one country: fixed dates, Easter offsets and nth weekdays of a month"""
+    fixed: Tuple[Tuple[int, int], ...] = ()
+    easter: Tuple[int, ...] = ()
+    weekdays: Tuple[Tuple[int, int, int], ...] = ()  # (month, weekday with Monday 0, n); n = LAST for the last
+    orthodox: bool = False
+
+
+# Countries without a calendar of their own get the holidays common to all of them
+DEFAULT_HOLIDAYS = HolidayCalendar(fixed=((1, 1), (12, 25), (12, 26)))
+
+HOLIDAY_CALENDARS: Dict[str, HolidayCalendar] = {
+    'United Kingdom': HolidayCalendar(
+        fixed=((1, 1), (12, 25), (12, 26)), easter=(GOOD_FRIDAY, EASTER_MONDAY),
+        weekdays=((5, MONDAY, 1), (5, MONDAY, LAST), (8, MONDAY, LAST)),
+    ),
+    'Germany': HolidayCalendar(
+        fixed=((1, 1), (5, 1), (10, 3), (12, 25), (12, 26)),
+        easter=(GOOD_FRIDAY, EASTER_MONDAY, ASCENSION, WHIT_MONDAY),
+    ),
+    'France': HolidayCalendar(
+        fixed=((1, 1), (5, 1), (5, 8), (7, 14), (8, 15), (11, 1), (11, 11), (12, 25)),
+        easter=(EASTER_MONDAY, ASCENSION, WHIT_MONDAY),
+    ),
+    'Italy': HolidayCalendar(
+        fixed=((1, 1), (1, 6), (4, 25), (5, 1), (6, 2), (8, 15), (11, 1), (12, 8), (12, 25), (12, 26)),
+        easter=(EASTER_SUNDAY, EASTER_MONDAY),
+    ),
+    'Spain': HolidayCalendar(
+        fixed=((1, 1), (1, 6), (5, 1), (8, 15), (10, 12), (11, 1), (12, 6), (12, 8), (12, 25)),
+        easter=(GOOD_FRIDAY,),
+    ),
+    'Netherlands': HolidayCalendar(
+        fixed=((1, 1), (4, 27), (12, 25), (12, 26)),
+        easter=(GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY, ASCENSION, WHIT_SUNDAY, WHIT_MONDAY),
+    ),
+    'Belgium': HolidayCalendar(
+        fixed=((1, 1), (5, 1), (7, 21), (8, 15), (11, 1), (11, 11), (12, 25)),
+        easter=(EASTER_SUNDAY, EASTER_MONDAY, ASCENSION, WHIT_SUNDAY, WHIT_MONDAY),
+    ),
+    'Switzerland': HolidayCalendar(
+        fixed=((1, 1), (8, 1), (12, 25), (12, 26)),
+        easter=(GOOD_FRIDAY, EASTER_MONDAY, ASCENSION, WHIT_MONDAY),
+    ),
+    'Austria': HolidayCalendar(
+        fixed=((1, 1), (1, 6), (5, 1), (8, 15), (10, 26), (11, 1), (12, 8), (12, 25), (12, 26)),
+        easter=(EASTER_MONDAY, ASCENSION, WHIT_MONDAY, CORPUS_CHRISTI),
+    ),
+    'Sweden': HolidayCalendar(
+        fixed=((1, 1), (1, 6), (5, 1), (6, 6), (12, 25), (12, 26)),
+        easter=(GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY, ASCENSION, WHIT_SUNDAY),
+    ),
+    'Norway': HolidayCalendar(
+        fixed=((1, 1), (5, 1), (5, 17), (12, 25), (12, 26)),
+        easter=(MAUNDY_THURSDAY, GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY, ASCENSION, WHIT_SUNDAY,
+                WHIT_MONDAY),
+    ),
+    'Denmark': HolidayCalendar(
+        fixed=((1, 1), (12, 25), (12, 26)),
+        easter=(MAUNDY_THURSDAY, GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY, ASCENSION, WHIT_SUNDAY,
+                WHIT_MONDAY),
+    ),
+    'Finland': HolidayCalendar(
+        fixed=((1, 1), (1, 6), (5, 1), (12, 6), (12, 25), (12, 26)),
+        easter=(GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY, ASCENSION, WHIT_SUNDAY),
+    ),
+    'Poland': HolidayCalendar(
+        fixed=((1, 1), (1, 6), (5, 1), (5, 3), (8, 15), (11, 1), (11, 11), (12, 25), (12, 26)),
+        easter=(EASTER_SUNDAY, EASTER_MONDAY, WHIT_SUNDAY, CORPUS_CHRISTI),
+    ),
+    'Czech Republic': HolidayCalendar(
+        fixed=((1, 1), (5, 1), (5, 8), (7, 5), (7, 6), (9, 28), (10, 28), (11, 17),
+               (12, 24), (12, 25), (12, 26)),
+        easter=(GOOD_FRIDAY, EASTER_MONDAY),
+    ),
+    'Hungary': HolidayCalendar(
+        fixed=((1, 1), (3, 15), (5, 1), (8, 20), (10, 23), (11, 1), (12, 25), (12, 26)),
+        easter=(GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY, WHIT_SUNDAY, WHIT_MONDAY),
+    ),
+    'Romania': HolidayCalendar(
+        fixed=((1, 1), (1, 2), (1, 24), (5, 1), (6, 1), (8, 15), (11, 30), (12, 1), (12, 25), (12, 26)),
+        easter=(GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY, WHIT_SUNDAY, WHIT_MONDAY),
+        orthodox=True,
+    ),
+    'Greece': HolidayCalendar(
+        fixed=((1, 1), (1, 6), (3, 25), (5, 1), (8, 15), (10, 28), (12, 25), (12, 26)),
+        easter=(CLEAN_MONDAY, GOOD_FRIDAY, EASTER_SUNDAY, EASTER_MONDAY, WHIT_MONDAY),
+        orthodox=True,
+    ),
+    'Portugal': HolidayCalendar(
+        fixed=((1, 1), (4, 25), (5, 1), (6, 10), (8, 15), (10, 5), (11, 1), (12, 1), (12, 8), (12, 25)),
+        easter=(GOOD_FRIDAY, EASTER_SUNDAY, CORPUS_CHRISTI),
+    ),
+    'Ireland': HolidayCalendar(
+        fixed=((1, 1), (3, 17), (12, 25), (12, 26)), easter=(EASTER_MONDAY,),
+        weekdays=((2, MONDAY, 1), (5, MONDAY, 1), (6, MONDAY, 1), (8, MONDAY, 1), (10, MONDAY, LAST)),
+    ),
+}
+
+
+def build_date_dimension(dates: Iterable, countries: Iterable[str],
+                         fiscal_year_start_month: int = DEFAULT_FISCAL_YEAR_START_MONTH) -> pd.DataFrame:
+    """dim_date rows for dates, with holidays from the countries' calendars and fiscal periods"""
+    if not 1 <= fiscal_year_start_month <= 12:
+        raise ValueError(f"fiscal_year_start_month must be 1-12, got {fiscal_year_start_month}")
+    dates = pd.DatetimeIndex(dates)
+    year = dates.year.to_numpy(dtype=np.int64)
+    month = dates.month.to_numpy(dtype=np.int64)
+    weekday = dates.dayofweek.to_numpy(dtype=np.int64)
+    fiscal_month = (month - fiscal_year_start_month) % 12
+
+    holidays = holiday_masks(dates, countries).to_numpy()
+    share = holidays.mean(axis=1) if holidays.shape[1] else np.zeros(len(dates))
+
+    return pd.DataFrame({
+        'date_key': year * 10_000 + month * 100 + dates.day.to_numpy(dtype=np.int64),
+        'date_value': dates.date,
+        'day_of_week': weekday + 1,
+        'day_name': dates.day_name(),
+        'month': month,
+        'month_name': dates.month_name(),
+        'quarter': (month - 1) // 3 + 1,
+        'year': year,
+        'week_of_year': dates.isocalendar()['week'].to_numpy(dtype=np.int64),
+        'is_weekend': weekday >= 5,
+        'is_holiday': share >= HOLIDAY_QUORUM,
+        'fiscal_quarter': fiscal_month // 3 + 1,
+        'fiscal_year': year + ((month >= fiscal_year_start_month) & (fiscal_year_start_month > 1)),
+    })[DATE_COLUMNS]
+
+
+def holiday_masks(dates: Iterable, countries: Iterable[str]) -> pd.DataFrame:
+    """Date x country frame, True where the date is a public holiday in that country"""
+    dates = pd.DatetimeIndex(dates)
+    return pd.DataFrame({
+        country: holiday_mask(dates, HOLIDAY_CALENDARS.get(country, DEFAULT_HOLIDAYS))
+        for country in dict.fromkeys(countries)
+    }, index=dates)
+
+
+def holiday_mask(dates: Iterable, calendar: HolidayCalendar) -> np.ndarray:
+    """True for the dates that are holidays in a calendar"""
+    dates = pd.DatetimeIndex(dates)
+    days = dates.to_numpy().astype('datetime64[D]')
+    month_days = dates.month.to_numpy() * 100 + dates.day.to_numpy()
+    mask = np.isin(month_days, [m * 100 + d for m, d in calendar.fixed])
+
+    years = np.unique(dates.year.to_numpy())
+    moving = []
+    if calendar.easter:
+        easter = easter_sundays(years, orthodox=calendar.orthodox)
+        moving.append((easter[:, None] + np.asarray(calendar.easter, dtype='timedelta64[D]')).ravel())
+    for month, weekday, n in calendar.weekdays:
+        moving.append(nth_weekdays(years, month, weekday, n))
+    if moving:
+        mask |= np.isin(days, np.concatenate(moving))
+    return mask
+
+
+def easter_sundays(years: Iterable[int], orthodox: bool = False) -> np.ndarray:
+    """Gregorian dates of Western (or Orthodox) Easter Sunday, one per year"""
+    y = np.asarray(years, dtype=np.int64)
+    if orthodox:
+        # Julian computus; the Julian calendar runs 13 days behind from 1900 to 2099
+        d = (19 * (y % 19) + 15) % 30
+        e = (2 * (y % 4) + 4 * (y % 7) - d + 34) % 7
+        offset = d + e + 114
+        return _make_dates(y, offset // 31, offset % 31 + 1) + np.timedelta64(13, 'D')
+
+    # Anonymous Gregorian algorithm
+    a, b, c = y % 19, y // 100, y % 100
+    h = (19 * a + b - b // 4 - (b - (b + 8) // 25 + 1) // 3 + 15) % 30
+    r = (32 + 2 * (b % 4) + 2 * (c // 4) - h - c % 4) % 7
+    m = (a + 11 * h + 22 * r) // 451
+    offset = h + r - 7 * m + 114
+    return _make_dates(y, offset // 31, offset % 31 + 1)
+
+
+def nth_weekdays(years: Iterable[int], month: int, weekday: int, n: int) -> np.ndarray:
+    """The nth given weekday (Monday 0) of a month per year; n = LAST for the last one"""
+    y = np.asarray(years, dtype=np.int64)
+    if n == LAST:
+        last = _make_dates(y, month + 1, 1) - np.timedelta64(1, 'D')
+        return last - ((_weekdays(last) - weekday) % 7).astype('timedelta64[D]')
+    first = _make_dates(y, month, 1)
+    return first + ((weekday - _weekdays(first)) % 7 + 7 * (n - 1)).astype('timedelta64[D]')
+
+
+def volume_effects(dates: Iterable) -> np.ndarray:
+    """Day-of-week times seasonal volume multiplier for each date"""
+    dates = pd.DatetimeIndex(dates)
+    weekday = np.where(dates.dayofweek.to_numpy() >= 5, WEEKEND_EFFECT, 1.0)
+    return weekday * SEASONAL_EFFECTS[dates.month.to_numpy() - 1]
+
+
+def _make_dates(years: np.ndarray, months, days) -> np.ndarray:
+    """datetime64[D] from year, month (13 rolls into the next January) and day arrays"""
+    month_starts = (years - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+    month_starts = month_starts + (np.asarray(months, dtype=np.int64) - 1).astype('timedelta64[M]')
+    return month_starts.astype('datetime64[D]') + (np.asarray(days, dtype=np.int64) - 1).astype('timedelta64[D]')
+
+
+def _weekdays(days: np.ndarray) -> np.ndarray:
+    """Weekday of datetime64[D] values, Monday 0 (1970-01-01 was a Thursday)"""
+    return (days.astype(np.int64) + 3) % 7
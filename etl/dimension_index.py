@@ -0,0 +1,108 @@
+"""
+Dimension index for fact sampling
+
+Built once after the dimension tables are generated, the index holds the key
+arrays (active campaigns, geos, devices, users) and their sampling weights, so
+fact generators draw integer positions with NumPy instead of filtering and
+sampling DataFrames for every date, campaign and row. A workload profile skews
+the campaign and geo weights (and their volume multipliers) towards hot keys.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .workload import WorkloadProfile, resolve_workload, zipf_popularity
+
+
+@dataclass
+class DimensionIndex:
+    """Key arrays and sampling weights for fact generation"""
+    campaign_keys: np.ndarray
+    campaign_weights: np.ndarray
+    geo_keys: np.ndarray
+    geo_weights: np.ndarray
+    device_keys: np.ndarray
+    device_weights: np.ndarray
+    user_keys: np.ndarray
+    campaign_volume: Optional[np.ndarray] = None  # Mean-1 volume multiplier per campaign
+    geo_volume: Optional[np.ndarray] = None  # Mean-1 volume multiplier per geo
+    campaign_start_days: Optional[np.ndarray] = None  # datetime64[D] start date per campaign
+
+    @classmethod
+    def from_dimensions(cls, dimensions: Dict[str, pd.DataFrame],
+                        workload: Optional[WorkloadProfile] = None,
+                        rng: Optional[np.random.Generator] = None) -> 'DimensionIndex':
+        """Build the index from generated dimension tables"""
+        workload = resolve_workload(workload)
+        rng = rng if rng is not None else np.random.default_rng()
+        campaigns = dimensions['dim_campaign']
+        active_rows = campaigns[campaigns['status'] == 'Active']
+        active = active_rows['campaign_key'].to_numpy(dtype=object)
+        geo_keys = dimensions['dim_geo']['geo_key'].to_numpy(dtype=object)
+        device_keys = dimensions['dim_device']['device_key'].to_numpy(dtype=object)
+
+        campaign_weights, campaign_volume = zipf_popularity(len(active), workload.campaign_zipf, rng)
+        geo_weights, geo_volume = zipf_popularity(len(geo_keys), workload.geo_zipf, rng)
+        start_days = None
+        if 'start_date' in active_rows:
+            start_days = pd.to_datetime(active_rows['start_date']).to_numpy().astype('datetime64[D]')
+
+        return cls(
+            campaign_keys=active,
+            campaign_weights=campaign_weights,
+            geo_keys=geo_keys,
+            geo_weights=geo_weights,
+            device_keys=device_keys,
+            device_weights=_uniform(len(device_keys)),
+            user_keys=dimensions['dim_user']['user_key'].to_numpy(dtype=object),
+            campaign_volume=campaign_volume,
+            geo_volume=geo_volume,
+            campaign_start_days=start_days,
+        )
+
+    def sample_campaigns(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Positions of n distinct active campaigns (weighted)"""
+        n = min(n, len(self.campaign_keys))
+        return _weighted_top_k(rng, self.campaign_weights, 1, n)[0]
+
+    def sample_geo_sets(self, rng: np.random.Generator, rows: int, k: int) -> np.ndarray:
+        """A (rows, k) matrix of distinct geo positions per row (weighted)"""
+        return _weighted_top_k(rng, self.geo_weights, rows, min(k, len(self.geo_keys)))
+
+    def sample_geos(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """n geo positions drawn with replacement (weighted)"""
+        return rng.choice(len(self.geo_keys), size=n, p=self.geo_weights)
+
+    def sample_devices(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """n device positions drawn with replacement (weighted)"""
+        return rng.choice(len(self.device_keys), size=n, p=self.device_weights)
+
+    def sample_users(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """n user keys drawn uniformly with replacement (None if there are no users)"""
+        if len(self.user_keys) == 0:
+            return np.full(n, None, dtype=object)
+        return self.user_keys[rng.integers(0, len(self.user_keys), size=n)]
+
+
+def _uniform(n: int) -> np.ndarray:
+    """Uniform sampling weights"""
+    return np.full(n, 1.0 / n) if n else np.empty(0)
+
+
+def _weighted_top_k(rng: np.random.Generator, weights: np.ndarray, rows: int, k: int) -> np.ndarray:
+    """Weighted sampling without replacement for many rows at once.
+
+    Efraimidis-Spirakis: each item gets key u ** (1 / w) and the k largest keys
+    win. Returns a (rows, k) matrix of positions.
+    """
+    if k <= 0 or len(weights) == 0:
+        return np.empty((rows, 0), dtype=np.int64)
+
+    keys = rng.random((rows, len(weights))) ** (1.0 / weights)
+    top = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+    # argpartition leaves the top k unordered; order them by key, largest first
+    order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
@@ -0,0 +1,146 @@
+"""
+Funnel step events for fact_funnel_events
+
+Each web session becomes a short run of funnel events:
+page_view → add_to_cart → checkout → purchase. Every session views a page.
+A session that did not bounce then reaches each later step with that step's
+rate, provided it completed the previous step. A session that stops early
+records one uncompleted event at the step where it dropped off, so the
+completion rates in v_conversion_funnel are the step conversion rates.
+
+Each session's draws come from a hash of its session_id, so the events depend
+only on the session row. Chunking, reruns and shards all produce the same rows.
+Survival is a cumulative AND over the per-session draws, and the events are
+expanded with np.repeat and cumsum. Sessions are processed in adaptively sized
+chunks and the events are appended to CSV, so funnel volumes several times the
+session count never have to fit in memory.
+"""
+
+import logging
+from typing import Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .compression import data_file, open_csv, output_file
+from .memory import AdaptiveChunker
+from .workload import hash_uniform
+
+logger = logging.getLogger(__name__)
+
+FUNNEL_TABLE = 'fact_funnel_events'
+FUNNEL_STEPS = ('page_view', 'add_to_cart', 'checkout', 'purchase')
+FUNNEL_COLUMNS = [
+    'event_timestamp', 'session_id', 'user_key', 'date_key', 'campaign_key',
+    'funnel_step', 'funnel_step_number', 'step_completed', 'event_value',
+]
+FUNNEL_STREAM = 6  # Hash stream for step survival and purchase values
+
+# Chance of completing add_to_cart, checkout and purchase given the previous step
+DEFAULT_STEP_RATES = (0.35, 0.55, 0.70)
+DEFAULT_CHUNK_SESSIONS = 250_000
+
+SESSION_COLUMNS = [
+    'session_id', 'session_start_timestamp', 'date_key', 'user_key', 'campaign_key',
+    'session_duration_seconds', 'is_bounce',
+]
+
+
+def funnel_events(sessions: pd.DataFrame, seed: int,
+                  step_rates: Sequence[float] = DEFAULT_STEP_RATES) -> pd.DataFrame:
+    """Funnel events for a batch of sessions, in session order"""
+    rates = np.asarray(step_rates, dtype=float)
+    if len(rates) != len(FUNNEL_STEPS) - 1 or np.any((rates < 0) | (rates > 1)):
+        raise ValueError(f"step_rates needs {len(FUNNEL_STEPS) - 1} probabilities in [0, 1]")
+
+    n_steps = len(FUNNEL_STEPS)
+    session_hash = pd.util.hash_array(sessions['session_id'].to_numpy(dtype=object), categorize=False)
+    # One draw per session and later step; the extra two feed the purchase value
+    draws = hash_uniform(seed, session_hash[:, None] + np.arange(1, n_steps + 2, dtype=np.uint64),
+                         FUNNEL_STREAM)
+
+    bounced = sessions['is_bounce'].to_numpy(dtype=bool)
+    survived = np.logical_and.accumulate(draws[:, :n_steps - 1] < rates, axis=1)
+    survived[bounced] = False
+    depth = 1 + survived.sum(axis=1)  # Steps completed, page_view included
+    # Bounced sessions leave without trying the next step
+    counts = np.minimum(depth + ~bounced, n_steps)
+
+    session_row = np.repeat(np.arange(len(sessions)), counts)
+    step_number = np.arange(len(session_row)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    completed = step_number <= depth[session_row]
+
+    # Steps are spread evenly over the session
+    start = pd.to_datetime(sessions['session_start_timestamp']).to_numpy(dtype='datetime64[s]')
+    duration = sessions['session_duration_seconds'].to_numpy(dtype=np.int64)
+    offset = duration[session_row] * (step_number - 1) // n_steps
+
+    # Completed purchases carry a lognormal order value (Box-Muller over the spare draws)
+    purchased = completed & (step_number == n_steps)
+    u1, u2 = draws[session_row[purchased], n_steps - 1], draws[session_row[purchased], n_steps]
+    z = np.sqrt(-2.0 * np.log1p(-u1)) * np.cos(2.0 * np.pi * u2)
+    event_value = np.zeros(len(session_row))
+    event_value[purchased] = np.round(np.maximum(10, 75 * np.exp(0.4 * z)), 2)
+
+    return pd.DataFrame({
+        'event_timestamp': start[session_row] + offset.astype('timedelta64[s]'),
+        'session_id': sessions['session_id'].to_numpy(dtype=object)[session_row],
+        'user_key': sessions['user_key'].to_numpy(dtype=object)[session_row],
+        'date_key': sessions['date_key'].to_numpy(dtype=np.int64)[session_row],
+        'campaign_key': sessions['campaign_key'].to_numpy(dtype=object)[session_row],
+        'funnel_step': np.asarray(FUNNEL_STEPS, dtype=object)[step_number - 1],
+        'funnel_step_number': step_number,
+        'step_completed': completed,
+        'event_value': event_value,
+    })
+
+
+def write_funnel_events(sessions: Union[pd.DataFrame, str], path: str, seed: int,
+                        chunker: Optional[AdaptiveChunker] = None,
+                        step_rates: Sequence[float] = DEFAULT_STEP_RATES) -> int:
+    """Stream funnel events for in-memory sessions or a sessions CSV to a CSV file.
+
+    Sessions are expanded one chunk at a time; the chunker is sized in sessions
+    and measures the sessions plus their events. Returns the events written.
+    """
+    chunker = chunker or AdaptiveChunker(initial_rows=DEFAULT_CHUNK_SESSIONS)
+    events_written = sessions_read = 0
+
+    with open_csv(path) as output:
+        pd.DataFrame(columns=FUNNEL_COLUMNS).to_csv(output, index=False)
+        for chunk in _session_chunks(sessions, chunker):
+            events = funnel_events(chunk, seed, step_rates)
+            events.to_csv(output, index=False, header=False)
+            chunker.observe(len(chunk), int(chunk.memory_usage(deep=True).sum()
+                                            + events.memory_usage(deep=True).sum()))
+            events_written += len(events)
+            sessions_read += len(chunk)
+
+    logger.info(f"💾 Saved {events_written:,} funnel events for {sessions_read:,} sessions to {path}")
+    return events_written
+
+
+def build_funnel_files(raw_path: str, seed: int, chunker: Optional[AdaptiveChunker] = None,
+                       compression: Optional[str] = None) -> int:
+    """Build fact_funnel_events.csv from the generated fact_web_analytics.csv"""
+    return write_funnel_events(data_file(raw_path, 'fact_web_analytics'),
+                               output_file(raw_path, FUNNEL_TABLE, compression), seed, chunker)
+
+
+def _session_chunks(sessions: Union[pd.DataFrame, str], chunker: AdaptiveChunker) -> Iterator[pd.DataFrame]:
+    """Session batches sized by the chunker, sliced from a frame or read from a CSV"""
+    if isinstance(sessions, pd.DataFrame):
+        start = 0
+        while start < len(sessions):
+            size = chunker.next_size()
+            yield sessions.iloc[start:start + size]
+            start += size
+        return
+
+    with pd.read_csv(sessions, usecols=SESSION_COLUMNS, parse_dates=['session_start_timestamp'],
+                     iterator=True) as reader:
+        while True:
+            try:
+                yield reader.get_chunk(chunker.next_size())
+            except StopIteration:
+                return
@@ -0,0 +1,274 @@
+"""
+Warehouse loader for the generated CSV files
+
+Tables are loaded in adaptive chunks, using COPY when bulk loading is enabled
+and multi-row INSERTs otherwise. Failed chunks are retried, independent tables
+(facts, then rollups) are loaded concurrently, and loaded tables are analyzed
+or vacuumed afterwards. All knobs come from ProcessingSettings.
+
+In 'merge' load mode each chunk is COPYed into a temporary staging table and
+applied with one INSERT ... ON CONFLICT on the table's natural key, in a single
+transaction. The staging table is private to that transaction's session and
+dropped on commit, so concurrent merge loads of the same table cannot touch
+each other's staged rows. Reloads and retried chunks update rows in place instead of
+duplicating facts or failing on dimension unique constraints.
+"""
+
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from .compression import data_file
+from .memory import AdaptiveChunker, CHUNK_FRACTION
+from .settings import LOAD_MODES, ProcessingSettings
+from .utils import ProgressLogger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ChunkCallback = Callable[[str, 'pd.DataFrame'], None]
+
+# Natural keys for merge loads; each has a unique constraint or index in create_tables.sql
+NATURAL_KEYS: Dict[str, Tuple[str, ...]] = {
+    'dim_date': ('date_key',),
+    'dim_campaign': ('source_campaign_id',),
+    'dim_geo': ('country_code', 'region', 'city'),
+    'dim_device': ('device_type', 'operating_system', 'browser'),
+    'dim_user': ('source_user_id_hashed',),
+    'fact_ad_performance': ('date_key', 'campaign_key', 'geo_key'),
+    'fact_web_analytics': ('session_id',),
+    'fact_conversions': ('conversion_id',),
+    'fact_funnel_events': ('session_id', 'funnel_step_number'),
+    'fact_customer_retention': ('user_key', 'period_number'),
+    'agg_daily_campaign_country': ('date_key', 'campaign_key', 'country_code'),
+    'agg_monthly_campaign': ('year', 'month', 'campaign_key'),
+    'agg_daily_platform': ('date_key', 'platform'),
+    'agg_campaign_attribution': ('date_key', 'campaign_key', 'attribution_model'),
+    'agg_ab_test_results': ('ab_test_id', 'metric', 'treatment_variant'),
+}
+# Surrogate primary keys that other tables reference; a merge keeps the warehouse's value
+SURROGATE_KEYS: Dict[str, str] = {
+    'dim_campaign': 'campaign_key',
+    'dim_geo': 'geo_key',
+    'dim_device': 'device_key',
+    'dim_user': 'user_key',
+    'fact_ad_performance': 'ad_performance_id',
+    'fact_web_analytics': 'web_analytics_id',
+    'fact_funnel_events': 'funnel_event_id',
+    'fact_customer_retention': 'retention_id',
+}
+# Nullable key columns are indexed as COALESCE(column, '') so NULLs still match
+NULLABLE_KEY_COLUMNS = {'region', 'city', 'operating_system', 'browser'}
+
+
+class TableLoader:
+    """Chunked, retrying CSV-to-Postgres loader driven by ProcessingSettings"""
+
+    def __init__(self, engine, settings: Optional[ProcessingSettings] = None,
+                 schema: str = "ad_dashboard", memory_budget: Optional[int] = None,
+                 load_mode: Optional[str] = None):
+        self.engine = engine
+        self.settings = settings or ProcessingSettings()
+        self.schema = schema
+        self.memory_budget = memory_budget
+        self.load_mode = load_mode or self.settings.load_mode
+        if self.load_mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode {self.load_mode!r}; expected one of {list(LOAD_MODES)}")
+
+    def load_tables(self, tables: Iterable[str], raw_path: str,
+                    on_chunk: Optional[ChunkCallback] = None,
+                    parallel: bool = False) -> Dict[str, int]:
+        """Load tables from raw_path, concurrently when parallel is set.
+
+        Returns rows loaded per table. A failed table aborts the load unless
+        error_handling.continue_on_error is set.
+        """
+        tables = [t for t in tables if self._csv_exists(raw_path, t)]
+        workers = min(self.settings.parallel_workers, len(tables)) if parallel else 1
+
+        if workers <= 1:
+            return {table: self._load_or_skip(table, raw_path, on_chunk, 1) for table in tables}
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='loader') as pool:
+            futures = {table: pool.submit(self._load_or_skip, table, raw_path, on_chunk, workers)
+                       for table in tables}
+            return {table: future.result() for table, future in futures.items()}
+
+    def load_csv(self, table: str, csv_file: str,
+                 on_chunk: Optional[ChunkCallback] = None, workers: int = 1) -> int:
+        """Load one CSV file into a table in adaptively sized chunks"""
+        import pandas as pd
+
+        logger.info(f"📥 Loading {table}...")
+        # Concurrent loads share the memory budget
+        batch_size = self.settings.batch_size
+        chunker = AdaptiveChunker(self.memory_budget, initial_rows=batch_size,
+                                  min_rows=min(100, batch_size),
+                                  chunk_fraction=CHUNK_FRACTION / workers)
+        progress = ProgressLogger(f"Loaded {table} rows", logger=logger)
+        if self.load_mode == 'merge':
+            natural_key(table)  # Fail before staging anything
+            write = self._merge_chunk
+        else:
+            write = self._copy_chunk if self.settings.performance.use_bulk_loading else self._insert_chunk
+
+        with pd.read_csv(csv_file, iterator=True) as reader:
+            while True:
+                try:
+                    chunk = reader.get_chunk(chunker.next_size())
+                except StopIteration:
+                    break
+                chunker.observe_frame(chunk)
+                self._with_retries(lambda: write(table, chunk), table)
+                if on_chunk is not None:
+                    on_chunk(table, chunk)
+                progress.update(len(chunk))
+
+        progress.done()
+        logger.info(f"✅ Loaded {progress.count:,} rows into {table}")
+        return progress.count
+
+    def optimize(self, tables: Iterable[str]):
+        """ANALYZE (or VACUUM ANALYZE) loaded tables per the performance settings"""
+        performance = self.settings.performance
+        if not (performance.optimize_after_load or performance.vacuum_after_load):
+            return
+
+        tables = list(tables)
+        command = "VACUUM ANALYZE" if performance.vacuum_after_load else "ANALYZE"
+        conn = self.engine.raw_connection()
+        try:
+            conn.autocommit = True  # VACUUM cannot run inside a transaction
+            with conn.cursor() as cursor:
+                for table in tables:
+                    cursor.execute(f"{command} {self.schema}.{table}")
+            logger.info(f"🧹 Ran {command} on {len(tables)} tables")
+        finally:
+            conn.close()
+
+    def _load_or_skip(self, table: str, raw_path: str,
+                      on_chunk: Optional[ChunkCallback], workers: int) -> int:
+        """Load a table, logging instead of raising when continue_on_error is set"""
+        try:
+            return self.load_csv(table, data_file(raw_path, table), on_chunk, workers)
+        except Exception as e:
+            if not self.settings.error_handling.continue_on_error:
+                raise
+            logger.error(f"❌ Skipping {table} after error: {str(e)}")
+            return 0
+
+    def _with_retries(self, operation: Callable[[], None], table: str):
+        """Run operation, retrying per error_handling settings"""
+        error_handling = self.settings.error_handling
+        for attempt in range(error_handling.max_retries + 1):
+            try:
+                return operation()
+            except Exception as e:
+                if attempt == error_handling.max_retries:
+                    raise
+                logger.warning(f"⚠️  Chunk for {table} failed ({str(e)}), retrying in "
+                               f"{error_handling.retry_delay_seconds}s "
+                               f"({attempt + 1}/{error_handling.max_retries})")
+                time.sleep(error_handling.retry_delay_seconds)
+
+    def _copy_chunk(self, table: str, chunk: 'pd.DataFrame'):
+        """Bulk load a chunk with COPY FROM STDIN"""
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        columns = ", ".join(chunk.columns)
+        conn = self.engine.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.copy_expert(
+                    f"COPY {self.schema}.{table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _merge_chunk(self, table: str, chunk: 'pd.DataFrame'):
+        """COPY a chunk into a transaction-scoped staging table and upsert it"""
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        columns = list(chunk.columns)
+        staging = self._staging(table)
+        conn = self.engine.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"CREATE TEMP TABLE {staging} (LIKE {self.schema}.{table} "
+                               f"INCLUDING DEFAULTS) ON COMMIT DROP")
+                cursor.copy_expert(
+                    f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+                cursor.execute(merge_sql(f"{self.schema}.{table}", staging, columns, natural_key(table),
+                                         preserved=[SURROGATE_KEYS[table]] if table in SURROGATE_KEYS else []))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _insert_chunk(self, table: str, chunk: 'pd.DataFrame'):
+        """Load a chunk with multi-row INSERTs"""
+        chunk.to_sql(
+            table,
+            self.engine,
+            schema=self.schema,
+            if_exists='append',
+            index=False,
+            method='multi'
+        )
+
+    @staticmethod
+    def _staging(table: str) -> str:
+        """Session-local temp table name; temp tables live in pg_temp, not the schema"""
+        return f"{table}_staging"
+
+    @staticmethod
+    def _csv_exists(raw_path: str, table: str) -> bool:
+        csv_file = data_file(raw_path, table)
+        if not os.path.exists(csv_file):
+            logger.warning(f"⚠️  File not found: {csv_file}")
+            return False
+        return True
+
+
+def natural_key(table: str) -> Tuple[str, ...]:
+    """Natural key columns a merge load upserts on"""
+    if table not in NATURAL_KEYS:
+        raise ValueError(f"No natural key defined for {table}; it cannot be loaded in merge mode")
+    return NATURAL_KEYS[table]
+
+
+def merge_sql(target: str, staging: str, columns: List[str], keys: Iterable[str],
+              preserved: Iterable[str] = ()) -> str:
+    """Set-based upsert of every staged row into target, updating non-key columns on conflict.
+
+    preserved columns (surrogate primary keys) are inserted for new rows but
+    never overwritten, so rows that reference them stay valid.
+    """
+    keys = list(keys)
+    missing = [key for key in keys if key not in columns]
+    if missing:
+        raise ValueError(f"Merge into {target} needs natural key columns {missing}")
+
+    column_list = ", ".join(columns)
+    conflict = ", ".join(f"(COALESCE({key}, ''))" if key in NULLABLE_KEY_COLUMNS else key for key in keys)
+    fixed = set(keys) | set(preserved)
+    updates = [f"{column} = EXCLUDED.{column}" for column in columns if column not in fixed]
+    action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+    return (f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT ({conflict}) {action}")
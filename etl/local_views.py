@@ -0,0 +1,441 @@
+"""
+Dashboard views computed locally from the generated files
+
+LocalBackend answers the same requests as the warehouse views in
+sql/views/dashboard_views.sql, using pandas group-bys over data/raw/ (or a
+columnar fact store). View logic and aggregation cost can then be checked
+without a PostgreSQL server. It plugs into DashboardQueries in place of
+WarehouseBackend and returns each view's columns in the view's order.
+
+Only the fact columns a view uses are read. A request's date range is pushed
+down to the facts: store partitions (months) outside the range are skipped,
+and CSV rows outside it are dropped chunk by chunk before any join.
+Dimensions are small; they are read once and reread only when their file
+changes.
+"""
+
+import logging
+import os
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .aggregations import METRIC_COLUMNS
+from .columnar_store import ColumnarStore
+from .compression import data_file
+from .queries import DASHBOARD_VIEWS, MAX_DATE_KEY, MIN_DATE_KEY, QueryRequest, date_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 1_000_000
+EXECUTIVE_WINDOW_DAYS = 30  # v_executive_summary: CURRENT_DATE - INTERVAL '30 days'
+
+AD_METRICS = list(METRIC_COLUMNS)
+
+VIEW_COLUMNS: Dict[str, list] = {
+    'v_daily_campaign_summary': [
+        'date_value', 'year', 'month', 'quarter', 'day_name', 'is_weekend',
+        'campaign_name', 'campaign_type', 'platform', 'campaign_status', 'country', 'is_emea', 'device_type',
+        'total_impressions', 'total_clicks', 'total_spend', 'total_conversions', 'total_revenue',
+        'ctr_percent', 'avg_cpc', 'avg_cpa', 'roas', 'record_count', 'last_updated',
+    ],
+    'v_monthly_campaign_summary': [
+        'year', 'month', 'month_name', 'quarter', 'campaign_name', 'campaign_type', 'platform',
+        'total_impressions', 'total_clicks', 'total_spend', 'total_conversions', 'total_revenue',
+        'avg_ctr', 'avg_cpc', 'avg_cpa', 'avg_roas', 'active_days', 'unique_geos', 'total_records',
+    ],
+    'v_ab_test_performance': [
+        'ab_test_id', 'ab_test_variant', 'campaign_name', 'campaign_type',
+        'test_start_date', 'test_end_date', 'test_days',
+        'total_impressions', 'total_clicks', 'total_spend', 'total_conversions', 'total_revenue',
+        'ctr_percent', 'cvr_percent', 'avg_cpc', 'avg_cpa', 'roas', 'sample_size', 'ctr_stddev', 'cpa_stddev',
+    ],
+    'v_emea_geo_performance': [
+        'country', 'country_code', 'currency_code', 'timezone', 'month_year',
+        'total_impressions', 'total_clicks', 'total_spend', 'total_conversions', 'total_revenue',
+        'ctr_percent', 'avg_cpc', 'avg_cpa', 'roas', 'active_campaigns', 'active_days', 'total_records',
+    ],
+    'v_web_analytics_daily': [
+        'date_value', 'day_name', 'is_weekend', 'campaign_name', 'campaign_type', 'country', 'device_type',
+        'total_sessions', 'unique_users', 'total_page_views', 'total_session_duration', 'total_goals',
+        'avg_pages_per_session', 'avg_session_duration', 'bounce_rate_percent',
+        'goal_conversion_rate_percent', 'sessions_per_user',
+    ],
+    'v_cohort_retention': [
+        'acquisition_year', 'acquisition_month', 'acquisition_month_name', 'period_number',
+        'active_users', 'total_transactions', 'total_revenue', 'avg_revenue_per_user', 'cohort_size',
+        'acquisition_campaign', 'acquisition_campaign_type',
+    ],
+    'v_conversion_funnel': [
+        'week_start', 'campaign_name', 'campaign_type', 'funnel_step', 'funnel_step_number',
+        'total_events', 'unique_sessions', 'unique_users', 'total_event_value',
+        'completed_events', 'completion_rate_percent',
+    ],
+    'v_executive_summary': [
+        'metric_category', 'total_campaigns', 'total_impressions', 'total_clicks', 'total_spend',
+        'total_conversions', 'total_revenue', 'avg_ctr', 'avg_roas', 'countries_reached', 'last_update_date',
+    ],
+    'agg_campaign_trends': [
+        'date_value', 'campaign_name', 'campaign_type', 'platform', 'impressions', 'clicks', 'spend',
+        'conversions', 'revenue', 'avg_ctr', 'avg_cpc', 'avg_cpa', 'avg_roas', 'refreshed_at',
+    ],
+}
+
+KeyRange = Tuple[int, int]
+
+
+class LocalBackend:
+    """Computes the dashboard views with pandas from raw CSVs and an optional columnar store"""
+
+    def __init__(self, raw_path: str, store_path: Optional[str] = None, chunksize: int = DEFAULT_CHUNKSIZE):
+        self.raw_path = raw_path
+        self.store = ColumnarStore(store_path) if store_path else None
+        self.chunksize = chunksize
+        self._dimensions: Dict[str, Tuple[int, pd.DataFrame]] = {}
+        self._signature = None
+        self._generation = 0
+
+    def query(self, request: QueryRequest) -> pd.DataFrame:
+        """Rows of the requested view"""
+        frame = VIEW_BUILDERS[request.view](self, request.date_key_range())[VIEW_COLUMNS[request.view]]
+
+        if request.start_date is not None or request.end_date is not None:
+            period = _period_start(request.view, frame)
+            keep = np.ones(len(frame), dtype=bool)
+            if request.start_date is not None:
+                keep &= (period >= pd.Timestamp(request.start_date)).to_numpy()
+            if request.end_date is not None:
+                keep &= (period <= pd.Timestamp(request.end_date)).to_numpy()
+            frame = frame[keep]
+        for column, choices in request.filters:
+            frame = frame[frame[column].isin(choices)]
+
+        if DASHBOARD_VIEWS[request.view].date_column is not None:
+            frame = frame.iloc[np.argsort(_period_start(request.view, frame).to_numpy(), kind='stable')]
+        return frame.reset_index(drop=True)
+
+    def load_generations(self, since: int):
+        """A new all-dates generation whenever the generated files change"""
+        signature = self._files_signature()
+        if signature != self._signature:
+            self._signature = signature
+            self._generation += 1
+        return [(self._generation, None, None)] if self._generation > since else []
+
+    def facts(self, table: str, columns: Iterable[str], key_range: KeyRange = (MIN_DATE_KEY, MAX_DATE_KEY),
+              date_column: str = 'date_key') -> pd.DataFrame:
+        """Columns of a fact table for rows whose date key falls in key_range"""
+        start_key, end_key = key_range
+        columns = list(dict.fromkeys([date_column, *columns]))
+        bounded = (start_key, end_key) != (MIN_DATE_KEY, MAX_DATE_KEY)
+
+        if self.store is not None and table in self.store.tables():
+            # Partitions are YYYYMM months; skip the ones outside the range
+            partitions = [p for p in self.store.partitions(table) if start_key // 100 <= int(p) <= end_key // 100]
+            if not partitions:
+                return pd.DataFrame(columns=columns)
+            frame = self.store.to_frame(table, columns, partitions)
+            keys = frame[date_column].to_numpy()
+            return frame[(keys >= start_key) & (keys <= end_key)] if bounded else frame
+
+        parts = []
+        with pd.read_csv(data_file(self.raw_path, table), usecols=columns,
+                         chunksize=self.chunksize) as reader:
+            for chunk in reader:
+                if bounded:
+                    keys = chunk[date_column].to_numpy()
+                    chunk = chunk[(keys >= start_key) & (keys <= end_key)]
+                parts.append(chunk)
+        return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+
+    def dimension(self, table: str) -> pd.DataFrame:
+        """A dimension table, reread only when its file changes"""
+        path = data_file(self.raw_path, table)
+        modified = os.stat(path).st_mtime_ns
+        cached = self._dimensions.get(table)
+        if cached is None or cached[0] != modified:
+            frame = pd.read_csv(path)
+            if 'date_value' in frame.columns:
+                frame['date_value'] = pd.to_datetime(frame['date_value'])
+            self._dimensions[table] = cached = (modified, frame)
+        return cached[1]
+
+    def _files_signature(self) -> Tuple:
+        """Modification times and sizes of the generated files"""
+        paths = []
+        if os.path.isdir(self.raw_path):
+            paths += [entry.path for entry in os.scandir(self.raw_path) if entry.name.endswith(('.csv', '.csv.gz'))]
+        if self.store is not None:
+            paths.append(os.path.join(self.store.root, 'manifest.json'))
+        stats = []
+        for path in sorted(paths):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                stats.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(stats)
+
+
+def daily_campaign_summary(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """v_daily_campaign_summary"""
+    facts = backend.facts('fact_ad_performance', ['campaign_key', 'geo_key', 'device_key', *AD_METRICS], key_range)
+    facts = _join(facts, backend.dimension('dim_date'), 'date_key',
+                  ['date_value', 'year', 'month', 'quarter', 'day_name', 'is_weekend'])
+    facts = _join(facts, backend.dimension('dim_campaign'), 'campaign_key',
+                  {'campaign_name': 'campaign_name', 'campaign_type': 'campaign_type',
+                   'platform': 'platform', 'status': 'campaign_status'})
+    facts = _join(facts, backend.dimension('dim_geo'), 'geo_key', ['country', 'is_emea'])
+    facts = _join(facts, backend.dimension('dim_device'), 'device_key', ['device_type'])
+
+    summary = _aggregate(facts, ['date_value', 'year', 'month', 'quarter', 'day_name', 'is_weekend',
+                                 'campaign_name', 'campaign_type', 'platform', 'campaign_status',
+                                 'country', 'is_emea', 'device_type'],
+                         **_metric_sums(), record_count=('date_key', 'size'))
+    return _ad_kpis(summary, zero_if_empty=True).assign(last_updated=pd.NaT)  # etl_timestamp is set by the load
+
+
+def monthly_campaign_summary(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """v_monthly_campaign_summary"""
+    facts = _row_kpis(backend.facts('fact_ad_performance', ['campaign_key', 'geo_key', *AD_METRICS], key_range))
+    facts = _join(facts, backend.dimension('dim_date'), 'date_key', ['year', 'month', 'month_name', 'quarter'])
+    facts = _join(facts, backend.dimension('dim_campaign'), 'campaign_key',
+                  ['campaign_name', 'campaign_type', 'platform'])
+
+    summary = _aggregate(facts, ['year', 'month', 'month_name', 'quarter',
+                                 'campaign_name', 'campaign_type', 'platform'],
+                         **_metric_sums(),
+                         avg_ctr=('ctr', 'mean'), avg_cpc=('cpc', 'mean'),
+                         avg_cpa=('cpa', 'mean'), avg_roas=('roas', 'mean'),
+                         active_days=('date_key', 'nunique'), unique_geos=('geo_key', 'nunique'),
+                         total_records=('date_key', 'size'))
+    return _round(summary, avg_ctr=4, avg_cpc=2, avg_cpa=2, avg_roas=2)
+
+
+def ab_test_performance(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """v_ab_test_performance"""
+    facts = backend.facts('fact_ad_performance', ['campaign_key', 'ab_test_id', 'ab_test_variant', *AD_METRICS],
+                          key_range)
+    facts = _row_kpis(facts[facts['ab_test_id'].notna()])
+    facts = _join(facts, backend.dimension('dim_date'), 'date_key', ['date_value'])
+    facts = _join(facts, backend.dimension('dim_campaign'), 'campaign_key', ['campaign_name', 'campaign_type'])
+
+    summary = _aggregate(facts, ['ab_test_id', 'ab_test_variant', 'campaign_name', 'campaign_type'],
+                         test_start_date=('date_value', 'min'), test_end_date=('date_value', 'max'),
+                         test_days=('date_value', 'nunique'), **_metric_sums(),
+                         sample_size=('date_key', 'size'),
+                         ctr_stddev=('ctr', 'std'), cpa_stddev=('cpa', 'std'))
+    summary = _ad_kpis(summary, zero_if_empty=False)
+    summary['cvr_percent'] = _ratio(summary['total_conversions'], summary['total_clicks'], 100, 4, False)
+    return summary
+
+
+def emea_geo_performance(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """v_emea_geo_performance"""
+    geo = backend.dimension('dim_geo')
+    facts = backend.facts('fact_ad_performance', ['campaign_key', 'geo_key', *AD_METRICS], key_range)
+    facts = _join(facts, geo[geo['is_emea'].astype(bool)], 'geo_key',
+                  ['country', 'country_code', 'currency_code', 'timezone'])
+    facts = _join(facts, backend.dimension('dim_date'), 'date_key', ['date_value'])
+    facts = _join(facts, backend.dimension('dim_campaign'), 'campaign_key', [])
+    facts['month_year'] = facts['date_value'].dt.to_period('M').dt.start_time
+
+    summary = _aggregate(facts, ['country', 'country_code', 'currency_code', 'timezone', 'month_year'],
+                         **_metric_sums(),
+                         active_campaigns=('campaign_key', 'nunique'), active_days=('date_key', 'nunique'),
+                         total_records=('date_key', 'size'))
+    return _ad_kpis(summary, zero_if_empty=False)
+
+
+def web_analytics_daily(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """v_web_analytics_daily"""
+    facts = backend.facts('fact_web_analytics', [
+        'session_id', 'user_key', 'campaign_key', 'geo_key', 'device_key',
+        'page_views', 'session_duration_seconds', 'is_bounce', 'goals_completed',
+    ], key_range)
+    facts = _join(facts, backend.dimension('dim_date'), 'date_key', ['date_value', 'day_name', 'is_weekend'])
+    facts = _join(facts, backend.dimension('dim_campaign'), 'campaign_key', ['campaign_name', 'campaign_type'],
+                  how='left')
+    facts = _join(facts, backend.dimension('dim_geo'), 'geo_key', ['country'])
+    facts = _join(facts, backend.dimension('dim_device'), 'device_key', ['device_type'])
+    facts['is_bounce'] = facts['is_bounce'].astype(bool)
+
+    summary = _aggregate(facts, ['date_value', 'day_name', 'is_weekend', 'campaign_name', 'campaign_type',
+                                 'country', 'device_type'],
+                         total_sessions=('session_id', 'nunique'), unique_users=('user_key', 'nunique'),
+                         total_page_views=('page_views', 'sum'),
+                         total_session_duration=('session_duration_seconds', 'sum'),
+                         total_goals=('goals_completed', 'sum'),
+                         avg_pages_per_session=('page_views', 'mean'),
+                         avg_session_duration=('session_duration_seconds', 'mean'),
+                         bounces=('is_bounce', 'sum'), rows=('session_id', 'size'))
+    summary['bounce_rate_percent'] = _ratio(summary['bounces'], summary['rows'], 100, 2, False)
+    summary['goal_conversion_rate_percent'] = _ratio(summary['total_goals'], summary['total_sessions'], 100, 2, False)
+    summary['sessions_per_user'] = _ratio(summary['unique_users'], summary['total_sessions'], 1, 2, False)
+    return _round(summary, avg_pages_per_session=2, avg_session_duration=0)
+
+
+def cohort_retention(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """v_cohort_retention"""
+    facts = backend.facts('fact_customer_retention', [
+        'user_key', 'acquisition_campaign_key', 'period_number', 'is_active',
+        'transactions_count', 'revenue_amount',
+    ], date_column='acquisition_date_key')
+    facts = facts[facts['is_active'].astype(bool)]
+    facts = _join(facts, backend.dimension('dim_date'), 'acquisition_date_key',
+                  {'year': 'acquisition_year', 'month': 'acquisition_month', 'month_name': 'acquisition_month_name'},
+                  dim_key='date_key')
+    facts = _join(facts, backend.dimension('dim_campaign'), 'acquisition_campaign_key',
+                  {'campaign_name': 'acquisition_campaign', 'campaign_type': 'acquisition_campaign_type'},
+                  dim_key='campaign_key', how='left')
+
+    summary = _aggregate(facts, ['acquisition_year', 'acquisition_month', 'acquisition_month_name',
+                                 'period_number', 'acquisition_campaign', 'acquisition_campaign_type'],
+                         active_users=('user_key', 'nunique'),
+                         total_transactions=('transactions_count', 'sum'),
+                         total_revenue=('revenue_amount', 'sum'),
+                         avg_revenue_per_user=('revenue_amount', 'mean'))
+    # Periods are grouped separately, so only period 0 counts its users as the cohort
+    summary['cohort_size'] = np.where(summary['period_number'] == 0, summary['active_users'], 0)
+    return _round(summary, total_revenue=2, avg_revenue_per_user=2)
+
+
+def conversion_funnel(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """v_conversion_funnel"""
+    facts = backend.facts('fact_funnel_events', [
+        'session_id', 'user_key', 'campaign_key', 'funnel_step', 'funnel_step_number',
+        'step_completed', 'event_value',
+    ], key_range)
+    facts = _join(facts, backend.dimension('dim_date'), 'date_key', ['date_value'])
+    facts = _join(facts, backend.dimension('dim_campaign'), 'campaign_key', ['campaign_name', 'campaign_type'],
+                  how='left')
+    # DATE_TRUNC('week') starts weeks on Monday
+    facts['week_start'] = facts['date_value'] - pd.to_timedelta(facts['date_value'].dt.weekday, unit='D')
+    facts['step_completed'] = facts['step_completed'].astype(bool)
+
+    summary = _aggregate(facts, ['week_start', 'campaign_name', 'campaign_type', 'funnel_step', 'funnel_step_number'],
+                         total_events=('session_id', 'size'), unique_sessions=('session_id', 'nunique'),
+                         unique_users=('user_key', 'nunique'), total_event_value=('event_value', 'sum'),
+                         completed_events=('step_completed', 'sum'))
+    summary['completion_rate_percent'] = _ratio(summary['completed_events'], summary['total_events'], 100, 2, False)
+    return _round(summary, total_event_value=2)
+
+
+def executive_summary(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """v_executive_summary (the last 30 days up to today)"""
+    since = date_key(date.today() - timedelta(days=EXECUTIVE_WINDOW_DAYS))
+    facts = _row_kpis(backend.facts('fact_ad_performance', ['campaign_key', 'geo_key', *AD_METRICS],
+                                    (since, MAX_DATE_KEY)))
+    facts = _join(facts, backend.dimension('dim_date'), 'date_key', ['date_value'])
+    facts = _join(facts, backend.dimension('dim_campaign'), 'campaign_key', [])
+    facts = _join(facts, backend.dimension('dim_geo'), 'geo_key', ['country'])
+
+    # An aggregate without GROUP BY returns one row, with NULL sums when nothing matches
+    empty = facts.empty
+    summary = pd.DataFrame({
+        'metric_category': ['Campaign Performance'],
+        'total_campaigns': [facts['campaign_key'].nunique()],
+        **{name: [np.nan if empty else facts[column].sum()] for column, name in METRIC_COLUMNS.items()},
+        'avg_ctr': [facts['ctr'].mean()],
+        'avg_roas': [facts['roas'].mean()],
+        'countries_reached': [facts['country'].nunique()],
+        'last_update_date': [facts['date_value'].max()],
+    })
+    return _round(summary, total_spend=2, total_revenue=2, avg_ctr=2, avg_roas=2)
+
+
+def campaign_trends(backend: LocalBackend, key_range: KeyRange) -> pd.DataFrame:
+    """agg_campaign_trends (as rebuilt by etl/refresh.py)"""
+    facts = _row_kpis(backend.facts('fact_ad_performance', ['campaign_key', *AD_METRICS], key_range))
+    facts = _join(facts, backend.dimension('dim_date'), 'date_key', ['date_value'])
+    facts = _join(facts, backend.dimension('dim_campaign'), 'campaign_key',
+                  ['campaign_name', 'campaign_type', 'platform'])
+    facts['platform'] = facts['platform'].fillna('Unknown')
+
+    summary = _aggregate(facts, ['date_value', 'campaign_name', 'campaign_type', 'platform'],
+                         impressions=('impressions', 'sum'), clicks=('clicks', 'sum'), spend=('spend', 'sum'),
+                         conversions=('attributed_conversions', 'sum'), revenue=('attributed_revenue', 'sum'),
+                         avg_ctr=('ctr', 'mean'), avg_cpc=('cpc', 'mean'),
+                         avg_cpa=('cpa', 'mean'), avg_roas=('roas', 'mean'))
+    summary = _round(summary, spend=2, revenue=2, avg_ctr=4, avg_cpc=4, avg_cpa=4, avg_roas=4)
+    return summary.assign(refreshed_at=pd.Timestamp.now())
+
+
+VIEW_BUILDERS: Dict[str, Callable[[LocalBackend, KeyRange], pd.DataFrame]] = {
+    'v_daily_campaign_summary': daily_campaign_summary,
+    'v_monthly_campaign_summary': monthly_campaign_summary,
+    'v_ab_test_performance': ab_test_performance,
+    'v_emea_geo_performance': emea_geo_performance,
+    'v_web_analytics_daily': web_analytics_daily,
+    'v_cohort_retention': cohort_retention,
+    'v_conversion_funnel': conversion_funnel,
+    'v_executive_summary': executive_summary,
+    'agg_campaign_trends': campaign_trends,
+}
+
+def _join(facts: pd.DataFrame, dimension: pd.DataFrame, key: str,
+          columns: Union[Iterable[str], Dict[str, str]], dim_key: Optional[str] = None,
+          how: str = 'inner') -> pd.DataFrame:
+    """Attach dimension columns to fact rows; an inner join drops rows without a match"""
+    columns = columns if isinstance(columns, dict) else {column: column for column in columns}
+    dimension = dimension.reset_index(drop=True)
+    position = pd.Index(dimension[dim_key or key]).get_indexer(facts[key])
+    if how == 'inner':
+        facts = facts[position >= 0]
+        position = position[position >= 0]
+    facts = facts.reset_index(drop=True)
+    for column, name in columns.items():
+        # Position -1 (no match in a left join) reindexes to a null
+        facts[name] = dimension[column].reindex(position).to_numpy()
+    return facts
+
+
+def _aggregate(frame: pd.DataFrame, keys: list, **aggregations) -> pd.DataFrame:
+    """GROUP BY keys (NULL keys form their own groups, as in SQL)"""
+    return frame.groupby(keys, sort=True, dropna=False, observed=True).agg(**aggregations).reset_index()
+
+
+def _metric_sums() -> Dict[str, tuple]:
+    """Named aggregations summing every ad metric into its total_ column"""
+    return {name: (column, 'sum') for column, name in METRIC_COLUMNS.items()}
+
+
+def _row_kpis(facts: pd.DataFrame) -> pd.DataFrame:
+    """fact_ad_performance's generated ctr, cpc, cpa and roas columns"""
+    facts = facts.copy()
+    facts['ctr'] = _ratio(facts['clicks'], facts['impressions'], 100, 4, True)
+    facts['cpc'] = _ratio(facts['spend'], facts['clicks'], 1, 2, True)
+    facts['cpa'] = _ratio(facts['spend'], facts['attributed_conversions'], 1, 2, True)
+    facts['roas'] = _ratio(facts['attributed_revenue'], facts['spend'], 1, 2, True)
+    return facts
+
+
+def _ad_kpis(summary: pd.DataFrame, zero_if_empty: bool) -> pd.DataFrame:
+    """Ratio KPIs of summed ad metrics; without a CASE guard a zero denominator gives NULL"""
+    summary = _round(summary, total_spend=2, total_revenue=2)
+    summary['ctr_percent'] = _ratio(summary['total_clicks'], summary['total_impressions'], 100, 4, zero_if_empty)
+    summary['avg_cpc'] = _ratio(summary['total_spend'], summary['total_clicks'], 1, 2, zero_if_empty)
+    summary['avg_cpa'] = _ratio(summary['total_spend'], summary['total_conversions'], 1, 2, zero_if_empty)
+    summary['roas'] = _ratio(summary['total_revenue'], summary['total_spend'], 1, 2, zero_if_empty)
+    return summary
+
+
+def _ratio(numerator: pd.Series, denominator: pd.Series, scale: float, decimals: int,
+           zero_if_empty: bool) -> np.ndarray:
+    """Rounded numerator * scale / denominator; 0 or NaN where the denominator is 0"""
+    num = numerator.to_numpy(dtype=float)
+    den = denominator.to_numpy(dtype=float)
+    out = np.zeros_like(num) if zero_if_empty else np.full_like(num, np.nan)
+    return np.round(np.divide(num * scale, den, out=out, where=den > 0), decimals)
+
+
+def _round(frame: pd.DataFrame, **decimals) -> pd.DataFrame:
+    """Round the named columns to the view's decimal places"""
+    return frame.round(decimals)
+
+
+def _period_start(view: str, frame: pd.DataFrame) -> pd.Series:
+    """First day of each row's period, matching the view's ViewSpec.date_column"""
+    if view == 'v_monthly_campaign_summary':
+        return pd.to_datetime(pd.DataFrame({'year': frame['year'], 'month': frame['month'], 'day': 1}))
+    return pd.to_datetime(frame[DASHBOARD_VIEWS[view].date_column])
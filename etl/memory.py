@@ -0,0 +1,104 @@
+"""
+Memory-aware chunk sizing
+
+Row widths differ by an order of magnitude between tables (dim_date versus
+fact_web_analytics with its UUID strings), so a fixed chunk size is either
+wasteful or risky. AdaptiveChunker measures the bytes per row of the chunks it
+has seen and the live process RSS, and sizes the next chunk so it fits in a
+fraction of the remaining headroom under a memory budget: chunks grow while
+there is room and shrink as soon as memory pressure rises.
+"""
+
+import logging
+import os
+import re
+import sys
+from typing import Callable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = int(os.getenv('ETL_BATCH_SIZE', '10000'))
+
+# Share of the free budget one chunk may use; reading, converting and writing a
+# chunk holds several copies of it at once.
+CHUNK_FRACTION = 0.25
+
+_SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
+def parse_memory_size(value: str) -> int:
+    """Parse sizes like '512MB', '2G' or '1073741824' into bytes"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid memory size: {value!r}")
+    number, unit = match.groups()
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        # Live RSS on Linux: second field of statm, in pages
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        # Peak RSS elsewhere (KB on Linux, bytes on macOS) - conservative but safe
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class AdaptiveChunker:
+    """Sizes successive chunks from measured row width and live RSS"""
+
+    def __init__(self, budget_bytes: Optional[int] = None,
+                 initial_rows: int = DEFAULT_CHUNK_ROWS,
+                 min_rows: int = 100,
+                 max_rows: int = 1_000_000,
+                 rss_reader: Callable[[], int] = current_rss_bytes,
+                 chunk_fraction: float = CHUNK_FRACTION):
+        self.budget_bytes = budget_bytes
+        self.chunk_fraction = chunk_fraction
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.rss_reader = rss_reader
+        self.rows = max(min_rows, min(initial_rows, max_rows))
+        self.bytes_per_row: Optional[float] = None
+
+    def observe(self, rows: int, nbytes: int):
+        """Record the size of a processed chunk (smoothed bytes per row)"""
+        if rows <= 0:
+            return
+        measured = nbytes / rows
+        if self.bytes_per_row is None:
+            self.bytes_per_row = measured
+        else:
+            self.bytes_per_row = 0.7 * self.bytes_per_row + 0.3 * measured
+
+    def observe_frame(self, df: 'pd.DataFrame'):
+        """Record the in-memory size of a DataFrame chunk"""
+        self.observe(len(df), int(df.memory_usage(deep=True).sum()))
+
+    def next_size(self) -> int:
+        """Rows for the next chunk"""
+        if self.budget_bytes is None or self.bytes_per_row is None:
+            return self.rows
+
+        headroom = self.budget_bytes - self.rss_reader()
+        if headroom <= 0:
+            # Over budget: back off multiplicatively until pressure drops
+            target = self.rows // 2
+        else:
+            target = int(headroom * self.chunk_fraction / max(self.bytes_per_row, 1.0))
+            # Grow gradually so one optimistic reading cannot overshoot
+            target = min(target, self.rows * 2)
+
+        target = max(self.min_rows, min(target, self.max_rows))
+        if target != self.rows:
+            logger.debug(f"Chunk size {self.rows:,} -> {target:,} rows "
+                         f"({self.bytes_per_row:.0f} B/row, headroom {headroom / 1024 ** 2:.0f} MB)")
+        self.rows = target
+        return target
@@ -0,0 +1,413 @@
+"""
+Cached query layer for the dashboard views
+
+Dashboard services read the views in sql/views/dashboard_views.sql through
+DashboardQueries instead of querying them directly. Results are cached by
+view and parameters, in memory (least-recently-used first out) and optionally
+on disk, so repeated hits do not re-aggregate the fact tables.
+
+The data only changes when run_etl.py loads a batch. Each load takes the next
+load generation and records the date ranges it touched in load_generations.
+Before answering, the query layer fetches the generations it has not seen yet
+(usually none). A cached result is stale only if a newer generation overlaps
+the dates the result covers. Views that are not filtered by date are
+invalidated by every load.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_DISK_ENTRIES = 4096
+MIN_DATE_KEY, MAX_DATE_KEY = 0, 99_991_231  # Open ends of a date range
+DATE_KEY_COLUMNS = ('date_key', 'retention_date_key')
+
+RECORD_GENERATION_SQL = """
+WITH next_generation AS (SELECT nextval('{schema}.load_generation_seq') AS generation)
+INSERT INTO {schema}.load_generations (generation, start_date_key, end_date_key)
+SELECT generation, start_date_key, end_date_key
+FROM next_generation, UNNEST(%(starts)s::INTEGER[], %(ends)s::INTEGER[]) AS ranges(start_date_key, end_date_key)
+RETURNING generation
+"""
+
+GENERATIONS_SQL = """
+SELECT generation, start_date_key, end_date_key
+FROM {schema}.load_generations
+WHERE generation > %(since)s
+ORDER BY generation
+"""
+
+
+@dataclass(frozen=True)
+class ViewSpec:
+    """How a view can be filtered: its period column and grain, and the columns callers may filter on"""
+    date_column: Optional[str] = None  # SQL expression for the first day of each row's period
+    grain: Optional[str] = None  # 'day', 'week' or 'month'
+    filters: Tuple[str, ...] = ()
+    as_of_today: bool = False  # Depends on CURRENT_DATE, so results expire daily
+
+
+DASHBOARD_VIEWS: Dict[str, ViewSpec] = {
+    'v_daily_campaign_summary': ViewSpec(
+        'date_value', 'day',
+        ('campaign_name', 'campaign_type', 'platform', 'campaign_status', 'country', 'is_emea', 'device_type'),
+    ),
+    'v_monthly_campaign_summary': ViewSpec(
+        'MAKE_DATE(year, month, 1)', 'month', ('campaign_name', 'campaign_type', 'platform'),
+    ),
+    'v_ab_test_performance': ViewSpec(filters=('ab_test_id', 'ab_test_variant', 'campaign_name', 'campaign_type')),
+    'v_emea_geo_performance': ViewSpec('month_year', 'month', ('country', 'country_code', 'currency_code')),
+    'v_web_analytics_daily': ViewSpec(
+        'date_value', 'day', ('campaign_name', 'campaign_type', 'country', 'device_type'),
+    ),
+    'v_cohort_retention': ViewSpec(filters=(
+        'acquisition_year', 'acquisition_month', 'period_number', 'acquisition_campaign', 'acquisition_campaign_type',
+    )),
+    'v_conversion_funnel': ViewSpec('week_start', 'week', ('campaign_name', 'campaign_type', 'funnel_step')),
+    'v_executive_summary': ViewSpec(as_of_today=True),
+    'agg_campaign_trends': ViewSpec('date_value', 'day', ('campaign_name', 'campaign_type', 'platform')),
+}
+
+
+@dataclass(frozen=True)
+class QueryRequest:
+    """A view, an optional period range and column filters (column -> allowed values)"""
+    view: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    filters: Tuple[Tuple[str, Tuple], ...] = ()
+    as_of: Optional[date] = None
+
+    @property
+    def spec(self) -> ViewSpec:
+        return DASHBOARD_VIEWS[self.view]
+
+    @property
+    def key(self) -> str:
+        """Cache key of the request"""
+        payload = json.dumps([self.view, self.start_date, self.end_date, self.filters, self.as_of], default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def date_key_range(self) -> Tuple[int, int]:
+        """First and last date key the result can aggregate over"""
+        spec = self.spec
+        if spec.date_column is None:
+            return MIN_DATE_KEY, MAX_DATE_KEY
+        start = date_key(self.start_date) if self.start_date else MIN_DATE_KEY
+        # Rows are selected by period start, so the last period extends past end_date
+        end = date_key(period_end(self.end_date, spec.grain)) if self.end_date else MAX_DATE_KEY
+        return start, end
+
+
+@dataclass
+class CachedResult:
+    """A query result and the load generation it was read at"""
+    frame: pd.DataFrame
+    generation: int
+    start_key: int
+    end_key: int
+    cached_at: float = field(default_factory=time.time)
+
+
+def query_request(view: str, start_date=None, end_date=None, **filters) -> QueryRequest:
+    """Validate a view query and normalize its parameters"""
+    spec = DASHBOARD_VIEWS.get(view)
+    if spec is None:
+        raise ValueError(f"Unknown dashboard view {view!r}; expected one of {sorted(DASHBOARD_VIEWS)}")
+    if spec.date_column is None and (start_date is not None or end_date is not None):
+        raise ValueError(f"{view} cannot be filtered by date")
+    unknown = sorted(set(filters) - set(spec.filters))
+    if unknown:
+        raise ValueError(f"{view} cannot be filtered on {unknown}; allowed: {list(spec.filters)}")
+
+    values = {}
+    for column, value in filters.items():
+        if value is None:
+            continue
+        choices = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        values[column] = tuple(sorted(set(choices), key=repr))
+    return QueryRequest(
+        view=view,
+        start_date=_as_date(start_date),
+        end_date=_as_date(end_date),
+        filters=tuple(sorted(values.items())),
+        as_of=date.today() if spec.as_of_today else None,
+    )
+
+
+def view_sql(request: QueryRequest, schema: str = "ad_dashboard") -> Tuple[str, Dict]:
+    """SELECT statement and parameters for a request against the warehouse view"""
+    spec = request.spec
+    conditions, params = [], {}
+    if request.start_date is not None:
+        conditions.append(f"{spec.date_column} >= %(start_date)s")
+        params['start_date'] = request.start_date
+    if request.end_date is not None:
+        conditions.append(f"{spec.date_column} <= %(end_date)s")
+        params['end_date'] = request.end_date
+    for column, choices in request.filters:
+        # Column names are checked against ViewSpec.filters, values are bound
+        conditions.append(f"{column} = ANY(%({column})s)")
+        params[column] = list(choices)
+
+    where_clause = f"\nWHERE {' AND '.join(conditions)}" if conditions else ""
+    order_clause = f"\nORDER BY {spec.date_column}" if spec.date_column else ""
+    return f"SELECT *\nFROM {schema}.{request.view}{where_clause}{order_clause}", params
+
+
+class WarehouseBackend:
+    """Runs dashboard view queries and reads load generations in PostgreSQL"""
+
+    def __init__(self, connect: Callable, schema: str = "ad_dashboard"):
+        self.connect = connect
+        self.schema = schema
+
+    def query(self, request: QueryRequest) -> pd.DataFrame:
+        """Rows of the requested view"""
+        sql, params = view_sql(request, self.schema)
+        columns, rows = self._fetch(sql, params)
+        return pd.DataFrame(rows, columns=columns)
+
+    def load_generations(self, since: int) -> List[Tuple[int, Optional[int], Optional[int]]]:
+        """(generation, start_date_key, end_date_key) rows recorded after generation `since`"""
+        _, rows = self._fetch(GENERATIONS_SQL.format(schema=self.schema), {'since': since})
+        return [tuple(row) for row in rows]
+
+    def _fetch(self, sql: str, params: Dict) -> Tuple[List[str], List[Tuple]]:
+        """Column names and rows of a query on a fresh connection"""
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                return [column[0] for column in cursor.description], cursor.fetchall()
+        finally:
+            conn.close()
+
+
+class DashboardQueries:
+    """Dashboard view queries served from an LRU (and optional on-disk) cache.
+
+    The backend needs query(request) -> DataFrame and load_generations(since).
+    poll_interval throttles the generation check for busy services; results
+    can then lag a load by up to that many seconds.
+    """
+
+    def __init__(self, backend, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[str] = None,
+                 max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES, poll_interval: float = 0.0):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.poll_interval = poll_interval
+        self.hits = self.misses = 0
+        self._entries: 'OrderedDict[str, CachedResult]' = OrderedDict()
+        self._changes: List[Tuple[int, int, int]] = []  # Generations seen by this process
+        self._generation = 0
+        self._polled_at: Optional[float] = None
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def query(self, view: str, start_date=None, end_date=None, **filters) -> pd.DataFrame:
+        """Rows of a dashboard view for a period range and column filters"""
+        request = query_request(view, start_date, end_date, **filters)
+        generation = self.refresh_generations()
+
+        entry = self._lookup(request.key)
+        if entry is not None:
+            self.hits += 1
+            return entry.frame.copy()
+
+        self.misses += 1
+        start = time.perf_counter()
+        frame = self.backend.query(request)
+        logger.debug(f"{view}: {len(frame):,} rows in {time.perf_counter() - start:.3f}s")
+        self._store(request.key, CachedResult(frame, generation, *request.date_key_range()))
+        return frame.copy()
+
+    def refresh_generations(self) -> int:
+        """Fetch load generations recorded since the last poll; returns the latest"""
+        now = time.monotonic()
+        with self._lock:
+            if self._polled_at is not None and now - self._polled_at < self.poll_interval:
+                return self._generation
+            since = self._generation
+
+        changes = self.backend.load_generations(since)
+        with self._lock:
+            for generation, start_key, end_key in changes:
+                self._changes.append((int(generation),
+                                      MIN_DATE_KEY if start_key is None else int(start_key),
+                                      MAX_DATE_KEY if end_key is None else int(end_key)))
+                self._generation = max(self._generation, int(generation))
+            self._polled_at = now
+            if changes:
+                dropped = [key for key, entry in self._entries.items() if self._is_stale(entry)]
+                for key in dropped:
+                    del self._entries[key]
+                if dropped:
+                    logger.info(f"♻️  Load generation {self._generation}: dropped {len(dropped)} cached results")
+            return self._generation
+
+    def clear(self):
+        """Drop every cached result, in memory and on disk"""
+        with self._lock:
+            self._entries.clear()
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.pkl'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def _lookup(self, key: str) -> Optional[CachedResult]:
+        """Fresh cached result for key, from memory then disk"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = self._read_disk(key)
+        if entry is None:
+            return None
+        with self._lock:
+            stale = self._is_stale(entry)
+            if not stale:
+                self._remember(key, entry)
+        if stale:
+            self._remove_disk(key)
+            return None
+        return entry
+
+    def _store(self, key: str, entry: CachedResult):
+        """Cache a result in memory and, if configured, on disk"""
+        with self._lock:
+            self._remember(key, entry)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            pd.to_pickle(entry, tmp_path)
+            os.replace(tmp_path, path)  # Readers never see a partial file
+            self._evict_disk()
+
+    def _remember(self, key: str, entry: CachedResult):
+        """Insert into the in-memory LRU (lock held)"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _is_stale(self, entry: CachedResult) -> bool:
+        """Whether a newer load touched the dates the result covers (lock held)"""
+        return any(generation > entry.generation and start_key <= entry.end_key and end_key >= entry.start_key
+                   for generation, start_key, end_key in self._changes)
+
+    def _read_disk(self, key: str) -> Optional[CachedResult]:
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            entry = pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # Record the access for eviction
+        return entry
+
+    def _remove_disk(self, key: str):
+        try:
+            os.remove(self._disk_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict_disk(self):
+        """Remove least-recently-used result files beyond max_disk_entries"""
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.pkl')]
+        if len(paths) <= self.max_disk_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_disk_entries]:
+            os.remove(path)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+
+def chunk_date_keys(chunk: pd.DataFrame) -> Set[int]:
+    """Date keys present in a loaded chunk"""
+    keys: Set[int] = set()
+    for column in DATE_KEY_COLUMNS:
+        if column in chunk.columns:
+            keys.update(int(k) for k in chunk[column].dropna().unique())
+    return keys
+
+
+def date_ranges(date_keys: Iterable[int]) -> List[Tuple[int, int]]:
+    """Runs of consecutive days in a set of YYYYMMDD keys, as (first, last) key pairs"""
+    days = sorted({_key_date(int(k)) for k in date_keys})
+    ranges: List[Tuple[int, int]] = []
+    for day in days:
+        if ranges and _key_date(ranges[-1][1]) + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], date_key(day))
+        else:
+            ranges.append((date_key(day), date_key(day)))
+    return ranges
+
+
+def record_load_generation(conn, date_keys: Iterable[int], schema: str = "ad_dashboard",
+                           all_dates: bool = False) -> int:
+    """Start a new load generation covering the loaded dates (all dates if none are known)
+
+    all_dates records an unbounded generation, for loads that change dimension
+    rows every cached result may join to.
+    """
+    ranges = [] if all_dates else date_ranges(date_keys)
+    ranges = ranges or [(None, None)]
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(RECORD_GENERATION_SQL.format(schema=schema),
+                           {'starts': [start for start, _ in ranges], 'ends': [end for _, end in ranges]})
+            generation = cursor.fetchone()[0]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info(f"🔖 Load generation {generation} covers {len(ranges)} date ranges")
+    return generation
+
+
+def date_key(day: date) -> int:
+    """YYYYMMDD key of a date"""
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+def period_end(day: date, grain: str) -> date:
+    """Last day of the period (day, week or month) starting on or containing day"""
+    if grain == 'week':
+        return day + timedelta(days=6)
+    if grain == 'month':
+        next_month = date(day.year + day.month // 12, day.month % 12 + 1, 1)
+        return next_month - timedelta(days=1)
+    return day
+
+
+def _key_date(key: int) -> date:
+    return date(key // 10000, key // 100 % 100, key % 100)
+
+
+def _as_date(value) -> Optional[date]:
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
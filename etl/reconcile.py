@@ -0,0 +1,218 @@
+"""
+Source vs warehouse reconciliation by partition fingerprints
+
+Both sides reduce every fact table to one fingerprint per partition (month,
+or day, of the partition date key):
+
+- the row count
+- the sum of each metric in integer units (cents for money)
+- an order-independent hash: the sum, modulo 2**64, of the first 60 bits of
+  md5 over the row's key columns joined with '|'
+
+The warehouse side is a single GROUP BY in SQL. The source side streams the
+generated CSVs in chunks. Matching fingerprints mean the partition holds the
+same rows with the same totals. A missing, extra, duplicated or altered row
+changes its partition's fingerprint, so only the mismatched partitions need
+reloading. Neither side needs a row-by-row diff.
+
+The generated files are one batch while the warehouse is cumulative, so the
+warehouse side only covers the batch's first to last partition date. A month
+the batch covers only in part (its first or last month) is compared day by
+day, since other batches hold the rest of it; such partitions are YYYYMMDD
+keys among the YYYYMM ones.
+"""
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compression import data_file
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {'month': 100, 'day': 1}  # Divisor turning a YYYYMMDD key into the partition
+HASH_MODULUS = 2 ** 64
+REPORT_FILE = 'reconciliation_report.csv'
+
+
+@dataclass(frozen=True)
+class ReconcileSpec:
+    """Key columns, metrics (column -> integer scale) and partition column of a table"""
+    keys: Tuple[str, ...]
+    metrics: Dict[str, int] = field(default_factory=dict)
+    partition_column: str = 'date_key'
+
+
+RECONCILE_TABLES: Dict[str, ReconcileSpec] = {
+    'fact_ad_performance': ReconcileSpec(
+        ('date_key', 'campaign_key', 'geo_key'),
+        {'impressions': 1, 'clicks': 1, 'spend': 100, 'attributed_conversions': 1, 'attributed_revenue': 100},
+    ),
+    'fact_web_analytics': ReconcileSpec(
+        ('session_id',), {'page_views': 1, 'session_duration_seconds': 1, 'goals_completed': 1},
+    ),
+    'fact_conversions': ReconcileSpec(('conversion_id',), {'conversion_value': 100, 'quantity': 1}),
+    'fact_funnel_events': ReconcileSpec(('session_id', 'funnel_step_number'), {'event_value': 100}),
+    'fact_customer_retention': ReconcileSpec(
+        ('user_key', 'period_number'), {'transactions_count': 1, 'revenue_amount': 100},
+        partition_column='retention_date_key',
+    ),
+}
+
+
+def fingerprint_frame(df: pd.DataFrame, spec: ReconcileSpec, granularity: str = 'month') -> pd.DataFrame:
+    """Per-partition fingerprint of in-memory rows"""
+    partition = df[spec.partition_column].to_numpy(dtype=np.int64) // GRANULARITIES[granularity]
+    columns = {'partition': partition, 'row_count': np.ones(len(df), dtype=np.int64),
+               'key_hash': key_hashes(df, spec.keys)}
+    for metric, scale in spec.metrics.items():
+        columns[metric] = np.rint(df[metric].to_numpy(dtype=float) * scale).astype(np.int64)
+
+    # uint64 sums wrap, which is the modulo-2**64 hash sum
+    return pd.DataFrame(columns).groupby('partition', sort=True).sum()
+
+
+def fingerprint_csv(csv_file: str, spec: ReconcileSpec, granularity: str = 'month',
+                    chunksize: int = 500_000) -> pd.DataFrame:
+    """Per-partition fingerprint of a generated CSV, read in chunks"""
+    usecols = list(dict.fromkeys([spec.partition_column, *spec.keys, *spec.metrics]))
+    parts = []
+    with pd.read_csv(csv_file, usecols=usecols, chunksize=chunksize) as reader:
+        for chunk in reader:
+            parts.append(fingerprint_frame(chunk, spec, granularity))
+    if not parts:
+        return _empty_fingerprint(spec)
+    return pd.concat(parts).groupby(level=0, sort=True).sum()
+
+
+def fingerprint_sql(table: str, spec: ReconcileSpec, granularity: str = 'month',
+                    schema: str = "ad_dashboard", date_range: Optional[Tuple[int, int]] = None) -> str:
+    """Aggregate query producing the same fingerprint columns in the warehouse
+
+    With date_range, only rows whose partition date key lies in
+    [%(first_date_key)s, %(last_date_key)s] are fingerprinted.
+    """
+    keys = ", ".join(spec.keys)
+    metrics = "".join(f",\n    SUM(ROUND({metric} * {scale})) AS {metric}"
+                      for metric, scale in spec.metrics.items())
+    where = (f"WHERE {spec.partition_column} BETWEEN %(first_date_key)s AND %(last_date_key)s\n"
+             if date_range else "")
+    return (
+        f"SELECT {spec.partition_column} / {GRANULARITIES[granularity]} AS partition,\n"
+        f"    COUNT(*) AS row_count,\n"
+        f"    MOD(SUM(('x' || SUBSTR(MD5(CONCAT_WS('|', {keys})), 1, 15))::BIT(60)::BIGINT), "
+        f"{HASH_MODULUS}) AS key_hash{metrics}\n"
+        f"FROM {schema}.{table}\n"
+        f"{where}"
+        f"GROUP BY 1\n"
+        f"ORDER BY 1"
+    )
+
+
+def fingerprint_warehouse(conn, table: str, spec: ReconcileSpec, granularity: str = 'month',
+                          schema: str = "ad_dashboard",
+                          date_range: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+    """Per-partition fingerprint of a warehouse table (or of a date range of it) in one aggregate scan"""
+    columns = ['partition', 'row_count', 'key_hash', *spec.metrics]
+    params = {'first_date_key': date_range[0], 'last_date_key': date_range[1]} if date_range else None
+    with conn.cursor() as cursor:
+        cursor.execute(fingerprint_sql(table, spec, granularity, schema, date_range), params)
+        rows = cursor.fetchall()
+    if not rows:
+        return _empty_fingerprint(spec)
+    # NUMERIC sums arrive as Decimal; int() keeps them exact
+    fingerprint = pd.DataFrame([[int(value) for value in row] for row in rows], columns=columns)
+    fingerprint['key_hash'] = fingerprint['key_hash'].astype(np.uint64)
+    return fingerprint.set_index('partition')
+
+
+def batch_partitions(daily: pd.DataFrame, granularity: str, date_range: Tuple[int, int]) -> pd.DataFrame:
+    """Roll a daily fingerprint up to months, keeping days for months the batch covers only in part"""
+    if granularity == 'day' or daily.empty:
+        return daily
+    first, last = date_range
+    partial = set()
+    if first % 100 != 1:
+        partial.add(first // 100)
+    if (pd.Timestamp(str(last)) + pd.Timedelta(days=1)).day != 1:
+        partial.add(last // 100)
+    days = daily.index.to_numpy(dtype=np.int64)
+    months = days // GRANULARITIES[granularity]
+    partition = np.where(np.isin(months, list(partial)), days, months)
+    return daily.groupby(pd.Index(partition, name='partition'), sort=True).sum()
+
+
+def compare_fingerprints(source: pd.DataFrame, warehouse: pd.DataFrame) -> pd.DataFrame:
+    """One row per partition with its status and the fingerprint fields that differ"""
+    partitions = source.index.union(warehouse.index)
+    common = source.index.intersection(warehouse.index)
+    differs = source.loc[common].ne(warehouse.loc[common, source.columns])
+    fields = pd.Series([",".join(differs.columns[row]) for row in differs.to_numpy()], index=common, dtype=object)
+
+    status = pd.Series('match', index=partitions, dtype=object)
+    status[~partitions.isin(warehouse.index)] = 'missing_in_warehouse'
+    status[~partitions.isin(source.index)] = 'missing_in_source'
+    status[fields[fields != ''].index] = 'mismatch'
+    return pd.DataFrame({
+        'partition': partitions,
+        'status': status.to_numpy(),
+        'source_rows': source['row_count'].reindex(partitions).astype('Int64').to_numpy(),
+        'warehouse_rows': warehouse['row_count'].reindex(partitions).astype('Int64').to_numpy(),
+        'differing_fields': fields.reindex(partitions, fill_value='').to_numpy(),
+    })
+
+
+def reconcile(raw_path: str, conn, tables: Optional[Iterable[str]] = None,
+              granularity: str = 'month', schema: str = "ad_dashboard") -> pd.DataFrame:
+    """Compare generated files with the warehouse; one row per table and partition"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}; expected one of {list(GRANULARITIES)}")
+
+    reports = []
+    for table in tables or RECONCILE_TABLES:
+        csv_file = data_file(raw_path, table)
+        if not os.path.exists(csv_file):
+            logger.warning(f"⚠️  File not found: {csv_file}")
+            continue
+        spec = RECONCILE_TABLES[table]
+        source = fingerprint_csv(csv_file, spec, 'day')
+        if source.empty:
+            report = compare_fingerprints(source, fingerprint_warehouse(conn, table, spec, granularity, schema))
+        else:
+            # The warehouse also holds other batches; compare only the dates this one covers
+            date_range = (int(source.index.min()), int(source.index.max()))
+            warehouse = fingerprint_warehouse(conn, table, spec, 'day', schema, date_range)
+            report = compare_fingerprints(batch_partitions(source, granularity, date_range),
+                                          batch_partitions(warehouse, granularity, date_range))
+        bad = int((report['status'] != 'match').sum())
+        logger.info(f"{'✅' if bad == 0 else '❌'} {table}: {len(report) - bad}/{len(report)} partitions match")
+        reports.append(report.assign(table=table))
+
+    columns = ['table', 'partition', 'status', 'source_rows', 'warehouse_rows', 'differing_fields']
+    return pd.concat(reports, ignore_index=True)[columns] if reports else pd.DataFrame(columns=columns)
+
+
+def partitions_to_reload(report: pd.DataFrame) -> Dict[str, List[int]]:
+    """Partitions per table whose fingerprints differ (or that are missing from the warehouse)"""
+    flagged = report[report['status'].isin(['mismatch', 'missing_in_warehouse'])]
+    return {table: sorted(int(p) for p in group['partition'])
+            for table, group in flagged.groupby('table', sort=True)}
+
+
+def key_hashes(df: pd.DataFrame, keys: Iterable[str]) -> np.ndarray:
+    """First 60 bits of md5('k1|k2|...') per row, matching the SQL fingerprint"""
+    columns = [df[key].astype(str).tolist() for key in keys]
+    md5 = hashlib.md5
+    digests = b''.join([md5('|'.join(row).encode()).digest()[:8] for row in zip(*columns)])
+    return np.frombuffer(digests, dtype='>u8').astype(np.uint64) >> np.uint64(4)
+
+
+def _empty_fingerprint(spec: ReconcileSpec) -> pd.DataFrame:
+    """Fingerprint frame with no partitions"""
+    columns = ['row_count', 'key_hash', *spec.metrics]
+    return pd.DataFrame(columns=columns, index=pd.Index([], name='partition'), dtype=np.int64)
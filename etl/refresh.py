@@ -0,0 +1,257 @@
+"""
+Incremental refresh of dashboard rollups
+
+`mv_campaign_trends` can only be rebuilt with a full REFRESH MATERIALIZED VIEW,
+which rescans every fact row. `agg_campaign_trends` holds the same columns but
+is maintained incrementally: after a load, only the (date, campaign) groups
+touched by the batch are recomputed and upserted.
+
+`agg_monthly_campaign` is maintained the same way. A batch can hold only part
+of a month, so loading the batch's own monthly rollup would collide with the
+month's existing row (append) or replace its totals with the batch's (merge).
+Instead, the months and campaigns touched by the batch are recomputed from every
+fact row in the warehouse.
+"""
+
+import logging
+from typing import Iterable, Optional, Set, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_TRENDS_UPSERT_SQL = """
+INSERT INTO {schema}.agg_campaign_trends (
+    date_value, campaign_name, campaign_type, platform,
+    impressions, clicks, spend, conversions, revenue,
+    avg_ctr, avg_cpc, avg_cpa, avg_roas, refreshed_at
+)
+SELECT
+    d.date_value,
+    c.campaign_name,
+    c.campaign_type,
+    COALESCE(c.platform, 'Unknown') as platform,
+    SUM(f.impressions),
+    SUM(f.clicks),
+    SUM(f.spend),
+    SUM(f.attributed_conversions),
+    SUM(f.attributed_revenue),
+    AVG(f.ctr),
+    AVG(f.cpc),
+    AVG(f.cpa),
+    AVG(f.roas),
+    CURRENT_TIMESTAMP
+FROM {schema}.fact_ad_performance f
+JOIN {schema}.dim_date d ON f.date_key = d.date_key
+JOIN {schema}.dim_campaign c ON f.campaign_key = c.campaign_key
+{where_clause}
+GROUP BY d.date_value, c.campaign_name, c.campaign_type, COALESCE(c.platform, 'Unknown')
+ON CONFLICT (date_value, campaign_name, campaign_type, platform) DO UPDATE SET
+    impressions = EXCLUDED.impressions,
+    clicks = EXCLUDED.clicks,
+    spend = EXCLUDED.spend,
+    conversions = EXCLUDED.conversions,
+    revenue = EXCLUDED.revenue,
+    avg_ctr = EXCLUDED.avg_ctr,
+    avg_cpc = EXCLUDED.avg_cpc,
+    avg_cpa = EXCLUDED.avg_cpa,
+    avg_roas = EXCLUDED.avg_roas,
+    refreshed_at = EXCLUDED.refreshed_at
+"""
+
+# A campaign group (name, type, platform) can span several campaign keys, so the
+# filter recomputes every key of an affected group, not just the loaded ones.
+AFFECTED_CAMPAIGNS_FILTER = """
+    (c.campaign_name, c.campaign_type, COALESCE(c.platform, 'Unknown')) IN (
+        SELECT campaign_name, campaign_type, COALESCE(platform, 'Unknown')
+        FROM {schema}.dim_campaign
+        WHERE campaign_key = ANY(%(campaign_keys)s::uuid[])
+    )"""
+
+MONTHLY_CAMPAIGN_UPSERT_SQL = """
+INSERT INTO {schema}.agg_monthly_campaign (
+    year, month, campaign_key,
+    total_impressions, total_clicks, total_spend, total_conversions, total_revenue,
+    active_days, unique_geos, record_count,
+    ctr_percent, avg_cpc, avg_cpa, roas, etl_timestamp
+)
+SELECT
+    year, month, campaign_key,
+    impressions, clicks, spend, conversions, revenue,
+    active_days, unique_geos, record_count,
+    CASE WHEN impressions > 0 THEN ROUND(clicks * 100.0 / impressions, 4) ELSE 0 END,
+    CASE WHEN clicks > 0 THEN ROUND(spend / clicks, 2) ELSE 0 END,
+    CASE WHEN conversions > 0 THEN ROUND(spend / conversions, 2) ELSE 0 END,
+    CASE WHEN spend > 0 THEN ROUND(revenue / spend, 2) ELSE 0 END,
+    CURRENT_TIMESTAMP
+FROM (
+    SELECT
+        f.date_key / 10000 as year,
+        f.date_key / 100 % 100 as month,
+        f.campaign_key,
+        SUM(f.impressions) as impressions,
+        SUM(f.clicks) as clicks,
+        SUM(f.spend) as spend,
+        SUM(f.attributed_conversions) as conversions,
+        SUM(f.attributed_revenue) as revenue,
+        COUNT(DISTINCT f.date_key) as active_days,
+        COUNT(DISTINCT f.geo_key) as unique_geos,
+        COUNT(*) as record_count
+    FROM {schema}.fact_ad_performance f
+    {where_clause}
+    GROUP BY 1, 2, 3
+) monthly
+ON CONFLICT (year, month, campaign_key) DO UPDATE SET
+    total_impressions = EXCLUDED.total_impressions,
+    total_clicks = EXCLUDED.total_clicks,
+    total_spend = EXCLUDED.total_spend,
+    total_conversions = EXCLUDED.total_conversions,
+    total_revenue = EXCLUDED.total_revenue,
+    active_days = EXCLUDED.active_days,
+    unique_geos = EXCLUDED.unique_geos,
+    record_count = EXCLUDED.record_count,
+    ctr_percent = EXCLUDED.ctr_percent,
+    avg_cpc = EXCLUDED.avg_cpc,
+    avg_cpa = EXCLUDED.avg_cpa,
+    roas = EXCLUDED.roas,
+    etl_timestamp = EXCLUDED.etl_timestamp
+"""
+
+# The date_key range lets the planner prune before the exact month match
+AFFECTED_MONTHS_FILTER = (
+    "f.date_key BETWEEN %(first_date_key)s AND %(last_date_key)s "
+    "AND f.date_key / 100 = ANY(%(months)s)"
+)
+
+
+class AffectedGroups:
+    """Collects the date, campaign, A/B test and activity month keys touched by a load batch"""
+
+    def __init__(self):
+        self.date_keys: Set[int] = set()
+        self.campaign_keys: Set[str] = set()
+        self.ab_test_ids: Set[str] = set()
+        self.activity_months: Set[int] = set()
+
+    def add(self, chunk: 'pd.DataFrame'):
+        """Record the keys present in a loaded chunk of fact_ad_performance"""
+        if 'date_key' in chunk.columns:
+            self.date_keys.update(int(k) for k in chunk['date_key'].dropna().unique())
+        if 'campaign_key' in chunk.columns:
+            self.campaign_keys.update(str(k) for k in chunk['campaign_key'].dropna().unique())
+        if 'ab_test_id' in chunk.columns:
+            self.ab_test_ids.update(str(k) for k in chunk['ab_test_id'].dropna().unique())
+
+    def add_activity(self, chunk: 'pd.DataFrame'):
+        """Record the YYYYMM months of a loaded chunk of sessions or conversions"""
+        self.activity_months.update(int(k) // 100 for k in chunk['date_key'].dropna().unique())
+
+    def __bool__(self) -> bool:
+        return bool(self.date_keys or self.activity_months)
+
+
+def build_campaign_trends_refresh(date_keys: Optional[Iterable[int]] = None,
+                                  campaign_keys: Optional[Iterable[str]] = None,
+                                  schema: str = "ad_dashboard"):
+    """Build the upsert statement and parameters for the affected groups.
+
+    Passing neither key set rebuilds every group (initial backfill).
+    """
+    conditions = []
+    params = {}
+
+    if date_keys is not None:
+        conditions.append("f.date_key = ANY(%(date_keys)s)")
+        params['date_keys'] = sorted(int(k) for k in date_keys)
+
+    if campaign_keys is not None:
+        conditions.append(AFFECTED_CAMPAIGNS_FILTER.format(schema=schema).strip())
+        params['campaign_keys'] = sorted(str(k) for k in campaign_keys)
+
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = CAMPAIGN_TRENDS_UPSERT_SQL.format(schema=schema, where_clause=where_clause)
+    return sql, params
+
+
+def refresh_campaign_trends(conn, date_keys: Optional[Iterable[int]] = None,
+                            campaign_keys: Optional[Iterable[str]] = None,
+                            schema: str = "ad_dashboard") -> int:
+    """Recompute and upsert agg_campaign_trends for the given date/campaign keys.
+
+    Returns the number of upserted groups.
+    """
+    if date_keys is not None:
+        date_keys = list(date_keys)
+        if not date_keys:
+            logger.info("No affected dates, skipping campaign trends refresh")
+            return 0
+
+    sql, params = build_campaign_trends_refresh(date_keys, campaign_keys, schema)
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            upserted = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    scope = f"{len(date_keys)} dates" if date_keys is not None else "all dates"
+    logger.info(f"🔁 Refreshed {upserted} campaign trend groups ({scope})")
+    return upserted
+
+
+def build_monthly_campaign_refresh(date_keys: Optional[Iterable[int]] = None,
+                                   campaign_keys: Optional[Iterable[str]] = None,
+                                   schema: str = "ad_dashboard"):
+    """Build the upsert statement and parameters for the months and campaigns of the affected groups.
+
+    Passing neither key set rebuilds every month (initial backfill).
+    """
+    conditions = []
+    params = {}
+
+    if date_keys is not None:
+        months = sorted({int(k) // 100 for k in date_keys})
+        conditions.append(AFFECTED_MONTHS_FILTER)
+        params.update(first_date_key=months[0] * 100 + 1, last_date_key=months[-1] * 100 + 31,
+                      months=months)
+
+    if campaign_keys is not None:
+        conditions.append("f.campaign_key = ANY(%(campaign_keys)s::uuid[])")
+        params['campaign_keys'] = sorted(str(k) for k in campaign_keys)
+
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = MONTHLY_CAMPAIGN_UPSERT_SQL.format(schema=schema, where_clause=where_clause)
+    return sql, params
+
+
+def refresh_monthly_campaign(conn, date_keys: Optional[Iterable[int]] = None,
+                             campaign_keys: Optional[Iterable[str]] = None,
+                             schema: str = "ad_dashboard") -> int:
+    """Recompute and upsert agg_monthly_campaign for the months and campaigns of the given keys.
+
+    Returns the number of upserted groups.
+    """
+    if date_keys is not None:
+        date_keys = list(date_keys)
+        if not date_keys:
+            logger.info("No affected dates, skipping monthly campaign refresh")
+            return 0
+
+    sql, params = build_monthly_campaign_refresh(date_keys, campaign_keys, schema)
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            upserted = cursor.rowcount
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    scope = f"{len(params['months'])} months" if date_keys is not None else "all months"
+    logger.info(f"🔁 Refreshed {upserted} monthly campaign groups ({scope})")
+    return upserted
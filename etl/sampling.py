@@ -0,0 +1,188 @@
+"""
+Stratified sample of the generated dataset for data/sample/
+
+Fact rows are grouped into strata by (date, campaign, country), and each
+stratum keeps its k rows with the lowest hash priority. This bottom-k rule is
+a uniform sample without replacement within every stratum. The priorities
+come from each row's key and the seed, so the sample does not depend on chunk
+sizes or file order.
+
+The facts are streamed once in chunks. Memory holds at most k rows per
+stratum, so the sample size is set by the number of strata and k, not by the
+volume scale the data was generated at.
+
+Related rows follow their parents: funnel events and session-linked
+conversions are kept for sampled sessions only. Conversions without a session
+are sampled by their own strata. Each dimension then keeps only the rows the
+sampled facts reference, so the sample loads with intact foreign keys.
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from .compression import data_file
+from .funnel import FUNNEL_TABLE
+from .workload import hash_uniform
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_STREAM = 7  # Hash stream for sampling priorities
+DEFAULT_ROWS_PER_STRATUM = 3
+DEFAULT_CHUNKSIZE = 500_000
+
+STRATA = ['date_key', 'campaign_key', 'country']
+# Columns identifying a row, hashed into its sampling priority
+PRIORITY_KEYS = {
+    'fact_ad_performance': ['date_key', 'campaign_key', 'geo_key', 'device_key'],
+    'fact_web_analytics': ['session_id'],
+    'fact_conversions': ['conversion_id'],
+}
+# Dimension -> key column referenced by the facts
+DIMENSION_KEYS = {
+    'dim_date': 'date_key',
+    'dim_campaign': 'campaign_key',
+    'dim_geo': 'geo_key',
+    'dim_device': 'device_key',
+    'dim_user': 'user_key',
+}
+
+
+class BottomKSampler:
+    """Keeps the k lowest-priority rows of every stratum across a stream of chunks"""
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError("rows per stratum must be at least 1")
+        self.k = k
+        self.rows_seen = 0
+        self._kept: Optional[pd.DataFrame] = None
+
+    def add(self, chunk: pd.DataFrame, strata: np.ndarray, priorities: np.ndarray):
+        """Offer a chunk of rows with their stratum codes and priorities"""
+        if len(chunk) == 0:
+            return
+        chunk = chunk.assign(_stratum=strata, _priority=priorities,
+                             _row=np.arange(self.rows_seen, self.rows_seen + len(chunk)))
+        self.rows_seen += len(chunk)
+        # Trim the chunk on its own first so the buffer is never copied with the full chunk
+        chunk = self._bottom_k(chunk)
+        self._kept = chunk if self._kept is None else self._bottom_k(pd.concat([self._kept, chunk],
+                                                                               ignore_index=True))
+
+    def result(self) -> Optional[pd.DataFrame]:
+        """Sampled rows in their original order, or None if nothing was offered"""
+        if self._kept is None:
+            return None
+        kept = self._kept.sort_values('_row', kind='stable')
+        return kept.drop(columns=['_stratum', '_priority', '_row']).reset_index(drop=True)
+
+    def _bottom_k(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Rows ranked below k by priority within their stratum"""
+        strata = frame['_stratum'].to_numpy()
+        order = np.lexsort((frame['_priority'].to_numpy(), strata))
+        sorted_strata = strata[order]
+        starts = np.r_[True, sorted_strata[1:] != sorted_strata[:-1]]
+        positions = np.arange(len(order))
+        rank = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+        return frame.iloc[order[rank < self.k]]
+
+
+def sample_dataset(raw_path: str, sample_path: str, rows_per_stratum: int = DEFAULT_ROWS_PER_STRATUM,
+                   seed: int = 0, chunksize: int = DEFAULT_CHUNKSIZE) -> Dict[str, int]:
+    """Write a stratified, referentially intact sample of raw_path to sample_path; returns rows per table"""
+    os.makedirs(sample_path, exist_ok=True)
+    countries = pd.read_csv(data_file(raw_path, 'dim_geo'),
+                            usecols=['geo_key', 'country']).set_index('geo_key')['country']
+    references: Dict[str, Set] = {key: set() for key in DIMENSION_KEYS.values()}
+    written: Dict[str, int] = {}
+
+    def emit(table: str, frame: pd.DataFrame, header: bool):
+        for key, values in references.items():
+            if key in frame.columns:
+                values.update(frame[key].dropna().unique().tolist())
+        frame.to_csv(os.path.join(sample_path, f"{table}.csv"), mode='w' if header else 'a',
+                     header=header, index=False)
+        written[table] = written.get(table, 0) + len(frame)
+
+    # Strata-sampled facts
+    sessions: Set = set()
+    for table in ['fact_ad_performance', 'fact_web_analytics']:
+        sample = _sample_table(data_file(raw_path, table), table, countries,
+                               rows_per_stratum, seed, chunksize)
+        if sample is None:
+            continue
+        emit(table, sample, header=True)
+        if table == 'fact_web_analytics':
+            sessions = set(sample['session_id'])
+
+    # Conversions follow their session when they have one, otherwise they are sampled by strata
+    conversions_file = data_file(raw_path, 'fact_conversions')
+    if os.path.exists(conversions_file):
+        sampler = BottomKSampler(rows_per_stratum)
+        for position, chunk in enumerate(_chunks(conversions_file, chunksize)):
+            session_ids = chunk['session_id'] if 'session_id' in chunk.columns \
+                else pd.Series(np.nan, index=chunk.index)
+            linked = session_ids.notna().to_numpy()
+            emit('fact_conversions', chunk[linked & session_ids.isin(sessions).to_numpy()], header=position == 0)
+            unlinked = chunk[~linked]
+            sampler.add(unlinked, *_strata_and_priorities(unlinked, 'fact_conversions', countries, seed))
+        unlinked = sampler.result()
+        if unlinked is not None:
+            emit('fact_conversions', unlinked, header=False)
+
+    funnel_file = data_file(raw_path, FUNNEL_TABLE)
+    if os.path.exists(funnel_file):
+        for position, chunk in enumerate(_chunks(funnel_file, chunksize)):
+            emit(FUNNEL_TABLE, chunk[chunk['session_id'].isin(sessions)], header=position == 0)
+
+    # Dimensions keep only the rows the sampled facts reference
+    for table, key in DIMENSION_KEYS.items():
+        path = data_file(raw_path, table)
+        if not os.path.exists(path):
+            continue
+        for position, chunk in enumerate(_chunks(path, chunksize)):
+            rows = chunk[chunk[key].isin(references[key])]
+            rows.to_csv(os.path.join(sample_path, f"{table}.csv"), mode='w' if position == 0 else 'a',
+                        header=position == 0, index=False)
+            written[table] = written.get(table, 0) + len(rows)
+
+    for table, rows in written.items():
+        logger.info(f"   {table}: {rows:,} rows")
+    logger.info(f"💾 Saved sample ({rows_per_stratum} rows per date/campaign/country) to {sample_path}")
+    logger.info("Summary, attribution, cohort and A/B tables are not sampled; rebuild them with "
+                f"RAW_DATA_PATH={sample_path} and --step attribute, cohorts or ab-tests")
+    return written
+
+
+def _sample_table(csv_file: str, table: str, countries: pd.Series, rows_per_stratum: int,
+                  seed: int, chunksize: int) -> Optional[pd.DataFrame]:
+    """Bottom-k sample of one fact file, read in chunks"""
+    if not os.path.exists(csv_file):
+        return None
+    sampler = BottomKSampler(rows_per_stratum)
+    for chunk in _chunks(csv_file, chunksize):
+        sampler.add(chunk, *_strata_and_priorities(chunk, table, countries, seed))
+    return sampler.result()
+
+
+def _strata_and_priorities(chunk: pd.DataFrame, table: str, countries: pd.Series, seed: int):
+    """uint64 stratum codes and [0, 1) priorities for the rows of a fact chunk"""
+    strata = pd.DataFrame({
+        'date_key': chunk['date_key'],
+        # Conversions only carry a campaign once attributed
+        'campaign_key': chunk['campaign_key'] if 'campaign_key' in chunk.columns else None,
+        'country': chunk['geo_key'].map(countries),
+    }, index=chunk.index)[STRATA]
+    codes = pd.util.hash_pandas_object(strata, index=False, categorize=False).to_numpy()
+    keys = pd.util.hash_pandas_object(chunk[PRIORITY_KEYS[table]], index=False, categorize=False).to_numpy()
+    return codes, hash_uniform(seed, keys, SAMPLE_STREAM)
+
+
+def _chunks(csv_file: str, chunksize: int) -> Iterable[pd.DataFrame]:
+    """Chunks of a CSV file"""
+    with pd.read_csv(csv_file, chunksize=chunksize) as reader:
+        yield from reader
@@ -0,0 +1,306 @@
+"""
+Typed settings loaded from config/etl_config.yaml
+
+The YAML file is parsed once per (path, environment). The base document is
+deep-merged with `environments.<environment>` and validated into frozen
+dataclasses, which the CLI feeds into DataGenerationConfig, the loader and the
+validator. The environment comes from the ETL_ENV variable unless given.
+
+Without a config file at the default path the built-in defaults apply, but a
+path given explicitly (argument or ETL_CONFIG_PATH) must exist.
+"""
+
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CONFIG_PATH = os.path.join('config', 'etl_config.yaml')
+VOLUME_SCALES = ('small', 'medium', 'large')
+LOAD_MODES = ('append', 'merge')
+
+
+@dataclass(frozen=True)
+class DataGenerationSettings:
+    """data_generation section"""
+    start_date: str = "2024-01-01"
+    end_date: str = "2024-12-31"
+    scale: str = "medium"
+    campaigns: int = 50
+    users: int = 100000
+    daily_sessions_range: Tuple[int, int] = (100, 2000)
+    regions: Optional[Tuple[str, ...]] = None
+    campaign_types: Tuple[str, ...] = ('Search', 'Social', 'Display', 'Video')
+    platforms: Tuple[str, ...] = ('Google Ads', 'Facebook', 'LinkedIn', 'Twitter')
+    objectives: Tuple[str, ...] = ('Awareness', 'Conversion', 'Traffic', 'Engagement')
+    ab_test_percentage: float = 0.2
+    seed: int = 42
+    workload: str = "uniform"
+
+
+@dataclass(frozen=True)
+class ValidationSettings:
+    """processing.validation section"""
+    enabled: bool = True
+    null_threshold: float = 0.1
+    duplicate_threshold: float = 0.05
+
+
+@dataclass(frozen=True)
+class ErrorHandlingSettings:
+    """processing.error_handling section"""
+    max_retries: int = 3
+    retry_delay_seconds: float = 5
+    continue_on_error: bool = False
+    quarantine_invalid_records: bool = True
+
+
+@dataclass(frozen=True)
+class PerformanceSettings:
+    """processing.performance section"""
+    use_bulk_loading: bool = True
+    optimize_after_load: bool = True
+    vacuum_after_load: bool = True
+
+
+@dataclass(frozen=True)
+class ProcessingSettings:
+    """processing section"""
+    batch_size: int = 10000
+    parallel_workers: int = 4
+    load_mode: str = "append"
+    validation: ValidationSettings = field(default_factory=ValidationSettings)
+    error_handling: ErrorHandlingSettings = field(default_factory=ErrorHandlingSettings)
+    performance: PerformanceSettings = field(default_factory=PerformanceSettings)
+
+
+@dataclass(frozen=True)
+class FileSettings:
+    """files section"""
+    raw_data: str = "data/raw/"
+    processed_data: str = "data/processed/"
+    sample_data: str = "data/sample/"
+    logs: str = "logs/"
+    input_format: str = "csv"
+    output_format: str = "csv"
+    compression: Optional[str] = None
+    delimiter: str = ","
+    encoding: str = "utf-8"
+
+
+@dataclass(frozen=True)
+class LoggingSettings:
+    """logging section"""
+    level: str = "INFO"
+    format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    max_bytes: int = 100 * 1024 * 1024
+    backup_count: int = 5
+
+
+@dataclass(frozen=True)
+class ETLSettings:
+    """All pipeline settings for one environment"""
+    environment: Optional[str] = None
+    data_generation: DataGenerationSettings = field(default_factory=DataGenerationSettings)
+    processing: ProcessingSettings = field(default_factory=ProcessingSettings)
+    files: FileSettings = field(default_factory=FileSettings)
+    logging: LoggingSettings = field(default_factory=LoggingSettings)
+
+
+def load_settings(path: Optional[str] = None, environment: Optional[str] = None) -> ETLSettings:
+    """Load, merge and validate settings (cached per path and environment)"""
+    explicit = path or os.getenv('ETL_CONFIG_PATH')
+    path = os.path.abspath(explicit or DEFAULT_CONFIG_PATH)
+    if explicit and not os.path.isfile(path):
+        raise FileNotFoundError(f"Settings file not found: {path}")
+    environment = environment or os.getenv('ETL_ENV') or None
+    return _load_settings(path, environment)
+
+
+@lru_cache(maxsize=8)
+def _load_settings(path: str, environment: Optional[str]) -> ETLSettings:
+    """Parse the YAML once and build settings"""
+    raw: Dict[str, Any] = {}
+    if os.path.exists(path):
+        import yaml
+        with open(path) as f:
+            raw = yaml.safe_load(f) or {}
+
+    environments = raw.pop('environments', None) or {}
+    if environment is not None:
+        if environment not in environments:
+            raise ValueError(f"Unknown environment {environment!r} in {path}; "
+                             f"expected one of {sorted(environments)}")
+        raw = deep_merge(raw, environments[environment])
+
+    return build_settings(raw, environment)
+
+
+def deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge override into a copy of base"""
+    merged = dict(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def build_settings(raw: Dict[str, Any], environment: Optional[str] = None) -> ETLSettings:
+    """Validate a merged configuration document into typed settings"""
+    from .workload import WORKLOAD_PROFILES
+
+    generation = raw.get('data_generation') or {}
+    date_range = generation.get('date_range') or {}
+    volume = generation.get('volume') or {}
+    campaigns = generation.get('campaigns') or {}
+    geography = generation.get('geography') or {}
+
+    processing = raw.get('processing') or {}
+    files = raw.get('files') or {}
+    formats = files.get('formats') or {}
+    csv = files.get('csv') or {}
+    paths = files.get('paths') or {}
+    log = raw.get('logging') or {}
+    rotation = log.get('file_rotation') or {}
+
+    defaults = DataGenerationSettings()
+    sessions_range = tuple(_int(v, 'data_generation.volume.daily_sessions_range', 1)
+                           for v in volume.get('daily_sessions_range', defaults.daily_sessions_range))
+    if len(sessions_range) != 2 or sessions_range[0] > sessions_range[1]:
+        raise ValueError("data_generation.volume.daily_sessions_range must be [min, max]")
+
+    settings = ETLSettings(
+        environment=environment,
+        data_generation=DataGenerationSettings(
+            start_date=_date(date_range.get('start_date', defaults.start_date), 'data_generation.date_range.start_date'),
+            end_date=_date(date_range.get('end_date', defaults.end_date), 'data_generation.date_range.end_date'),
+            scale=_choice(volume.get('scale', defaults.scale), 'data_generation.volume.scale', VOLUME_SCALES),
+            campaigns=_int(volume.get('campaigns', defaults.campaigns), 'data_generation.volume.campaigns', 1),
+            users=_int(volume.get('users', defaults.users), 'data_generation.volume.users', 0),
+            daily_sessions_range=sessions_range,
+            regions=_strings(geography.get('regions'), 'data_generation.geography.regions'),
+            campaign_types=_strings(campaigns.get('types'), 'data_generation.campaigns.types') or defaults.campaign_types,
+            platforms=_strings(campaigns.get('platforms'), 'data_generation.campaigns.platforms') or defaults.platforms,
+            objectives=_strings(campaigns.get('objectives'), 'data_generation.campaigns.objectives') or defaults.objectives,
+            ab_test_percentage=_fraction(campaigns.get('ab_test_percentage', defaults.ab_test_percentage),
+                                         'data_generation.campaigns.ab_test_percentage'),
+            seed=_int(generation.get('seed', defaults.seed), 'data_generation.seed', 0),
+            workload=_choice(volume.get('workload', defaults.workload), 'data_generation.volume.workload',
+                             tuple(WORKLOAD_PROFILES)),
+        ),
+        processing=ProcessingSettings(
+            batch_size=_int(processing.get('batch_size', 10000), 'processing.batch_size', 1),
+            parallel_workers=_int(processing.get('parallel_workers', 4), 'processing.parallel_workers', 1),
+            load_mode=_choice(processing.get('load_mode', 'append'), 'processing.load_mode', LOAD_MODES),
+            validation=_section(ValidationSettings, processing.get('validation'), 'processing.validation'),
+            error_handling=_section(ErrorHandlingSettings, processing.get('error_handling'),
+                                    'processing.error_handling'),
+            performance=_section(PerformanceSettings, processing.get('performance'), 'processing.performance'),
+        ),
+        files=FileSettings(
+            raw_data=paths.get('raw_data', FileSettings.raw_data),
+            processed_data=paths.get('processed_data', FileSettings.processed_data),
+            sample_data=paths.get('sample_data', FileSettings.sample_data),
+            logs=paths.get('logs', FileSettings.logs),
+            input_format=formats.get('input', FileSettings.input_format),
+            output_format=formats.get('output', FileSettings.output_format),
+            compression=formats.get('compression') or None,
+            delimiter=csv.get('delimiter', FileSettings.delimiter),
+            encoding=csv.get('encoding', FileSettings.encoding),
+        ),
+        logging=LoggingSettings(
+            level=_choice(str(log.get('level', 'INFO')).upper(), 'logging.level',
+                          ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')),
+            format=log.get('format', LoggingSettings.format),
+            max_bytes=int(float(rotation.get('max_size_mb', 100)) * 1024 * 1024),
+            backup_count=_int(rotation.get('backup_count', 5), 'logging.file_rotation.backup_count', 0),
+        ),
+    )
+
+    if settings.data_generation.end_date < settings.data_generation.start_date:
+        raise ValueError("data_generation.date_range.end_date must not be before start_date")
+    validation = settings.processing.validation
+    _fraction(validation.null_threshold, 'processing.validation.null_threshold')
+    _fraction(validation.duplicate_threshold, 'processing.validation.duplicate_threshold')
+    _int(settings.processing.error_handling.max_retries, 'processing.error_handling.max_retries', 0)
+
+    return settings
+
+
+def generation_config(settings: ETLSettings, **overrides):
+    """DataGenerationConfig from settings; keyword overrides win"""
+    from .data_generator import DataGenerationConfig
+
+    generation = settings.data_generation
+    values = dict(
+        start_date=generation.start_date,
+        end_date=generation.end_date,
+        num_campaigns=generation.campaigns,
+        num_users=generation.users,
+        daily_volume_scale=generation.scale,
+        seed=generation.seed,
+        emea_countries=list(generation.regions) if generation.regions else None,
+        campaign_types=list(generation.campaign_types),
+        platforms=list(generation.platforms),
+        objectives=list(generation.objectives),
+        daily_sessions_range=generation.daily_sessions_range,
+        ab_test_percentage=generation.ab_test_percentage,
+        workload=generation.workload,
+    )
+    values.update({key: value for key, value in overrides.items() if value is not None})
+    return DataGenerationConfig(**values)
+
+
+def _section(cls, values: Optional[Dict[str, Any]], name: str):
+    """Build a flat settings dataclass, checking keys and value types"""
+    values = values or {}
+    defaults = cls()
+    unknown = set(values) - set(defaults.__dataclass_fields__)
+    if unknown:
+        raise ValueError(f"Unknown settings in {name}: {sorted(unknown)}")
+
+    checked = {}
+    for key, value in values.items():
+        expected = type(getattr(defaults, key))
+        if expected is bool and not isinstance(value, bool):
+            raise ValueError(f"{name}.{key} must be true or false, got {value!r}")
+        if expected in (int, float) and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"{name}.{key} must be a number, got {value!r}")
+        checked[key] = value
+    return cls(**checked)
+
+
+def _int(value: Any, name: str, minimum: int) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise ValueError(f"{name} must be an integer >= {minimum}, got {value!r}")
+    return value
+
+
+def _fraction(value: Any, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+        raise ValueError(f"{name} must be between 0 and 1, got {value!r}")
+    return float(value)
+
+
+def _choice(value: Any, name: str, choices: Tuple[str, ...]) -> str:
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {list(choices)}, got {value!r}")
+    return value
+
+
+def _date(value: Any, name: str) -> str:
+    try:
+        return date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise ValueError(f"{name} must be a YYYY-MM-DD date, got {value!r}")
+
+
+def _strings(values: Optional[List[Any]], name: str) -> Optional[Tuple[str, ...]]:
+    if values is None:
+        return None
+    if not isinstance(values, list) or not values or not all(isinstance(v, str) for v in values):
+        raise ValueError(f"{name} must be a non-empty list of strings")
+    return tuple(values)
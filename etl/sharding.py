@@ -0,0 +1,255 @@
+"""
+Shard-aware generation across hosts
+
+A dataset can be split into N shards, each generated on its own host with
+`run_etl.py --shard i/N`. Dimensions are identical on every shard; facts are
+partitioned by calendar month (month ordinal modulo N), so every shard's rows,
+including its monthly rollups, are disjoint from every other shard's.
+
+Each shard writes a manifest of order-independent table fingerprints (row
+count and the sum of per-row hashes modulo 2**64). Fingerprints of disjoint
+shards add up, so merging the manifests verifies that the union of the shards
+equals a single-node run without moving any data.
+
+Attribution, cohorts and A/B tests need every month at once, so shards skip
+them. Given the shards' data directories, combine_shard_files streams the
+shards' files into one directory: dimension tables are taken from the first
+shard and every other table is the concatenation of the shards' disjoint rows.
+Those steps then run on the combined files.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .compression import CODEC_SUFFIXES, CSV_SUFFIX, data_file, open_csv, output_file
+
+logger = logging.getLogger(__name__)
+
+SHARD_MANIFEST_FILE = "shard_manifest.json"
+MERGED_MANIFEST_FILE = "merged_manifest.json"
+
+# Config fields that differ between shards of the same dataset
+SHARD_FIELDS = ('shard_index', 'shard_count')
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse an 'i/N' shard spec into (index, count)"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in [0, {count}), got {value!r}")
+    return index, count
+
+
+def shard_dates(dates: pd.DatetimeIndex, shard_index: int, shard_count: int) -> pd.DatetimeIndex:
+    """Dates owned by a shard: whole months, assigned round-robin by month ordinal"""
+    if shard_count == 1:
+        return dates
+    month_ordinal = dates.year * 12 + dates.month - 1
+    return dates[np.asarray(month_ordinal % shard_count) == shard_index]
+
+
+def table_fingerprint(df: pd.DataFrame) -> Dict:
+    """Order-independent fingerprint of a table: row count and summed row hashes"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    return {
+        'rows': len(df),
+        'columns': list(df.columns),
+        'hash_sum': int(row_hashes.sum(dtype=np.uint64)),  # Wraps modulo 2**64
+    }
+
+
+def combine_fingerprints(fingerprints: Iterable[Dict]) -> Dict:
+    """Fingerprint of the union of disjoint tables"""
+    combined = None
+    for fingerprint in fingerprints:
+        if combined is None:
+            combined = {**fingerprint}
+            continue
+        if fingerprint['columns'] != combined['columns']:
+            raise ValueError(f"Cannot combine tables with columns {fingerprint['columns']} "
+                             f"and {combined['columns']}")
+        combined['rows'] += fingerprint['rows']
+        combined['hash_sum'] = (combined['hash_sum'] + fingerprint['hash_sum']) % 2 ** 64
+    return combined
+
+
+def dataset_fingerprint(config) -> str:
+    """Hash of the generation config with the shard fields removed"""
+    from .data_generator import GENERATOR_VERSION
+
+    settings = {k: v for k, v in asdict(config).items() if k not in SHARD_FIELDS}
+    payload = json.dumps({'config': settings, 'generator_version': GENERATOR_VERSION},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def build_shard_manifest(config, dimensions: Dict[str, pd.DataFrame],
+                         facts: Dict[str, pd.DataFrame]) -> Dict:
+    """Describe one shard's output"""
+    return {
+        'dataset': dataset_fingerprint(config),
+        'shard_index': config.shard_index,
+        'shard_count': config.shard_count,
+        'dimensions': {table: table_fingerprint(df) for table, df in dimensions.items()},
+        'facts': {table: table_fingerprint(df) for table, df in facts.items()},
+    }
+
+
+def build_store_shard_manifest(config, dimensions: Dict[str, pd.DataFrame], store) -> Dict:
+    """Describe one shard's output held in a ColumnarStore, one partition at a time"""
+    manifest = build_shard_manifest(config, dimensions, {})
+    manifest['facts'] = {
+        table: combine_fingerprints(
+            table_fingerprint(store.to_frame(table, partitions=[partition]))
+            for partition in store.partitions(table)
+        )
+        for table in store.tables()
+    }
+    return manifest
+
+
+def write_shard_manifest(manifest: Dict, output_dir: str,
+                         filename: str = SHARD_MANIFEST_FILE) -> str:
+    """Write a shard manifest next to the shard's data files"""
+    path = os.path.join(output_dir, filename)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return path
+
+
+def read_shard_manifest(path: str) -> Dict:
+    """Read a shard manifest from a file or a shard's data directory"""
+    if os.path.isdir(path):
+        path = os.path.join(path, SHARD_MANIFEST_FILE)
+    with open(path) as f:
+        return json.load(f)
+
+
+def merge_shard_manifests(manifests: Iterable[Dict]) -> Dict:
+    """Combine shard manifests, checking they form one complete dataset.
+
+    Raises ValueError if shards come from different configs, are missing or
+    duplicated, or disagree on the dimension tables.
+    """
+    manifests = sorted(manifests, key=lambda m: m['shard_index'])
+    if not manifests:
+        raise ValueError("No shard manifests to merge")
+
+    first = manifests[0]
+    for manifest in manifests:
+        if manifest['dataset'] != first['dataset']:
+            raise ValueError("Shards were generated from different configurations")
+        if manifest['dimensions'] != first['dimensions']:
+            raise ValueError(f"Dimensions of shard {manifest['shard_index']} differ from shard "
+                             f"{first['shard_index']}")
+
+    shard_count = first['shard_count']
+    indexes = [m['shard_index'] for m in manifests]
+    if indexes != list(range(shard_count)) or any(m['shard_count'] != shard_count for m in manifests):
+        raise ValueError(f"Expected shards 0..{shard_count - 1} exactly once, got {indexes}")
+
+    facts = {
+        table: combine_fingerprints(manifest['facts'][table] for manifest in manifests)
+        for table in first['facts']
+    }
+
+    return {
+        'dataset': first['dataset'],
+        'shard_index': 0,
+        'shard_count': 1,
+        'dimensions': first['dimensions'],
+        'facts': facts,
+    }
+
+
+def verify_against_single_node(merged: Dict, config) -> List[str]:
+    """Regenerate the dataset on one node and list fingerprint mismatches"""
+    from .data_generator import DataGenerator, DataGenerationConfig
+
+    single = DataGenerationConfig(**{**asdict(config), 'shard_index': 0, 'shard_count': 1})
+    if dataset_fingerprint(single) != merged['dataset']:
+        return ['dataset']
+
+    generator = DataGenerator(single)
+    dimensions = generator.generate_dimension_data()
+    facts = generator.generate_fact_data()
+    expected = build_shard_manifest(single, dimensions, facts)
+
+    mismatches = [f"dimensions.{table}" for table in expected['dimensions']
+                  if expected['dimensions'][table] != merged['dimensions'].get(table)]
+    mismatches += [f"facts.{table}" for table in expected['facts']
+                   if expected['facts'][table] != merged['facts'].get(table)]
+    return mismatches
+
+
+def merge_shards(paths: Iterable[str], config=None, output_dir: Optional[str] = None) -> Dict:
+    """Merge the manifests at paths; with config, also verify against a single-node run"""
+    paths = list(paths)
+    merged = merge_shard_manifests(read_shard_manifest(path) for path in paths)
+    total_rows = sum(fingerprint['rows'] for fingerprint in merged['facts'].values())
+    logger.info(f"🧩 Merged {len(paths)} shard manifests ({total_rows:,} fact rows)")
+
+    if config is not None:
+        mismatches = verify_against_single_node(merged, config)
+        if mismatches:
+            raise ValueError(f"Sharded output differs from single-node output: {mismatches}")
+        logger.info("✅ Union of shards matches single-node output")
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        write_shard_manifest(merged, output_dir, MERGED_MANIFEST_FILE)
+
+    return merged
+
+
+def combine_shard_files(shard_dirs: Iterable[str], output_dir: str, dimension_tables: Iterable[str],
+                        compression: Optional[str] = None) -> List[str]:
+    """Write the union of the shards' data files to output_dir, one table at a time.
+
+    Dimension tables are identical on every shard and are copied from the first;
+    other tables are concatenated. Returns the combined table names.
+    """
+    shard_dirs = list(shard_dirs)
+    output = os.path.abspath(output_dir)
+    if any(os.path.abspath(directory) == output for directory in shard_dirs):
+        raise ValueError(f"Combined files must go to a directory other than the shards': {output_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    dimension_tables = set(dimension_tables)
+    suffixes = tuple(CSV_SUFFIX + codec for codec in ['', *CODEC_SUFFIXES.values()])
+    tables = sorted({name[:name.index(CSV_SUFFIX)] for name in os.listdir(shard_dirs[0])
+                     if name.endswith(suffixes)})
+    for table in tables:
+        sources = shard_dirs[:1] if table in dimension_tables else shard_dirs
+        with open_csv(output_file(output_dir, table, compression)) as out:
+            header = None
+            for directory in sources:
+                with _read_csv_text(data_file(directory, table)) as f:
+                    first_line = f.readline()
+                    if header is None:
+                        header = first_line
+                        out.write(header)
+                    elif first_line != header:
+                        raise ValueError(f"Shard {directory} has different {table} columns")
+                    shutil.copyfileobj(f, out)
+    logger.info(f"🧩 Combined {len(tables)} tables from {len(shard_dirs)} shards into {output_dir}")
+    return tables
+
+
+def _read_csv_text(path: str):
+    """Text handle for reading a CSV, decompressing .gz files"""
+    if path.endswith(CODEC_SUFFIXES['gzip']):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, newline='')
@@ -0,0 +1,348 @@
+"""
+Real-time event stream simulator
+
+Replays the batch generator as a stream of impression, click, session and
+conversion events in timestamp order, written as NDJSON to a file, a named
+pipe, stdout or a local socket. Events are expanded from each day's fact rows
+(so they reuse the same distributions and day/seasonal effects) and aggregate
+back exactly to the daily fact totals.
+
+A day is produced in time slices (hourly by default). Each ad row's
+impressions and clicks are first split across the slices with one multinomial
+draw, and events are only expanded, serialized and sorted one slice at a time,
+so memory is bounded by the busiest slice rather than the day's volume. Slices
+cover disjoint time windows, so emitting them in order keeps the stream in
+timestamp order. Within a slice, formatting is vectorized: each event type is
+serialized with DataFrame.to_json and the lines are merged by timestamp with
+one argsort.
+
+A writer thread drains a bounded queue, so a slow consumer blocks the
+producer (backpressure) instead of buffering without limit, and an optional
+token bucket caps the event rate.
+"""
+
+import logging
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .data_generator import EVENT_STREAM
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_EVENTS = 10_000
+DEFAULT_QUEUE_BATCHES = 16
+DEFAULT_DAY_SLICES = 24  # Hourly slices
+DAY_MS = 86_400_000
+
+
+class TokenBucket:
+    """Token bucket limiting events per second with a bounded burst"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def consume(self, n: int):
+        """Block until n tokens are available, then take them"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= n or self.tokens >= self.capacity:
+                self.tokens -= n  # Batches larger than the burst go into debt
+                return
+            time.sleep((min(n, self.capacity) - self.tokens) / self.rate)
+
+
+class FileSink:
+    """NDJSON file or named pipe"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'wb')
+
+    def write(self, data: bytes):
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+
+class StdoutSink:
+    """Standard output"""
+
+    def write(self, data: bytes):
+        sys.stdout.buffer.write(data)
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+class SocketSink:
+    """Unix domain or TCP socket; sendall blocks while the peer is slow"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+
+    def write(self, data: bytes):
+        self.sock.sendall(data)
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def open_sink(target: str):
+    """Open '-' (stdout), 'unix:/path', 'tcp:host:port' or a file/pipe path"""
+    if target == '-':
+        return StdoutSink()
+    if target.startswith('unix:'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(target[len('unix:'):])
+        return SocketSink(sock)
+    if target.startswith('tcp:'):
+        host, port = target[len('tcp:'):].rsplit(':', 1)
+        return SocketSink(socket.create_connection((host, int(port))))
+    return FileSink(target)
+
+
+class StreamWriter:
+    """Writes batches to a sink from a background thread via a bounded queue"""
+
+    def __init__(self, sink, max_batches: int = DEFAULT_QUEUE_BATCHES):
+        self.sink = sink
+        self.queue: queue.Queue = queue.Queue(maxsize=max_batches)
+        self.error: Optional[BaseException] = None
+        self.blocked_seconds = 0.0
+        self.thread = threading.Thread(target=self._run, name='stream-writer', daemon=True)
+        self.thread.start()
+
+    def put(self, data: bytes):
+        """Queue a batch, blocking while the queue is full"""
+        if self.error is not None:
+            raise self.error
+        start = time.monotonic()
+        self.queue.put(data)
+        self.blocked_seconds += time.monotonic() - start
+
+    def close(self):
+        """Flush queued batches, close the sink and re-raise writer errors"""
+        self.queue.put(None)
+        self.thread.join()
+        self.sink.close()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                return
+            if self.error is None:
+                try:
+                    self.sink.write(data)
+                except BaseException as e:  # Surfaced to the producer on its next put
+                    self.error = e
+
+
+def day_events(generator, date: 'pd.Timestamp',
+               slices: int = DEFAULT_DAY_SLICES) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """NDJSON lines and timestamps of one day's events, one sorted time slice at a time"""
+    import pandas as pd
+
+    facts = generator.generate_fact_data(pd.DatetimeIndex([date]))
+    date_key = int(date.strftime('%Y%m%d'))
+    rng = generator._day_rng(date_key, EVENT_STREAM)
+    day_start = np.datetime64(date.date(), 'ms')
+    bounds = np.minimum(np.arange(slices + 1, dtype=np.int64) * -(-DAY_MS // slices), DAY_MS)
+    widths = np.diff(bounds)
+
+    # Counts per row and slice; events themselves are only expanded slice by slice
+    ad = facts['fact_ad_performance']
+    keys = ad[['date_key', 'campaign_key', 'geo_key', 'device_key']].reset_index(drop=True)
+    impressions = rng.multinomial(ad['impressions'].to_numpy(), widths / DAY_MS)
+    clicks = rng.multinomial(ad['clicks'].to_numpy(), widths / DAY_MS)
+    costs = _ClickCosts(ad['spend'].to_numpy(), ad['clicks'].to_numpy())
+
+    sessions = _session_events(facts['fact_web_analytics'])
+    conversions = _conversion_events(facts['fact_conversions'])
+    session_slice = _slice_index(sessions['ts'], day_start, bounds)
+    conversion_slice = _slice_index(conversions['ts'], day_start, bounds)
+
+    for i in range(slices):
+        start = day_start + np.timedelta64(int(bounds[i]), 'ms')
+        yield _sorted_lines([
+            _impression_events(keys, impressions[:, i], rng, start, widths[i]),
+            _click_events(keys, clicks[:, i], costs, rng, start, widths[i]),
+            sessions[session_slice == i],
+            conversions[conversion_slice == i],
+        ])
+
+
+def stream_events(generator, sink, dates: Optional['pd.DatetimeIndex'] = None,
+                  events_per_second: Optional[float] = None,
+                  batch_events: int = DEFAULT_BATCH_EVENTS,
+                  max_queued_batches: int = DEFAULT_QUEUE_BATCHES) -> Dict[str, float]:
+    """Stream every event for dates to sink and return throughput stats"""
+    dates = generator.fact_dates if dates is None else dates
+    limiter = TokenBucket(events_per_second, burst=batch_events) if events_per_second else None
+    writer = StreamWriter(sink, max_queued_batches)
+
+    total_events = 0
+    start = time.perf_counter()
+    try:
+        for date in dates:
+            day_total = total_events
+            for lines, _ in day_events(generator, date):
+                for offset in range(0, len(lines), batch_events):
+                    batch = lines[offset:offset + batch_events]
+                    if limiter is not None:
+                        limiter.consume(len(batch))
+                    writer.put(('\n'.join(batch) + '\n').encode())
+                    total_events += len(batch)
+            logger.debug(f"Streamed {total_events - day_total:,} events for {date.date()}")
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'events': total_events,
+        'seconds': elapsed,
+        'events_per_second': total_events / elapsed if elapsed > 0 else 0.0,
+        'blocked_seconds': writer.blocked_seconds,
+    }
+    logger.info(f"📡 Streamed {total_events:,} events in {elapsed:.2f}s "
+                f"({stats['events_per_second']:,.0f}/s, blocked {writer.blocked_seconds:.2f}s)")
+    return stats
+
+
+def daily_totals(facts: Dict[str, 'pd.DataFrame']) -> 'pd.DataFrame':
+    """Per-day totals of the batch facts that the event stream must reproduce"""
+    import pandas as pd
+
+    ad = facts['fact_ad_performance'].groupby('date_key').agg(
+        impressions=('impressions', 'sum'), clicks=('clicks', 'sum'), spend=('spend', 'sum'))
+    web = facts['fact_web_analytics'].groupby('date_key').agg(
+        sessions=('session_id', 'size'), page_views=('page_views', 'sum'))
+    conversions = facts['fact_conversions'].groupby('date_key').agg(
+        conversions=('conversion_id', 'size'), conversion_value=('conversion_value', 'sum'))
+    totals = pd.concat([ad, web, conversions], axis=1).fillna(0)
+    return totals.round({'spend': 2, 'conversion_value': 2}).sort_index()
+
+
+def aggregate_events(path: str) -> 'pd.DataFrame':
+    """Per-day totals of an NDJSON event file (inverse of daily_totals)"""
+    import pandas as pd
+
+    events = pd.read_json(path, lines=True, dtype={'date_key': 'int64'})
+    by_type = {kind: group.groupby('date_key') for kind, group in events.groupby('type')}
+    totals = pd.concat({
+        'impressions': by_type['impression'].size(),
+        'clicks': by_type['click'].size(),
+        'spend': by_type['click']['cost'].sum(),
+        'sessions': by_type['session'].size(),
+        'page_views': by_type['session']['page_views'].sum(),
+        'conversions': by_type['conversion'].size(),
+        'conversion_value': by_type['conversion']['value'].sum(),
+    }, axis=1).fillna(0)
+    return totals.round({'spend': 2, 'conversion_value': 2}).sort_index()
+
+
+class _ClickCosts:
+    """Splits each ad row's spend across its clicks in whole cents so they sum back exactly"""
+
+    def __init__(self, spend: np.ndarray, clicks: np.ndarray):
+        cents = np.round(spend * 100).astype(np.int64)
+        self.per_click = cents // np.maximum(clicks, 1)
+        self.remainder = cents - self.per_click * clicks
+        self.emitted = np.zeros(len(clicks), dtype=np.int64)
+
+    def take(self, counts: np.ndarray) -> np.ndarray:
+        """Costs of the next counts clicks of each row, continuing from earlier slices"""
+        rows = np.repeat(np.arange(len(counts)), counts)
+        rank = self.emitted[rows] + np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        self.emitted += counts
+        return (self.per_click[rows] + (rank < self.remainder[rows])) / 100
+
+
+def _impression_events(keys: 'pd.DataFrame', counts: np.ndarray, rng: np.random.Generator,
+                       start: np.datetime64, width: int) -> 'pd.DataFrame':
+    """One event per impression in a slice, counts per ad performance row"""
+    events = keys.iloc[np.repeat(np.arange(len(counts)), counts)].reset_index(drop=True)
+    events.insert(0, 'ts', _random_times(rng, start, width, len(events)))
+    events.insert(0, 'type', 'impression')
+    return events
+
+
+def _click_events(keys: 'pd.DataFrame', counts: np.ndarray, costs: _ClickCosts,
+                  rng: np.random.Generator, start: np.datetime64, width: int) -> 'pd.DataFrame':
+    """One event per click in a slice, counts per ad performance row"""
+    events = keys.iloc[np.repeat(np.arange(len(counts)), counts)].reset_index(drop=True)
+    events.insert(0, 'ts', _random_times(rng, start, width, len(events)))
+    events.insert(0, 'type', 'click')
+    events['cost'] = costs.take(counts)
+    return events
+
+
+def _session_events(web: 'pd.DataFrame') -> 'pd.DataFrame':
+    """One event per web session"""
+    events = web[['session_start_timestamp', 'date_key', 'session_id', 'user_key', 'campaign_key',
+                  'geo_key', 'device_key', 'page_views', 'session_duration_seconds', 'is_bounce',
+                  'utm_source', 'utm_medium']].rename(columns={
+        'session_start_timestamp': 'ts', 'session_duration_seconds': 'duration_seconds'})
+    events.insert(0, 'type', 'session')
+    return events
+
+
+def _conversion_events(conversions: 'pd.DataFrame') -> 'pd.DataFrame':
+    """One event per conversion"""
+    events = conversions[['conversion_timestamp', 'date_key', 'conversion_id', 'user_key', 'geo_key',
+                          'device_key', 'conversion_type', 'conversion_value', 'quantity']].rename(
+        columns={'conversion_timestamp': 'ts', 'conversion_value': 'value'})
+    events.insert(0, 'type', 'conversion')
+    return events
+
+
+def _sorted_lines(frames: List['pd.DataFrame']) -> Tuple[np.ndarray, np.ndarray]:
+    """NDJSON lines and timestamps of event frames, merged by timestamp"""
+    lines: List[str] = []
+    timestamps = []
+    for frame in frames:
+        if len(frame):
+            lines.extend(frame.to_json(orient='records', lines=True, date_format='iso',
+                                       date_unit='ms').splitlines())
+            timestamps.append(frame['ts'].to_numpy(dtype='datetime64[ms]'))
+
+    if not lines:
+        return np.empty(0, dtype=object), np.empty(0, dtype='datetime64[ms]')
+    timestamps = np.concatenate(timestamps)
+    order = np.argsort(timestamps, kind='stable')
+    return np.asarray(lines, dtype=object)[order], timestamps[order]
+
+
+def _slice_index(ts: 'pd.Series', day_start: np.datetime64, bounds: np.ndarray) -> np.ndarray:
+    """Slice of the day each timestamp falls in"""
+    offsets = (ts.to_numpy(dtype='datetime64[ms]') - day_start).astype(np.int64)
+    return np.clip(np.searchsorted(bounds, offsets, side='right') - 1, 0, len(bounds) - 2)
+
+
+def _random_times(rng: np.random.Generator, start: np.datetime64, width: int, n: int) -> np.ndarray:
+    """n millisecond timestamps uniformly spread over [start, start + width ms)"""
+    return start + rng.integers(0, width, size=n).astype('timedelta64[ms]')
@@ -0,0 +1,187 @@
+"""
+Tableau extract exporter
+
+Builds the CSV extracts in tableau_data/ (campaigns, geography, dates and the
+denormalized campaign x geography file) straight from generator frames or the
+warehouse. Joins are vectorized over categorical columns and streamed to disk
+in chunks, and extracts whose inputs have not changed are not rewritten.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List
+
+import pandas as pd
+
+from .compression import data_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = "tableau_data"
+MANIFEST_FILE = ".export_manifest.json"
+
+CAMPAIGN_COLUMNS = ['campaign_key', 'campaign_name', 'campaign_type', 'platform',
+                    'start_date', 'end_date', 'budget', 'status']
+GEOGRAPHY_COLUMNS = ['geo_key', 'country', 'city', 'region']
+DATE_COLUMNS = ['date_key', 'date_value', 'day_of_week', 'day_name', 'month', 'month_name',
+                'quarter', 'year', 'week_of_year', 'is_weekend', 'is_holiday']
+COMBINED_COLUMNS = ['campaign_name', 'campaign_type', 'platform', 'start_date', 'end_date',
+                    'budget', 'status', 'country', 'city', 'region',
+                    'start_month', 'start_year', 'quarter', 'campaign_count']
+
+# Low-cardinality columns stored as categoricals before joining
+CATEGORICAL_COLUMNS = ['campaign_type', 'platform', 'status', 'country', 'city', 'region']
+
+
+def export_tableau_extracts(dimensions: Dict[str, pd.DataFrame],
+                            output_dir: str = DEFAULT_OUTPUT_DIR,
+                            chunk_rows: int = 100_000,
+                            force: bool = False) -> Dict[str, str]:
+    """Write all Tableau extracts, returning 'written' or 'skipped' per file"""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _read_manifest(output_dir)
+
+    campaigns = _prepare_campaigns(dimensions['dim_campaign'])
+    geography = _prepare_geography(dimensions['dim_geo'])
+    dates = _prepare_dates(dimensions['dim_date'])
+
+    extracts = {
+        'campaigns.csv': ([campaigns], lambda path: _write_frame(campaigns[CAMPAIGN_COLUMNS], path)),
+        'geography.csv': ([geography], lambda path: _write_frame(geography[GEOGRAPHY_COLUMNS], path)),
+        'dates.csv': ([dates], lambda path: _write_frame(dates[DATE_COLUMNS], path)),
+        'campaign_geography_combined.csv': (
+            [campaigns, geography],
+            lambda path: _write_combined(campaigns, geography, path, chunk_rows)
+        ),
+    }
+
+    results = {}
+    for filename, (inputs, writer) in extracts.items():
+        path = os.path.join(output_dir, filename)
+        fingerprint = _fingerprint(inputs)
+
+        if not force and manifest.get(filename) == fingerprint and os.path.exists(path):
+            logger.info(f"⏭️  {filename} is up to date, skipping")
+            results[filename] = 'skipped'
+            continue
+
+        # Write to a temporary file so a failed export never leaves a partial extract
+        tmp_path = f"{path}.tmp"
+        rows = writer(tmp_path)
+        os.replace(tmp_path, path)
+        manifest[filename] = fingerprint
+        logger.info(f"💾 Exported {rows:,} rows to {path}")
+        results[filename] = 'written'
+
+    _write_manifest(output_dir, manifest)
+    return results
+
+
+def read_dimensions_from_raw(raw_path: str) -> Dict[str, pd.DataFrame]:
+    """Read the dimension files written by the generator"""
+    return {
+        table: pd.read_csv(data_file(raw_path, table))
+        for table in ['dim_campaign', 'dim_geo', 'dim_date']
+    }
+
+
+def read_dimensions_from_warehouse(engine, schema: str = "ad_dashboard") -> Dict[str, pd.DataFrame]:
+    """Read the dimension tables needed for the extracts from the warehouse"""
+    queries = {
+        'dim_campaign': f"SELECT * FROM {schema}.dim_campaign ORDER BY source_campaign_id",
+        'dim_geo': f"SELECT * FROM {schema}.dim_geo ORDER BY country",
+        'dim_date': f"SELECT * FROM {schema}.dim_date ORDER BY date_key",
+    }
+    return {table: pd.read_sql(sql, engine) for table, sql in queries.items()}
+
+
+def _prepare_campaigns(campaign_df: pd.DataFrame) -> pd.DataFrame:
+    """Select campaign columns and derive the start period attributes"""
+    campaigns = campaign_df.copy()
+    if 'end_date' not in campaigns.columns:
+        campaigns['end_date'] = None
+
+    start = pd.to_datetime(campaigns['start_date'])
+    campaigns['start_month'] = start.dt.month
+    campaigns['start_year'] = start.dt.year
+    campaigns['quarter'] = 'Q' + start.dt.quarter.astype(str)
+    campaigns['campaign_count'] = 1
+    return _to_categorical(campaigns)
+
+
+def _prepare_geography(geo_df: pd.DataFrame) -> pd.DataFrame:
+    """Convert geography attributes to categoricals"""
+    return _to_categorical(geo_df.copy())
+
+
+def _prepare_dates(date_df: pd.DataFrame) -> pd.DataFrame:
+    """Format boolean flags the way the warehouse exports them"""
+    dates = date_df.copy()
+    for column in ['is_weekend', 'is_holiday']:
+        dates[column] = dates[column].astype(bool).map({True: 't', False: 'f'})
+    return dates
+
+
+def _to_categorical(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert repeated string columns to categoricals"""
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def _write_frame(df: pd.DataFrame, path: str) -> int:
+    """Write a single extract"""
+    df.to_csv(path, index=False, float_format='%.2f')
+    return len(df)
+
+
+def _write_combined(campaigns: pd.DataFrame, geography: pd.DataFrame,
+                    path: str, chunk_rows: int) -> int:
+    """Stream the campaign x geography cross join to disk in chunks"""
+    left = campaigns[['campaign_name', 'campaign_type', 'platform', 'start_date', 'end_date',
+                      'budget', 'status', 'start_month', 'start_year', 'quarter', 'campaign_count']]
+    right = geography[['country', 'city', 'region']]
+
+    # Combined extract is ordered by campaign name, then country (stable within country)
+    left = left.sort_values('campaign_name', kind='mergesort', ignore_index=True)
+    right = right.sort_values('country', kind='mergesort', ignore_index=True)
+
+    # Number of campaigns per chunk so each chunk holds about chunk_rows rows
+    campaigns_per_chunk = max(1, chunk_rows // max(1, len(right)))
+    total_rows = 0
+
+    with open(path, 'w', newline='') as f:
+        pd.DataFrame(columns=COMBINED_COLUMNS).to_csv(f, index=False)
+        for start in range(0, len(left), campaigns_per_chunk):
+            chunk = left.iloc[start:start + campaigns_per_chunk].merge(right, how='cross')
+            chunk[COMBINED_COLUMNS].to_csv(f, index=False, header=False, float_format='%.2f')
+            total_rows += len(chunk)
+
+    return total_rows
+
+
+def _fingerprint(frames: List[pd.DataFrame]) -> str:
+    """Content hash of the extract inputs (column names and values)"""
+    digest = hashlib.sha256()
+    for df in frames:
+        digest.update(json.dumps(list(map(str, df.columns))).encode())
+        digest.update(pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _read_manifest(output_dir: str) -> Dict[str, str]:
+    """Read fingerprints of previously exported extracts"""
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(output_dir: str, manifest: Dict[str, str]):
+    """Persist extract fingerprints"""
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
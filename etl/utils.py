@@ -2,29 +2,51 @@
 Utility functions for the ETL pipeline
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
-import psycopg2
-from typing import Optional, Dict, Any
-import colorlog
-import pandas as pd
+import queue
+import time
+from typing import Optional, Dict, Any, TYPE_CHECKING
 from datetime import datetime
 
-def setup_logging(level: str = "INFO", log_file: Optional[str] = None):
-    """Setup colored logging configuration"""
+# psycopg2, colorlog and pandas are imported where they are used so that
+# light helpers (and `import etl.utils`) stay cheap to import.
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_LOG_FILE = os.getenv('LOG_FILE_PATH', os.path.join('logs', 'etl.log'))
+DEFAULT_LOG_MAX_BYTES = 100 * 1024 * 1024  # logging.file_rotation.max_size_mb
+DEFAULT_LOG_BACKUP_COUNT = 5  # logging.file_rotation.backup_count
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Queue handler installed on the root logger and the listener draining it
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(level: str = "INFO", log_file: Optional[str] = None,
+                  max_bytes: int = DEFAULT_LOG_MAX_BYTES,
+                  backup_count: int = DEFAULT_LOG_BACKUP_COUNT,
+                  log_format: str = LOG_FORMAT):
+    """Setup colored, queue-based logging configuration.
     
-    # Create logs directory if it doesn't exist
-    log_dir = "logs"
-    os.makedirs(log_dir, exist_ok=True)
+    Callers only enqueue records; a QueueListener thread formats them and
+    writes to the console and a size-rotated log file. Calling this again
+    replaces the previous setup instead of adding duplicate handlers.
+    """
+    import colorlog
+    global _queue_handler, _queue_listener
     
-    # Default log file
-    if log_file is None:
-        log_file = os.path.join(log_dir, f"etl_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+    # Create logs directory if it doesn't exist
+    log_file = log_file or DEFAULT_LOG_FILE
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
     
     # Color formatter for console
     console_formatter = colorlog.ColoredFormatter(
-        "%(log_color)s%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+        "%(log_color)s" + log_format,
+        datefmt=LOG_DATE_FORMAT,
         log_colors={
             'DEBUG': 'cyan',
             'INFO': 'green',
@@ -34,30 +56,48 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None):
         }
     )
     
-    # File formatter
-    file_formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(console_formatter)
+    
+    # Size-rotated file handler
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
     )
+    file_handler.setFormatter(logging.Formatter(log_format, datefmt=LOG_DATE_FORMAT))
     
-    # Setup root logger
+    # Setup root logger, replacing any previous setup
     logger = logging.getLogger()
+    _stop_queue_logging()
     logger.setLevel(getattr(logging, level.upper()))
     
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
+    logger.addHandler(_queue_handler)
     
     return logger
 
+def _stop_queue_logging():
+    """Flush queued records and stop the listener thread"""
+    global _queue_handler, _queue_listener
+    
+    if _queue_listener is not None:
+        _queue_listener.stop()  # Processes everything still queued
+        for handler in _queue_listener.handlers:
+            handler.close()
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    _queue_handler = _queue_listener = None
+
+atexit.register(_stop_queue_logging)
+
 def get_database_connection():
     """Get PostgreSQL database connection using environment variables"""
+    import psycopg2
     
     connection_params = {
         'host': os.getenv('DB_HOST', 'localhost'),
@@ -77,8 +117,14 @@ def get_database_connection():
     except psycopg2.Error as e:
         raise ConnectionError(f"Failed to connect to database: {str(e)}")
 
-def validate_data_quality(df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
-    """Validate data quality and return metrics"""
+def validate_data_quality(df: 'pd.DataFrame', table_name: str,
+                          null_threshold: float = 0.1,
+                          duplicate_threshold: float = 0.05) -> Dict[str, Any]:
+    """Validate data quality and return metrics.
+    
+    Thresholds are fractions (processing.validation in etl_config.yaml);
+    'passed' is False when any column or the duplicate share exceeds them.
+    """
     
     logger = logging.getLogger(__name__)
     
@@ -108,10 +154,17 @@ def validate_data_quality(df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
     logger.info(f"   Memory: {validation_results['memory_usage_mb']:.2f} MB")
     
     # Warn about high null percentages
-    high_null_cols = [col for col, pct in null_percentages.items() if pct > 10]
+    high_null_cols = [col for col, pct in null_percentages.items() if pct > null_threshold * 100]
     if high_null_cols:
         logger.warning(f"⚠️  High null percentages in columns: {high_null_cols}")
     
+    duplicate_share = validation_results['duplicate_rows'] / len(df) if len(df) > 0 else 0
+    if duplicate_share > duplicate_threshold:
+        logger.warning(f"⚠️  Duplicate rows exceed {duplicate_threshold:.0%}: {duplicate_share:.1%}")
+    
+    validation_results['high_null_columns'] = high_null_cols
+    validation_results['passed'] = not high_null_cols and duplicate_share <= duplicate_threshold
+    
     return validation_results
 
 def calculate_etl_metrics(start_time: datetime, end_time: datetime, 
@@ -215,4 +268,36 @@ class ETLTimer:
     def duration(self):
         if self.start_time and self.end_time:
             return self.end_time - self.start_time
-        return None 
\ No newline at end of file
+        return None 
+
+class ProgressLogger:
+    """Rate-limited progress messages for tight loops"""
+    
+    def __init__(self, operation_name: str, total: Optional[int] = None,
+                 interval_seconds: float = 5.0, logger: Optional[logging.Logger] = None):
+        self.operation_name = operation_name
+        self.total = total
+        self.interval_seconds = interval_seconds
+        self.logger = logger or logging.getLogger(__name__)
+        self.count = 0
+        self.start_time = time.monotonic()
+        self._last_log = self.start_time
+    
+    def update(self, n: int = 1):
+        """Advance by n and log if the interval has elapsed"""
+        self.count += n
+        now = time.monotonic()
+        if now - self._last_log >= self.interval_seconds:
+            self._last_log = now
+            self.logger.info(f"   {self.operation_name}: {self._progress()} "
+                             f"({self.count / (now - self.start_time):,.0f}/s)")
+    
+    def done(self):
+        """Log the final count"""
+        elapsed = time.monotonic() - self.start_time
+        self.logger.info(f"   {self.operation_name}: {self._progress()} in {elapsed:.2f} seconds")
+    
+    def _progress(self) -> str:
+        if self.total:
+            return f"{self.count:,}/{self.total:,} ({self.count / self.total:.0%})"
+        return f"{self.count:,}"
@@ -11,32 +11,35 @@ This script orchestrates the ETL pipeline:
 import os
 import sys
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 import argparse
-import pandas as pd
-import psycopg2
-from io import StringIO
-from sqlalchemy import create_engine
 
 # Add etl package to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'etl'))
 
-from etl.data_generator import DataGenerator, DataGenerationConfig
+# Heavy dependencies (pandas, NumPy, Faker, psycopg2, SQLAlchemy) are imported
+# inside the step that needs them, so --help and single steps start fast.
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def setup_logging(level="INFO"):
-    """Simple logging setup"""
-    logging.basicConfig(
-        level=getattr(logging, level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+def setup_logging(level=None, settings=None):
+    """Queue-based console and rotating file logging"""
+    from etl.settings import load_settings
+    from etl.utils import setup_logging as setup_queue_logging
+    
+    settings = settings or load_settings()
+    log = settings.logging
+    setup_queue_logging(level=level or log.level, max_bytes=log.max_bytes, backup_count=log.backup_count,
+                        log_format=log.format)
     return logging.getLogger(__name__)
 
 def get_database_connection():
     """Get database connection"""
+    import psycopg2
+    
     return psycopg2.connect(
         host=os.getenv('DB_HOST', 'localhost'),
         port=int(os.getenv('DB_PORT', '5432')),
@@ -45,8 +48,22 @@ def get_database_connection():
         password=os.getenv('DB_PASSWORD')
     )
 
+@contextmanager
+def warehouse_connection(enabled=True):
+    """Database connection closed on exit, or None when disabled"""
+    if not enabled:
+        yield None
+        return
+    conn = get_database_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
 def get_sqlalchemy_engine():
     """Get SQLAlchemy engine for pandas operations"""
+    from sqlalchemy import create_engine
+    
     db_url = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME', 'ad_dashboard')}"
     return create_engine(db_url)
 
@@ -55,32 +72,137 @@ def main():
     
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Run Apple Ad Dashboard ETL Pipeline')
-    parser.add_argument('--step', choices=['generate', 'load', 'all'], 
+    parser.add_argument('--step', choices=['generate', 'attribute', 'cohorts', 'funnel', 'ab-tests', 'load', 'refresh', 'export', 'reconcile', 'local-views', 'sample', 'merge-shards', 'stream', 'all'], 
                        default='all', help='ETL step to run')
+    parser.add_argument('--use-cache', action='store_true',
+                       help='Reuse a cached dataset generated with the same configuration')
+    parser.add_argument('--fact-store', metavar='DIR', default=os.getenv('FACT_STORE_PATH'),
+                       help='Generate facts month by month into an on-disk columnar store')
+    parser.add_argument('--shard', metavar='I/N', default=os.getenv('ETL_SHARD'),
+                       help='Generate only shard I of N (dimensions are identical on every shard)')
+    parser.add_argument('--shard-manifests', nargs='+', metavar='PATH', default=[],
+                       help='Shard manifests to merge, or shard data directories to merge and combine into '
+                            'RAW_DATA_PATH')
+    parser.add_argument('--verify-single-node', action='store_true',
+                       help='When merging shards, regenerate on one node and compare')
+    parser.add_argument('--memory-budget', metavar='SIZE', default=os.getenv('ETL_MEMORY_BUDGET'),
+                       help='Size read/generate/write chunks to stay under this RSS (e.g. 2GB)')
+    parser.add_argument('--stream-to', metavar='TARGET', default='-',
+                       help="Event stream target: '-', a file or pipe path, unix:/path or tcp:host:port")
+    parser.add_argument('--events-per-second', type=float, default=None,
+                       help='Cap the event stream rate (default: as fast as the sink accepts)')
+    parser.add_argument('--load-mode', choices=['append', 'merge'], default=None,
+                       help='append, or merge (upsert on natural keys, safe to rerun); default from settings')
+    parser.add_argument('--lookback-days', type=int, default=None,
+                       help='Attribution lookback window in days (default: 30)')
+    parser.add_argument('--warehouse-touchpoints', action='store_true',
+                       help='Also match conversions to paid sessions already in the warehouse from the lookback '
+                            'window before the batch (incremental loads); without it, conversions in the '
+                            "batch's first lookback days whose touches are in an earlier batch stay unattributed")
+    parser.add_argument('--months', metavar='YYYYMM[-YYYYMM],...', default=None,
+                       help='Retention periods to rebuild for --step cohorts (default: months in the generated files)')
+    parser.add_argument('--granularity', choices=['month', 'day'], default='month',
+                       help='Partition size for --step reconcile fingerprints (default: month)')
+    parser.add_argument('--rows-per-stratum', type=int, default=None,
+                       help='Rows kept per date/campaign/country for --step sample (default: 3)')
+    parser.add_argument('--export-source', choices=['raw', 'warehouse'],
+                       default='warehouse', help='Source for Tableau extracts')
+    parser.add_argument('--force-export', action='store_true',
+                       help='Rewrite Tableau extracts even if inputs are unchanged')
+    parser.add_argument('--config', metavar='PATH', default=None,
+                       help='ETL settings file (default: ETL_CONFIG_PATH or config/etl_config.yaml)')
+    parser.add_argument('--env', default=None,
+                       help='Settings environment override to apply, e.g. production (default: ETL_ENV)')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
-                       default='INFO', help='Logging level')
+                       default=None, help='Logging level (default: from settings)')
     
     args = parser.parse_args()
     
+    from etl.settings import load_settings
+    settings = load_settings(args.config, args.env)
+    
     # Setup logging
-    logger = setup_logging(level=args.log_level)
+    logger = setup_logging(level=args.log_level, settings=settings)
     
     logger.info("=" * 60)
     logger.info("🍎 Apple Ad Performance Dashboard ETL Pipeline")
     logger.info("=" * 60)
     logger.info(f"Started at: {datetime.now()}")
     logger.info(f"Step: {args.step}")
+    if settings.environment:
+        logger.info(f"Environment: {settings.environment}")
     
     try:
         if args.step in ['generate', 'all']:
             logger.info("\n📊 Step 1: Data Generation")
             logger.info("-" * 30)
-            generate_data()
+            generate_data(use_cache=args.use_cache, fact_store=args.fact_store, shard=args.shard,
+                          memory_budget=args.memory_budget, settings=settings,
+                          lookback_days=args.lookback_days, warehouse_touchpoints=args.warehouse_touchpoints)
+        
+        if args.step == 'attribute':
+            logger.info("\n🎯 Attributing conversions")
+            logger.info("-" * 30)
+            attribute_data(lookback_days=args.lookback_days, settings=settings,
+                           warehouse_touchpoints=args.warehouse_touchpoints)
+        
+        if args.step == 'cohorts':
+            logger.info("\n👥 Building retention cohorts")
+            logger.info("-" * 30)
+            build_cohorts(settings=settings, months=args.months)
+        
+        if args.step == 'funnel':
+            logger.info("\n🪜 Building funnel events")
+            logger.info("-" * 30)
+            build_funnel(memory_budget=args.memory_budget, settings=settings)
+        
+        if args.step == 'ab-tests':
+            logger.info("\n🧪 Analyzing A/B tests")
+            logger.info("-" * 30)
+            analyze_ab_tests(settings=settings)
         
         if args.step in ['load', 'all']:
             logger.info("\n🔄 Step 2: Data Loading")
             logger.info("-" * 30)
-            load_data()
+            load_data(memory_budget=args.memory_budget, settings=settings, load_mode=args.load_mode)
+        
+        if args.step == 'refresh':
+            logger.info("\n🔁 Rebuilding rollup tables")
+            logger.info("-" * 30)
+            refresh_rollups()
+        
+        if args.step == 'reconcile':
+            logger.info("\n🧮 Reconciling generated files with the warehouse")
+            logger.info("-" * 30)
+            reconcile_warehouse(granularity=args.granularity, settings=settings)
+        
+        if args.step == 'local-views':
+            logger.info("\n🧪 Computing dashboard views from local files")
+            logger.info("-" * 30)
+            compute_local_views(fact_store=args.fact_store, settings=settings)
+        
+        if args.step == 'sample':
+            logger.info("\n🧫 Sampling the generated dataset")
+            logger.info("-" * 30)
+            sample_data(rows_per_stratum=args.rows_per_stratum, settings=settings)
+        
+        if args.step == 'merge-shards':
+            logger.info("\n🧩 Merging shards")
+            logger.info("-" * 30)
+            merge_shard_outputs(args.shard_manifests, verify=args.verify_single_node, settings=settings,
+                                lookback_days=args.lookback_days,
+                                warehouse_touchpoints=args.warehouse_touchpoints)
+        
+        if args.step == 'stream':
+            logger.info("\n📡 Streaming events")
+            logger.info("-" * 30)
+            stream_data(args.stream_to, events_per_second=args.events_per_second,
+                        shard=args.shard, settings=settings)
+        
+        if args.step == 'export':
+            logger.info("\n📦 Exporting Tableau extracts")
+            logger.info("-" * 30)
+            export_extracts(source=args.export_source, force=args.force_export, settings=settings)
         
         logger.info("\n✅ ETL Pipeline completed successfully!")
         logger.info(f"Finished at: {datetime.now()}")
@@ -89,113 +211,483 @@ def main():
         logger.error(f"❌ ETL Pipeline failed: {str(e)}")
         raise
 
-def generate_data():
+def build_generation_config(shard=None, settings=None):
+    """Data generation configuration from settings, environment variables and an optional 'i/N' shard
+    
+    DATA_* and SIMULATION_SEED environment variables override the settings file.
+    """
+    from etl.settings import generation_config, load_settings
+    from etl.sharding import parse_shard
+    
+    settings = settings or load_settings()
+    shard_index, shard_count = parse_shard(shard) if shard else (0, 1)
+    seed = os.getenv('SIMULATION_SEED')
+    return generation_config(
+        settings,
+        start_date=os.getenv('DATA_START_DATE'),
+        end_date=os.getenv('DATA_END_DATE'),
+        daily_volume_scale=os.getenv('DATA_VOLUME_SCALE'),
+        workload=os.getenv('DATA_WORKLOAD'),
+        seed=int(seed) if seed else None,
+        shard_index=shard_index,
+        shard_count=shard_count
+    )
+
+def make_chunker(memory_budget=None, **limits):
+    """Adaptive chunk sizer for an optional memory budget such as '2GB'"""
+    from etl.memory import AdaptiveChunker, parse_memory_size
+    
+    budget = parse_memory_size(memory_budget) if memory_budget else None
+    return AdaptiveChunker(budget, **limits)
+
+def generate_data(use_cache=False, fact_store=None, shard=None, memory_budget=None, settings=None,
+                  lookback_days=None, warehouse_touchpoints=False):
     """Generate simulated data"""
+    from etl.data_generator import DataGenerator
+    from etl.aggregations import build_summary_tables
+    from etl.ab_testing import AB_TEST_TABLE, ab_test_results
+    from etl.attribution import ATTRIBUTION_TABLE, DEFAULT_LOOKBACK_DAYS, run_attribution
+    from etl.cohorts import RETENTION_TABLE, activity_months, build_customer_retention
+    from etl.compression import output_file
+    from etl.funnel import DEFAULT_CHUNK_SESSIONS, FUNNEL_TABLE, write_funnel_events
+    from etl.sharding import build_shard_manifest, write_shard_manifest
+    
     logger = logging.getLogger(__name__)
     
+    from etl.settings import load_settings
+    
+    settings = settings or load_settings()
+    
     # Create data generation configuration
-    config = DataGenerationConfig(
-        start_date=os.getenv('DATA_START_DATE', '2024-01-01'),
-        end_date=os.getenv('DATA_END_DATE', '2024-12-31'),
-        daily_volume_scale=os.getenv('DATA_VOLUME_SCALE', 'medium'),
-        seed=int(os.getenv('SIMULATION_SEED', '42'))
-    )
+    config = build_generation_config(shard, settings)
     
     logger.info(f"📈 Generating data from {config.start_date} to {config.end_date}")
     logger.info(f"📊 Volume scale: {config.daily_volume_scale}")
     logger.info(f"🎲 Random seed: {config.seed}")
+    logger.info(f"🔥 Workload: {config.workload.name}")
+    if config.shard_count > 1:
+        logger.info(f"🧩 Shard: {config.shard_index}/{config.shard_count}")
     
-    # Initialize generator
-    generator = DataGenerator(config)
+    if fact_store:
+        generate_data_out_of_core(config, fact_store, memory_budget, lookback_days, settings,
+                                  warehouse_touchpoints)
+        return
+    
+    if use_cache:
+        # Identical configs are served from the on-disk generation cache
+        from etl.cache import cached_generate
+        dimensions, facts = cached_generate(config)
+    else:
+        # Initialize generator
+        generator = DataGenerator(config)
+        
+        # Generate dimension data
+        logger.info("🗂️  Generating dimension tables...")
+        dimensions = generator.generate_dimension_data()
+        
+        # Generate fact data
+        logger.info("📋 Generating fact tables...")
+        facts = generator.generate_fact_data()
+    
+    # Pre-aggregate rollups while the facts are still in memory
+    logger.info("🧮 Building summary tables...")
+    summaries = build_summary_tables(dimensions, facts)
+    
+    # Lookback windows and cohorts span months, so shards are processed after they are combined
+    if config.shard_count == 1:
+        logger.info("🎯 Attributing conversions...")
+        with warehouse_connection(warehouse_touchpoints) as warehouse:
+            facts['fact_conversions'], summaries[ATTRIBUTION_TABLE] = run_attribution(
+                facts, lookback_days or DEFAULT_LOOKBACK_DAYS, warehouse=warehouse
+            )
+        logger.info("👥 Building retention cohorts...")
+        # Only this batch's months, so reloading it leaves earlier periods alone
+        facts[RETENTION_TABLE] = build_customer_retention(
+            dimensions['dim_user'], facts['fact_web_analytics'], facts['fact_conversions'],
+            activity_months(facts['fact_web_analytics'], facts['fact_conversions'])
+        )
+        logger.info("🧪 Analyzing A/B tests...")
+        summaries[AB_TEST_TABLE] = ab_test_results(facts['fact_ad_performance'], seed=config.seed)
+    else:
+        logger.info("🎯 Skipping attribution, cohorts and A/B tests for a shard; they run when "
+                    "--step merge-shards combines the shards' data directories")
     
-    # Generate dimension data
+    validation = settings.processing.validation
+    if validation.enabled:
+        from etl.utils import validate_data_quality
+        for table_name, df in {**dimensions, **facts}.items():
+            validate_data_quality(df, table_name, validation.null_threshold, validation.duplicate_threshold)
+    
+    # Save to files
+    compression = settings.files.compression
+    save_data_files({**dimensions, **facts, **summaries}, memory_budget, compression, settings)
+    
+    # Funnel events outnumber sessions, so they are streamed to disk in chunks
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    logger.info("🪜 Building funnel events...")
+    write_funnel_events(facts['fact_web_analytics'], output_file(raw_path, FUNNEL_TABLE, compression),
+                        config.seed, make_chunker(memory_budget, initial_rows=DEFAULT_CHUNK_SESSIONS))
+    
+    if config.shard_count > 1:
+        path = write_shard_manifest(build_shard_manifest(config, dimensions, facts), raw_path)
+        logger.info(f"🧩 Wrote shard manifest to {path}")
+    
+    logger.info("✅ Data generation completed")
+
+def generate_data_out_of_core(config, store_path, memory_budget=None, lookback_days=None, settings=None,
+                              warehouse_touchpoints=False):
+    """Generate facts into a columnar store so no table has to fit in memory"""
+    from etl.data_generator import DataGenerator
+    from etl.aggregations import build_summary_tables_from_store
+    from etl.columnar_store import ColumnarStore, generate_facts_to_store, validate_store_table
+    from etl.compression import output_file
+    from etl.settings import load_settings
+    from etl.sharding import build_store_shard_manifest, write_shard_manifest
+    
+    logger = logging.getLogger(__name__)
+    settings = settings or load_settings()
+    compression = settings.files.compression
+    
+    generator = DataGenerator(config)
     logger.info("🗂️  Generating dimension tables...")
     dimensions = generator.generate_dimension_data()
     
-    # Generate fact data
-    logger.info("📋 Generating fact tables...")
-    facts = generator.generate_fact_data()
+    logger.info(f"📋 Generating fact tables into {store_path}...")
+    store = ColumnarStore(store_path)
+    # Generation chunks are measured in days (at most one monthly partition)
+    day_chunker = make_chunker(memory_budget, initial_rows=31, min_rows=1, max_rows=31)
+    generate_facts_to_store(generator, store, chunker=day_chunker)
+    for table in store.tables():
+        validate_store_table(store, table)
     
-    # Save to files
-    save_data_files({**dimensions, **facts})
+    logger.info("🧮 Building summary tables...")
+    summaries = build_summary_tables_from_store(dimensions, store)
+    save_data_files({**dimensions, **summaries}, memory_budget, compression, settings)
+    
+    # Stream the facts to the raw files one partition at a time for the load step
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    for table in store.tables():
+        filename = output_file(raw_path, table, compression)
+        rows = store.export_csv(table, filename)
+        logger.info(f"💾 Saved {rows:,} rows to {filename}")
+    # Funnel events depend only on their session, so shards build them too
+    build_funnel(memory_budget, settings=settings, seed=config.seed)
+    
+    if config.shard_count > 1:
+        path = write_shard_manifest(build_store_shard_manifest(config, dimensions, store), raw_path)
+        logger.info(f"🧩 Wrote shard manifest to {path}")
+    else:
+        attribute_data(lookback_days, settings=settings, warehouse_touchpoints=warehouse_touchpoints)
+        build_cohorts(settings=settings)
+        analyze_ab_tests(settings=settings, seed=config.seed)
     
     logger.info("✅ Data generation completed")
 
-def save_data_files(data_dict):
-    """Save generated data to CSV files"""
+def attribute_data(lookback_days=None, settings=None, warehouse_touchpoints=False):
+    """Attribute the generated conversion CSVs to preceding paid sessions
+    
+    With warehouse_touchpoints, paid sessions already loaded from the lookback window
+    before the batch are matched too; otherwise conversions whose touches are in an
+    earlier batch stay unattributed.
+    """
+    from etl.attribution import DEFAULT_LOOKBACK_DAYS, attribute_files
+    from etl.settings import load_settings
+    
+    logger = logging.getLogger(__name__)
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    lookback_days = lookback_days or DEFAULT_LOOKBACK_DAYS
+    logger.info(f"🎯 Attributing conversions in {raw_path} ({lookback_days}-day lookback)")
+    with warehouse_connection(warehouse_touchpoints) as warehouse:
+        attribute_files(raw_path, lookback_days, compression=settings.files.compression, warehouse=warehouse)
+
+def build_cohorts(settings=None, months=None):
+    """Build fact_customer_retention for the given months (default: those in the generated files)"""
+    from etl.cohorts import build_retention_files, parse_months
+    from etl.settings import load_settings
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    months = parse_months(months) if months else None
+    logging.getLogger(__name__).info(f"👥 Building retention cohorts from {raw_path}"
+                                     + (f" for {len(months)} months" if months else ""))
+    build_retention_files(raw_path, months, compression=settings.files.compression)
+
+def analyze_ab_tests(settings=None, seed=None):
+    """Build agg_ab_test_results from the generated ad performance file"""
+    from etl.ab_testing import ab_test_files
+    from etl.settings import load_settings
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    seed = build_generation_config(settings=settings).seed if seed is None else seed
+    logging.getLogger(__name__).info(f"🧪 Analyzing A/B tests in {raw_path}")
+    ab_test_files(raw_path, seed=seed, compression=settings.files.compression)
+
+def build_funnel(memory_budget=None, settings=None, seed=None):
+    """Build fact_funnel_events from the generated session file in memory-bounded chunks"""
+    from etl.funnel import DEFAULT_CHUNK_SESSIONS, build_funnel_files
+    from etl.settings import load_settings
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    seed = build_generation_config(settings=settings).seed if seed is None else seed
+    logging.getLogger(__name__).info(f"🪜 Building funnel events from {raw_path}")
+    build_funnel_files(raw_path, seed, make_chunker(memory_budget, initial_rows=DEFAULT_CHUNK_SESSIONS),
+                       settings.files.compression)
+
+def merge_shard_outputs(paths, verify=False, settings=None, lookback_days=None, warehouse_touchpoints=False):
+    """Check that shard manifests form one complete dataset and record the merge
+    
+    Given the shards' data directories, their files are also combined into RAW_DATA_PATH,
+    and attribution, cohorts and A/B tests run on the combined files.
+    """
+    from etl.sharding import combine_shard_files, merge_shards
+    from etl.settings import load_settings
+    
+    logger = logging.getLogger(__name__)
+    
+    if not paths:
+        raise ValueError("--shard-manifests is required for --step merge-shards")
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    config = build_generation_config(settings=settings) if verify else None
+    merged = merge_shards(paths, config=config, output_dir=raw_path)
+    
+    if not all(os.path.isdir(path) for path in paths):
+        logger.info("🧩 Manifests only: pass the shards' data directories to combine their files")
+        return
+    combine_shard_files(paths, raw_path, merged['dimensions'], settings.files.compression)
+    attribute_data(lookback_days, settings=settings, warehouse_touchpoints=warehouse_touchpoints)
+    build_cohorts(settings=settings)
+    analyze_ab_tests(settings=settings)
+
+def save_data_files(data_dict, memory_budget=None, compression=None, settings=None):
+    """Save generated data to CSV files, block-compressed in parallel when compression is set"""
+    from etl.compression import open_csv, output_file
+    from etl.settings import load_settings
+    
     logger = logging.getLogger(__name__)
+    settings = settings or load_settings()
     
     # Ensure directories exist
-    raw_path = os.getenv('RAW_DATA_PATH', 'data/raw/')
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
     os.makedirs(raw_path, exist_ok=True)
     
     total_rows = 0
     for table_name, df in data_dict.items():
-        filename = os.path.join(raw_path, f"{table_name}.csv")
-        df.to_csv(filename, index=False)
+        filename = output_file(raw_path, table_name, compression)
+        chunksize = None
+        if memory_budget:
+            chunker = make_chunker(memory_budget)
+            chunker.observe_frame(df)
+            chunksize = chunker.next_size()
+        with open_csv(filename) as f:
+            df.to_csv(f, index=False, chunksize=chunksize)
         logger.info(f"💾 Saved {len(df):,} rows to {filename}")
         total_rows += len(df)
     
     logger.info(f"📊 Total rows generated: {total_rows:,}")
 
-def load_data():
+def load_data(memory_budget=None, settings=None, load_mode=None):
     """Load data from CSV files into database"""
+    from etl.aggregations import REFRESHED_SUMMARY_TABLES, SUMMARY_TABLES
+    from etl.attribution import ATTRIBUTION_TABLE
+    from etl.funnel import FUNNEL_TABLE
+    from etl.loader import TableLoader
+    from etl.memory import parse_memory_size
+    from etl.queries import chunk_date_keys, record_load_generation
+    from etl.refresh import AffectedGroups
+    from etl.settings import load_settings
+    
     logger = logging.getLogger(__name__)
     
     logger.info("📤 Loading data into database...")
     
-    # Define load order (dimensions first, then facts)
-    load_order = [
-        'dim_date',
-        'dim_campaign', 
-        'dim_geo',
-        'dim_device',
-        'dim_user',
-        'fact_ad_performance',
-        'fact_web_analytics', 
-        'fact_conversions'
-    ]
-    
-    raw_path = os.getenv('RAW_DATA_PATH', 'data/raw/')
-    engine = get_sqlalchemy_engine()
+    # Define load order (dimensions first, then facts, then rollups and derived
+    # facts); tables within each stage are independent and load concurrently
+    dimension_tables = ['dim_date', 'dim_campaign', 'dim_geo', 'dim_device', 'dim_user']
+    fact_tables = ['fact_ad_performance', 'fact_web_analytics', 'fact_conversions', FUNNEL_TABLE]
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    loader = TableLoader(
+        get_sqlalchemy_engine(),
+        settings.processing,
+        memory_budget=parse_memory_size(memory_budget) if memory_budget else None,
+        load_mode=load_mode
+    )
+    if loader.load_mode == 'merge':
+        logger.info("🔀 Merge mode: upserting on natural keys through staging tables")
+    affected = AffectedGroups()
+    loaded_dates = set()
+    
+    def track_affected(table_name, chunk):
+        if table_name == 'fact_ad_performance':
+            affected.add(chunk)
+        elif table_name in ('fact_web_analytics', 'fact_conversions'):
+            affected.add_activity(chunk)
+        loaded_dates.update(chunk_date_keys(chunk))
     
     try:
-        total_loaded = 0
-        
-        for table_name in load_order:
-            csv_file = os.path.join(raw_path, f"{table_name}.csv")
-            
-            if not os.path.exists(csv_file):
-                logger.warning(f"⚠️  File not found: {csv_file}")
-                continue
-            
-            logger.info(f"📥 Loading {table_name}...")
-            
-            # Load data in smaller chunks to avoid memory issues
-            chunk_size = 100  # Much smaller batch size
-            total_rows = 0
-            
-            for chunk in pd.read_csv(csv_file, chunksize=chunk_size):
-                chunk.to_sql(
-                    table_name, 
-                    engine, 
-                    schema='ad_dashboard',
-                    if_exists='append', 
-                    index=False,
-                    method='multi'
-                )
-                total_rows += len(chunk)
-                if total_rows % 1000 == 0:  # Progress indicator
-                    logger.info(f"   Loaded {total_rows} rows so far...")
-            
-            logger.info(f"✅ Loaded {total_rows} rows into {table_name}")
-            total_loaded += total_rows
-        
-        logger.info(f"🎉 Successfully loaded {total_loaded:,} total rows into database!")
+        loaded = loader.load_tables(dimension_tables, raw_path)
+        dimensions_changed = any(loaded.values())
+        loaded.update(loader.load_tables(fact_tables, raw_path, on_chunk=track_affected, parallel=True))
+        
+        # Monthly rollups, retention and A/B test results are recomputed by refresh_rollups,
+        # since a batch may hold part of a month or of a test
+        summary_tables = [table for table in SUMMARY_TABLES if table not in REFRESHED_SUMMARY_TABLES]
+        derived_tables = summary_tables + [ATTRIBUTION_TABLE]
+        loaded.update(loader.load_tables(derived_tables, raw_path, on_chunk=track_affected, parallel=True))
+        
+        logger.info(f"🎉 Successfully loaded {sum(loaded.values()):,} total rows into database!")
+        
+        loader.optimize(table for table, rows in loaded.items() if rows)
+        
+        # Post-load: refresh only the rollup groups touched by this batch
+        if affected:
+            refresh_rollups(affected)
+        
+        # Dashboard query caches drop results overlapping the loaded dates, or
+        # every result when dimension rows (campaign names, geos, ...) changed
+        if any(loaded.values()):
+            conn = get_database_connection()
+            try:
+                record_load_generation(conn, loaded_dates, all_dates=dimensions_changed)
+            finally:
+                conn.close()
         
     except Exception as e:
         logger.error(f"❌ Error loading data: {str(e)}")
         raise
 
+def stream_data(target, events_per_second=None, shard=None, settings=None):
+    """Replay generated data as a timestamp-ordered NDJSON event stream"""
+    from etl.data_generator import DataGenerator
+    from etl.stream import open_sink, stream_events
+    
+    logger = logging.getLogger(__name__)
+    
+    config = build_generation_config(shard, settings)
+    generator = DataGenerator(config)
+    generator.generate_dimension_data()
+    
+    logger.info(f"📡 Streaming events from {config.start_date} to {config.end_date} to {target}")
+    stream_events(generator, open_sink(target), events_per_second=events_per_second)
+
+def export_extracts(source='warehouse', force=False, settings=None):
+    """Export the tableau_data/ extracts from generated files or the warehouse"""
+    from etl.settings import load_settings
+    from etl.tableau_export import (
+        export_tableau_extracts,
+        read_dimensions_from_raw,
+        read_dimensions_from_warehouse
+    )
+    
+    logger = logging.getLogger(__name__)
+    
+    if source == 'raw':
+        settings = settings or load_settings()
+        raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+        logger.info(f"📂 Reading dimensions from {raw_path}")
+        dimensions = read_dimensions_from_raw(raw_path)
+    else:
+        logger.info("🗄️  Reading dimensions from warehouse")
+        dimensions = read_dimensions_from_warehouse(get_sqlalchemy_engine())
+    
+    output_dir = os.getenv('TABLEAU_DATA_PATH', 'tableau_data')
+    results = export_tableau_extracts(dimensions, output_dir=output_dir, force=force)
+    written = sum(1 for status in results.values() if status == 'written')
+    logger.info(f"✅ {written} extracts written, {len(results) - written} unchanged")
+
+def reconcile_warehouse(granularity='month', settings=None):
+    """Compare per-partition fingerprints of the generated files and the warehouse"""
+    from etl.reconcile import REPORT_FILE, partitions_to_reload, reconcile
+    from etl.settings import load_settings
+    
+    logger = logging.getLogger(__name__)
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    conn = get_database_connection()
+    try:
+        report = reconcile(raw_path, conn, granularity=granularity)
+    finally:
+        conn.close()
+    
+    filename = os.path.join(raw_path, REPORT_FILE)
+    report.to_csv(filename, index=False)
+    logger.info(f"💾 Saved reconciliation report to {filename}")
+    
+    reload = partitions_to_reload(report)
+    for table, partitions in reload.items():
+        logger.warning(f"⚠️  {table}: reload partitions {', '.join(map(str, partitions))}")
+    if not reload:
+        logger.info("✅ Every partition matches the generated files")
+    return report
+
+def compute_local_views(fact_store=None, settings=None):
+    """Compute every dashboard view from the generated files (no database) and save them as CSV"""
+    import time
+    from etl.local_views import LocalBackend
+    from etl.queries import DASHBOARD_VIEWS, query_request
+    from etl.settings import load_settings
+    
+    logger = logging.getLogger(__name__)
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    output_dir = os.path.join(settings.files.processed_data, 'views')
+    os.makedirs(output_dir, exist_ok=True)
+    
+    backend = LocalBackend(raw_path, fact_store)
+    for view in DASHBOARD_VIEWS:
+        start = time.perf_counter()
+        frame = backend.query(query_request(view))
+        elapsed = time.perf_counter() - start
+        frame.to_csv(os.path.join(output_dir, f"{view}.csv"), index=False)
+        logger.info(f"⏱️  {view}: {len(frame):,} rows in {elapsed:.2f}s")
+    logger.info(f"💾 Saved {len(DASHBOARD_VIEWS)} views to {output_dir}")
+
+def sample_data(rows_per_stratum=None, settings=None):
+    """Write a stratified sample of the generated files to the sample data path"""
+    from etl.sampling import DEFAULT_ROWS_PER_STRATUM, sample_dataset
+    from etl.settings import load_settings
+    
+    settings = settings or load_settings()
+    raw_path = os.getenv('RAW_DATA_PATH', settings.files.raw_data)
+    seed = build_generation_config(settings=settings).seed
+    logging.getLogger(__name__).info(f"🧫 Sampling {raw_path} into {settings.files.sample_data}")
+    sample_dataset(raw_path, settings.files.sample_data, rows_per_stratum or DEFAULT_ROWS_PER_STRATUM, seed=seed)
+
+def refresh_rollups(affected=None):
+    """Incrementally refresh rollup tables for the groups affected by a load.
+    
+    Without an affected set every group is rebuilt (initial backfill).
+    """
+    from etl.ab_testing import refresh_ab_test_results
+    from etl.cohorts import refresh_customer_retention
+    from etl.refresh import refresh_campaign_trends, refresh_monthly_campaign
+    
+    logger = logging.getLogger(__name__)
+    
+    conn = get_database_connection()
+    try:
+        if affected is None:
+            refresh_campaign_trends(conn)
+            refresh_monthly_campaign(conn)
+            refresh_ab_test_results(conn)
+            refresh_customer_retention(conn)
+        else:
+            logger.info(f"🔁 Refreshing campaign trends for {len(affected.date_keys)} affected dates...")
+            refresh_campaign_trends(conn, affected.date_keys, affected.campaign_keys)
+            refresh_monthly_campaign(conn, affected.date_keys, affected.campaign_keys)
+            refresh_ab_test_results(conn, affected.ab_test_ids)
+            refresh_customer_retention(conn, affected.activity_months)
+    finally:
+        conn.close()
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -287,6 +287,134 @@ CREATE TABLE fact_funnel_events (
     CONSTRAINT positive_step_number CHECK (funnel_step_number > 0)
 );
 
+-- =============================================================================
+-- SUMMARY TABLES (pre-aggregated by the ETL, see etl/aggregations.py)
+-- =============================================================================
+
+-- Daily x Campaign x Country Rollup
+CREATE TABLE agg_daily_campaign_country (
+    date_key INTEGER NOT NULL REFERENCES dim_date(date_key),
+    campaign_key UUID NOT NULL REFERENCES dim_campaign(campaign_key),
+    country VARCHAR(100) NOT NULL,
+    country_code CHAR(2) NOT NULL,
+    total_impressions BIGINT DEFAULT 0,
+    total_clicks BIGINT DEFAULT 0,
+    total_spend DECIMAL(14,2) DEFAULT 0.00,
+    total_conversions BIGINT DEFAULT 0,
+    total_revenue DECIMAL(14,2) DEFAULT 0.00,
+    record_count INTEGER DEFAULT 0,
+    ctr_percent DECIMAL(8,4),
+    avg_cpc DECIMAL(10,2),
+    avg_cpa DECIMAL(10,2),
+    roas DECIMAL(8,2),
+    etl_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date_key, campaign_key, country_code)
+);
+
+-- Monthly x Campaign Rollup
+CREATE TABLE agg_monthly_campaign (
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    campaign_key UUID NOT NULL REFERENCES dim_campaign(campaign_key),
+    total_impressions BIGINT DEFAULT 0,
+    total_clicks BIGINT DEFAULT 0,
+    total_spend DECIMAL(14,2) DEFAULT 0.00,
+    total_conversions BIGINT DEFAULT 0,
+    total_revenue DECIMAL(14,2) DEFAULT 0.00,
+    active_days INTEGER DEFAULT 0,
+    unique_geos INTEGER DEFAULT 0,
+    record_count INTEGER DEFAULT 0,
+    ctr_percent DECIMAL(8,4),
+    avg_cpc DECIMAL(10,2),
+    avg_cpa DECIMAL(10,2),
+    roas DECIMAL(8,2),
+    etl_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (year, month, campaign_key)
+);
+
+-- Date x Platform Rollup
+CREATE TABLE agg_daily_platform (
+    date_key INTEGER NOT NULL REFERENCES dim_date(date_key),
+    platform VARCHAR(50) NOT NULL,
+    total_impressions BIGINT DEFAULT 0,
+    total_clicks BIGINT DEFAULT 0,
+    total_spend DECIMAL(14,2) DEFAULT 0.00,
+    total_conversions BIGINT DEFAULT 0,
+    total_revenue DECIMAL(14,2) DEFAULT 0.00,
+    active_campaigns INTEGER DEFAULT 0,
+    record_count INTEGER DEFAULT 0,
+    ctr_percent DECIMAL(8,4),
+    avg_cpc DECIMAL(10,2),
+    avg_cpa DECIMAL(10,2),
+    roas DECIMAL(8,2),
+    etl_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date_key, platform)
+);
+
+-- Date x Campaign x Attribution Model Rollup (see etl/attribution.py)
+CREATE TABLE agg_campaign_attribution (
+    date_key INTEGER NOT NULL REFERENCES dim_date(date_key),
+    campaign_key UUID NOT NULL REFERENCES dim_campaign(campaign_key),
+    attribution_model VARCHAR(50) NOT NULL, -- 'last_click', 'first_click', 'linear', 'time_decay'
+    attributed_conversions DECIMAL(14,4) DEFAULT 0,
+    attributed_revenue DECIMAL(14,2) DEFAULT 0.00,
+    touchpoints INTEGER DEFAULT 0,
+    etl_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date_key, campaign_key, attribution_model)
+);
+
+-- A/B Test Significance per Test x Metric x Treatment Variant (see etl/ab_testing.py)
+CREATE TABLE agg_ab_test_results (
+    ab_test_id VARCHAR(100) NOT NULL,
+    metric VARCHAR(50) NOT NULL, -- 'ctr', 'cvr', 'revenue_per_click'
+    control_variant VARCHAR(50) NOT NULL,
+    treatment_variant VARCHAR(50) NOT NULL,
+    control_value DECIMAL(14,6),
+    treatment_value DECIMAL(14,6),
+    absolute_lift DECIMAL(14,6),
+    relative_lift DECIMAL(14,6),
+    ci_lower DECIMAL(14,6),
+    ci_upper DECIMAL(14,6),
+    z_score DECIMAL(12,6),
+    p_value DECIMAL(8,6),
+    confidence_level DECIMAL(4,3),
+    is_significant BOOLEAN DEFAULT FALSE,
+    control_sample BIGINT, -- Impressions for CTR, clicks for CVR and revenue per click
+    treatment_sample BIGINT,
+    test_method VARCHAR(20), -- 'delta_method' or 'bootstrap'
+    etl_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (ab_test_id, metric, treatment_variant)
+);
+
+-- =============================================================================
+-- LOAD GENERATIONS (dashboard query cache invalidation, see etl/queries.py)
+-- =============================================================================
+
+-- Every load takes the next generation and records the date ranges it touched;
+-- NULL bounds mean the load may have changed any date
+CREATE SEQUENCE load_generation_seq;
+
+CREATE TABLE load_generations (
+    generation BIGINT NOT NULL,
+    start_date_key INTEGER,
+    end_date_key INTEGER,
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_load_generations_generation ON load_generations(generation);
+
+-- =============================================================================
+-- NATURAL KEYS (merge loads upsert on these, see etl/loader.py)
+-- =============================================================================
+
+-- Nullable key parts are coalesced so rows with NULL region/city still match
+CREATE UNIQUE INDEX uq_dim_geo_natural ON dim_geo(country_code, (COALESCE(region, '')), (COALESCE(city, '')));
+CREATE UNIQUE INDEX uq_dim_device_natural ON dim_device(device_type, (COALESCE(operating_system, '')), (COALESCE(browser, '')));
+CREATE UNIQUE INDEX uq_fact_ad_performance_natural ON fact_ad_performance(date_key, campaign_key, geo_key);
+CREATE UNIQUE INDEX uq_fact_web_analytics_session ON fact_web_analytics(session_id);
+CREATE UNIQUE INDEX uq_fact_funnel_events_step ON fact_funnel_events(session_id, funnel_step_number);
+CREATE UNIQUE INDEX uq_fact_customer_retention_period ON fact_customer_retention(user_key, period_number);
+
 -- =============================================================================
 -- INDEXES FOR PERFORMANCE
 -- =============================================================================
@@ -339,6 +467,13 @@ COMMENT ON TABLE fact_conversions IS 'Conversion events with attribution';
 COMMENT ON TABLE fact_customer_retention IS 'Customer cohort and retention analysis';
 COMMENT ON TABLE fact_funnel_events IS 'Conversion funnel step tracking';
 
+COMMENT ON TABLE agg_daily_campaign_country IS 'Pre-aggregated daily campaign performance by country';
+COMMENT ON TABLE agg_monthly_campaign IS 'Pre-aggregated monthly campaign performance';
+COMMENT ON TABLE agg_daily_platform IS 'Pre-aggregated daily performance by ad platform';
+COMMENT ON TABLE agg_campaign_attribution IS 'Conversions and revenue credited to campaigns per attribution model';
+COMMENT ON TABLE agg_ab_test_results IS 'A/B test lift, confidence intervals and significance per test and metric';
+COMMENT ON TABLE load_generations IS 'Date ranges touched by each load, for dashboard query cache invalidation';
+
 -- Grant permissions (adjust as needed for your environment)
 -- GRANT USAGE ON SCHEMA ad_dashboard TO tableau_user;
 -- GRANT SELECT ON ALL TABLES IN SCHEMA ad_dashboard TO tableau_user; 
\ No newline at end of file
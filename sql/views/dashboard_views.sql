@@ -363,6 +363,33 @@ GROUP BY d.date_value, c.campaign_name, c.campaign_type, c.platform;
 CREATE INDEX idx_mv_campaign_trends_date ON mv_campaign_trends(date_value);
 CREATE INDEX idx_mv_campaign_trends_campaign ON mv_campaign_trends(campaign_name);
 
+-- =============================================================================
+-- INCREMENTALLY MAINTAINED ROLLUPS
+-- =============================================================================
+
+-- Incremental copy of mv_campaign_trends. Rows are upserted by the ETL
+-- post-load step (etl/refresh.py) for the date/campaign groups touched by
+-- each batch, so refresh cost scales with the delta instead of the history.
+CREATE TABLE IF NOT EXISTS agg_campaign_trends (
+    date_value DATE NOT NULL,
+    campaign_name VARCHAR(255) NOT NULL,
+    campaign_type VARCHAR(50) NOT NULL,
+    platform VARCHAR(50) NOT NULL,
+    impressions BIGINT DEFAULT 0,
+    clicks BIGINT DEFAULT 0,
+    spend DECIMAL(14,2) DEFAULT 0.00,
+    conversions BIGINT DEFAULT 0,
+    revenue DECIMAL(14,2) DEFAULT 0.00,
+    avg_ctr DECIMAL(12,4),
+    avg_cpc DECIMAL(12,4),
+    avg_cpa DECIMAL(12,4),
+    avg_roas DECIMAL(12,4),
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date_value, campaign_name, campaign_type, platform)
+);
+
+CREATE INDEX IF NOT EXISTS idx_agg_campaign_trends_campaign ON agg_campaign_trends(campaign_name);
+
 -- =============================================================================
 -- VIEW GRANTS AND COMMENTS
 -- =============================================================================
@@ -377,6 +404,8 @@ COMMENT ON VIEW v_emea_geo_performance IS 'Geographic performance summary focuse
 COMMENT ON VIEW v_web_analytics_daily IS 'Daily web analytics metrics for session analysis';
 COMMENT ON VIEW v_cohort_retention IS 'Customer cohort retention analysis for lifecycle insights';
 COMMENT ON VIEW v_conversion_funnel IS 'Conversion funnel analysis for customer journey optimization';
+COMMENT ON TABLE agg_campaign_trends IS 'Incrementally refreshed campaign trends (same columns as mv_campaign_trends)';
 
 -- Refresh materialized views (setup refresh schedule)
+-- agg_campaign_trends is refreshed incrementally after every load by run_etl.py
 -- SELECT cron.schedule('refresh-campaign-trends', '0 1 * * *', 'REFRESH MATERIALIZED VIEW ad_dashboard.mv_campaign_trends;'); 
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Tests for batched A/B test statistics
+"""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.ab_testing import (
+    AB_TEST_COLUMNS,
+    AB_TEST_TABLE,
+    ab_test_files,
+    ab_test_results,
+    bootstrap_ratios,
+    ratio_tests,
+    refresh_ab_test_results,
+)
+from etl.data_generator import DataGenerator, DataGenerationConfig
+
+
+def _ad_rows(test_id, variant, n, ctr, rpc, rng):
+    """Ad cells for one test variant with a given click-through rate and revenue per click"""
+    impressions = rng.integers(500, 1500, size=n)
+    clicks = rng.binomial(impressions, ctr)
+    return pd.DataFrame({
+        'ab_test_id': test_id,
+        'ab_test_variant': variant,
+        'impressions': impressions,
+        'clicks': clicks,
+        'attributed_conversions': rng.binomial(clicks, 0.05),
+        'attributed_revenue': np.round(clicks * rpc * rng.lognormal(0, 0.3, n), 2),
+    })
+
+
+class TestABTesting:
+    """Test z-tests, bootstrap intervals and the batched results table"""
+
+    def test_ratio_tests(self):
+        """Test delta-method z and interval against a hand-computed example"""
+        stats = ratio_tests(np.array([1, 3, 2, 4, 5]), np.array([10, 10, 10, 10, 10]),
+                            np.array([0, 2, 4]), np.array([0, 0]), np.array([1, 2]))
+        # Both two-row groups have variance 2 / 1 * 2 / 20^2 = 0.01
+        assert stats['absolute_lift'][0] == pytest.approx(0.1)
+        assert stats['z_score'][0] == pytest.approx(0.1 / np.sqrt(0.02))
+        assert stats['ci_upper'][0] - 0.1 == pytest.approx(1.959964 * np.sqrt(0.02), rel=1e-5)
+        assert stats['z_score'][1] == 0 and stats['p_value'][1] == 1.0  # One row: no variance estimate
+
+    def test_bootstrap_ratios_per_group(self):
+        """Test every group's resampled ratios center on its own ratio"""
+        numerator = np.r_[np.full(400, 2.0), np.full(600, 5.0)]
+        denominator = np.ones(1000)
+        ratios = bootstrap_ratios(numerator, denominator, np.array([0, 400]), 300, np.random.default_rng(0))
+        assert ratios.shape == (300, 2)
+        np.testing.assert_allclose(ratios, [[2.0, 5.0]] * 300)
+
+    def test_detects_only_real_effects(self, tmp_path):
+        """Test a lifted variant is significant, an A/A test is not and files match memory"""
+        rng = np.random.default_rng(7)
+        ad = pd.concat([
+            _ad_rows('test_001', 'Control', 300, 0.02, 1.0, rng),
+            _ad_rows('test_001', 'B', 300, 0.024, 1.3, rng),
+            _ad_rows('test_001', 'C', 300, 0.02, 1.0, rng),
+            _ad_rows('test_002', 'A', 300, 0.03, 2.0, rng),
+            _ad_rows('test_002', 'B', 300, 0.03, 2.0, rng),
+        ], ignore_index=True).sample(frac=1, random_state=1)
+        ad.loc[ad.index[:50], ['ab_test_id', 'ab_test_variant']] = None  # Rows outside any test
+
+        results = ab_test_results(ad, n_resamples=500, seed=3)
+        assert list(results.columns) == AB_TEST_COLUMNS
+        assert len(results) == 3 * 3  # Three treatment variants x three metrics
+        assert set(results.loc[results['ab_test_id'] == 'test_001', 'control_variant']) == {'Control'}
+
+        significant = results.set_index(['ab_test_id', 'treatment_variant', 'metric'])['is_significant']
+        assert significant[('test_001', 'B', 'ctr')] and significant[('test_001', 'B', 'revenue_per_click')]
+        assert not significant[('test_002', 'B', 'ctr')]
+        assert not significant[('test_002', 'B', 'revenue_per_click')]
+
+        rpc = results[results['metric'] == 'revenue_per_click']
+        assert ((rpc['ci_lower'] <= rpc['absolute_lift']) & (rpc['absolute_lift'] <= rpc['ci_upper'])).all()
+
+        ad.to_csv(tmp_path / 'fact_ad_performance.csv', index=False)
+        from_files = ab_test_files(str(tmp_path), n_resamples=500, seed=3, chunksize=400)
+        assert len(pd.read_csv(tmp_path / f"{AB_TEST_TABLE}.csv")) == len(results)
+        pd.testing.assert_frame_equal(from_files, results)
+
+    def test_aa_tests_hold_nominal_false_positive_rate(self):
+        """Test generated A/A tests (variants drawn per row) are rarely significant on any metric"""
+        generator = DataGenerator(DataGenerationConfig(
+            start_date="2024-01-01", end_date="2024-06-30",
+            num_campaigns=20, num_users=200, daily_volume_scale="small", seed=11
+        ))
+        generator.generate_dimension_data()
+        results = ab_test_results(generator.generate_fact_data()['fact_ad_performance'],
+                                  n_resamples=500, seed=0)
+
+        significant = results.groupby('metric')['is_significant'].agg(['sum', 'size'])
+        assert (significant['size'] == 10).all()
+        # At a 5% level, more than 2 of 10 has probability ~1%; impression-level z-tests flagged 5 on CTR
+        assert (significant['sum'] <= 2).all()
+
+    def test_refresh_replaces_affected_tests_from_the_warehouse(self):
+        """Test a refresh recomputes touched tests from all warehouse rows and replaces them atomically"""
+        rng = np.random.default_rng(2)
+        warehouse = pd.concat([_ad_rows('test_001', 'A', 40, 0.02, 1.0, rng),
+                               _ad_rows('test_001', 'B', 40, 0.02, 1.0, rng)], ignore_index=True)
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = list(warehouse.itertuples(index=False, name=None))
+
+        assert refresh_ab_test_results(conn, {'test_001'}, n_resamples=200, seed=1) == 3
+        (select_sql, params), (delete_sql, _) = [c[0] for c in cursor.execute.call_args_list]
+        assert 'ab_test_id = ANY(%(ab_test_ids)s)' in select_sql and params == {'ab_test_ids': ['test_001']}
+        assert delete_sql.startswith('DELETE FROM ad_dashboard.agg_ab_test_results WHERE')
+        insert_sql, rows = cursor.executemany.call_args[0]
+        expected = ab_test_results(warehouse, n_resamples=200, seed=1)
+        assert [row[:4] for row in rows] == expected[AB_TEST_COLUMNS[:4]].values.tolist()
+        conn.commit.assert_called_once()
+
+        assert refresh_ab_test_results(conn, []) == 0
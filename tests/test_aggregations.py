@@ -0,0 +1,68 @@
+"""
+Tests for pre-aggregated summary tables
+"""
+
+import pytest
+
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.aggregations import build_summary_tables, SUMMARY_TABLES
+
+
+@pytest.fixture(scope="module")
+def generated():
+    """Generated dimensions, facts and summaries for a small date range"""
+    config = DataGenerationConfig(
+        start_date="2024-01-25",
+        end_date="2024-02-05",  # Spans a month boundary
+        num_campaigns=5,
+        num_users=100,
+        daily_volume_scale="small",
+        seed=42
+    )
+    generator = DataGenerator(config)
+    dimensions = generator.generate_dimension_data()
+    facts = generator.generate_fact_data()
+    return dimensions, facts, build_summary_tables(dimensions, facts)
+
+
+class TestSummaryTables:
+    """Test in-pipeline rollups of fact_ad_performance"""
+
+    def test_all_summary_tables_built(self, generated):
+        """Test that every summary table is produced and non-empty"""
+        _, _, summaries = generated
+        assert list(summaries) == SUMMARY_TABLES
+        for df in summaries.values():
+            assert not df.empty
+
+    def test_totals_match_facts(self, generated):
+        """Test that rollups preserve the fact totals"""
+        _, facts, summaries = generated
+        ad_perf = facts['fact_ad_performance']
+
+        for df in summaries.values():
+            assert df['total_impressions'].sum() == ad_perf['impressions'].sum()
+            assert df['total_clicks'].sum() == ad_perf['clicks'].sum()
+            assert df['record_count'].sum() == len(ad_perf)
+            assert df['total_spend'].sum() == pytest.approx(ad_perf['spend'].sum(), abs=0.01 * len(df))
+
+    def test_summary_grain_is_unique(self, generated):
+        """Test that each summary has one row per grain"""
+        _, _, summaries = generated
+        grains = {
+            'agg_daily_campaign_country': ['date_key', 'campaign_key', 'country_code'],
+            'agg_monthly_campaign': ['year', 'month', 'campaign_key'],
+            'agg_daily_platform': ['date_key', 'platform'],
+        }
+        for name, keys in grains.items():
+            assert not summaries[name].duplicated(keys).any()
+
+        monthly = summaries['agg_monthly_campaign']
+        assert set(monthly['month']) == {1, 2}
+
+    def test_kpis_follow_view_rules(self, generated):
+        """Test derived KPIs match the dashboard view formulas"""
+        _, _, summaries = generated
+        daily = summaries['agg_daily_platform']
+        expected_ctr = (daily['total_clicks'] / daily['total_impressions'] * 100).round(4)
+        assert (daily['ctr_percent'] - expected_ctr).abs().max() < 1e-9
@@ -0,0 +1,71 @@
+"""
+Tests for the seeded attribute provider
+"""
+
+import uuid
+from datetime import date
+
+import pytest
+import pandas as pd
+
+from etl import attribute_pools
+from etl.attribute_pools import AttributeProvider, load_attribute_pools
+from etl.data_generator import DataGenerator, DataGenerationConfig
+
+
+class TestAttributeProvider:
+    """Test vectorized attribute sampling"""
+
+    def test_uuids_are_valid_version_4(self):
+        """Test vectorized UUIDs parse as unique version 4 UUIDs"""
+        keys = AttributeProvider(seed=1).uuids(1000)
+        parsed = [uuid.UUID(key) for key in keys]
+
+        assert all(u.version == 4 for u in parsed)
+        assert [str(u) for u in parsed] == list(keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_hashes_and_dates(self):
+        """Test hashed ids are unique hex digests and dates stay in range"""
+        attrs = AttributeProvider(seed=1)
+        hashes = attrs.hashes(1000)
+        assert len(set(hashes)) == 1000
+        assert all(len(h) == 64 and int(h, 16) >= 0 for h in hashes[:10])
+
+        dates = attrs.dates_between(date(2024, 1, 1), date(2024, 1, 31), 1000)
+        assert isinstance(dates[0], date)
+        assert min(dates) >= date(2024, 1, 1) and max(dates) <= date(2024, 1, 31)
+
+    def test_pools_are_cached_on_disk(self, tmp_path, monkeypatch):
+        """Test that pools are built once and then read from the cache directory"""
+        first = load_attribute_pools(seed=3, pool_size=20, cache_dir=str(tmp_path))
+        assert (tmp_path / 'attribute_pools' / 'pools_3_20.json').exists()
+
+        attribute_pools._load_cached_pools.cache_clear()
+        monkeypatch.setattr(attribute_pools, '_build_pools', lambda *args: pytest.fail("rebuilt pools"))
+        second = load_attribute_pools(seed=3, pool_size=20, cache_dir=str(tmp_path))
+        assert list(first['city']) == list(second['city'])
+
+
+class TestReproducibleDimensions:
+    """Test that dimensions are reproducible from seed"""
+
+    def _dimensions(self, seed):
+        config = DataGenerationConfig(num_campaigns=10, num_users=500, seed=seed)
+        return DataGenerator(config).generate_dimension_data()
+
+    def test_same_seed_same_dimensions(self):
+        """Test identical output, including keys, for the same seed"""
+        first, second = self._dimensions(7), self._dimensions(7)
+        for name in first:
+            pd.testing.assert_frame_equal(first[name], second[name])
+
+        other = self._dimensions(8)
+        assert not first['dim_user']['user_key'].equals(other['dim_user']['user_key'])
+
+    def test_geo_rows_grouped_by_country(self):
+        """Test each country has one country-level row followed by its cities"""
+        geo = self._dimensions(7)['dim_geo']
+        for _, rows in geo.groupby('country', sort=False):
+            assert rows['city'].isna().tolist() == [True] + [False] * (len(rows) - 1)
+            assert 1 <= len(rows) - 1 <= 3
@@ -0,0 +1,154 @@
+"""
+Tests for multi-touch conversion attribution
+"""
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.attribution import (
+    ATTRIBUTION_MODELS,
+    ATTRIBUTION_TABLE,
+    attribute_files,
+    attribution_credit,
+    build_attribution_table,
+    match_touchpoints,
+    run_attribution,
+)
+from etl.data_generator import DataGenerator, DataGenerationConfig
+
+
+def _sessions(rows):
+    """Sessions from (user, campaign, timestamp) tuples"""
+    timestamps = pd.to_datetime([ts for _, _, ts in rows])
+    return pd.DataFrame({
+        'session_id': [f"s{i}" for i in range(len(rows))],
+        'user_key': [user for user, _, _ in rows],
+        'campaign_key': [campaign for _, campaign, _ in rows],
+        'session_start_timestamp': timestamps,
+        'date_key': timestamps.strftime('%Y%m%d').astype(int),
+    })
+
+
+def _conversions(rows):
+    """Conversions from (user, timestamp, value) tuples"""
+    timestamps = pd.to_datetime([ts for _, ts, _ in rows])
+    return pd.DataFrame({
+        'conversion_id': [f"c{i}" for i in range(len(rows))],
+        'conversion_timestamp': timestamps,
+        'date_key': timestamps.strftime('%Y%m%d').astype(int),
+        'user_key': [user for user, _, _ in rows],
+        'conversion_value': [value for _, _, value in rows],
+        'attribution_model': 'last_click',
+        'time_to_conversion_hours': 1,
+    })
+
+
+class TestAttribution:
+    """Test touchpoint matching and per-model credit"""
+
+    def test_window_and_models(self):
+        """Test the lookback window, user isolation and each model's credit"""
+        sessions = _sessions([
+            ('u1', 'old', '2024-01-01 00:00'),     # Outside the 30-day window
+            ('u1', 'A', '2024-02-01 00:00'),
+            ('u1', None, '2024-02-05 00:00'),      # Organic, not a touchpoint
+            ('u1', 'B', '2024-02-08 00:00'),
+            ('u2', 'C', '2024-02-09 00:00'),       # Another user
+            ('u1', 'late', '2024-02-09 12:00'),    # After the conversion
+        ])
+        conversions = _conversions([('u1', '2024-02-08 00:00', 100.0), ('u3', '2024-02-08 00:00', 5.0)])
+
+        pairs = match_touchpoints(sessions, conversions, lookback_days=30)
+        assert list(sessions['campaign_key'].to_numpy()[pairs['touch_row']]) == ['A', 'B']
+        assert set(pairs['conversion_row']) == {0}
+
+        assert list(attribution_credit(pairs, 'last_click')) == [0.0, 1.0]
+        assert list(attribution_credit(pairs, 'first_click')) == [1.0, 0.0]
+        assert list(attribution_credit(pairs, 'linear')) == [0.5, 0.5]
+        decay = attribution_credit(pairs, 'time_decay', half_life_days=7)
+        assert decay.sum() == pytest.approx(1.0)
+        assert decay[1] / decay[0] == pytest.approx(2.0)  # B is one half-life more recent
+
+        with pytest.raises(ValueError):
+            attribution_credit(pairs, 'data_driven')
+
+    def test_last_click_fills_conversions(self):
+        """Test fact_conversions gets campaign, session and time to convert"""
+        sessions = _sessions([('u1', 'A', '2024-02-01 00:00'), ('u1', 'B', '2024-02-02 00:00')])
+        conversions = _conversions([('u1', '2024-02-03 00:00', 10.0), ('u2', '2024-02-03 00:00', 5.0)])
+
+        attributed, table = run_attribution({'fact_web_analytics': sessions, 'fact_conversions': conversions})
+        assert attributed['campaign_key'][0] == 'B' and pd.isna(attributed['campaign_key'][1])
+        assert attributed['session_id'][0] == 's1' and pd.isna(attributed['session_id'][1])
+        assert list(attributed['time_to_conversion_hours']) == [48, 1]  # From the first touch
+        columns = list(attributed.columns)
+        assert columns[columns.index('user_key') + 1:][:2] == ['session_id', 'campaign_key']  # DDL order
+
+        linear = table[table['attribution_model'] == 'linear'].set_index('campaign_key')
+        assert linear.loc['A', 'attributed_revenue'] == 5.0
+        assert set(table['attribution_model']) == set(ATTRIBUTION_MODELS)
+
+    def test_warehouse_touchpoints_before_the_batch(self):
+        """Test a conversion early in a batch is credited to a session loaded by an earlier batch"""
+        sessions = _sessions([('u1', 'B', '2024-03-05 00:00')])
+        conversions = _conversions([('u2', '2024-03-02 12:00', 10.0), ('u1', '2024-03-06 00:00', 4.0)])
+        facts = {'fact_web_analytics': sessions, 'fact_conversions': conversions}
+
+        attributed, _ = run_attribution(facts)
+        assert pd.isna(attributed['campaign_key'][0])  # Its touch is outside the batch
+
+        warehouse = MagicMock()
+        cursor = warehouse.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [('s_prev', datetime(2024, 2, 20), 'u2', 'A')]
+        attributed, table = run_attribution(facts, lookback_days=30, warehouse=warehouse)
+        assert cursor.execute.call_args[0][1] == {'first_date_key': 20240201, 'before_date_key': 20240302}
+        assert attributed['campaign_key'].tolist() == ['A', 'B']
+        assert attributed['session_id'][0] == 's_prev'
+        last_click = table[table['attribution_model'] == 'last_click'].set_index('campaign_key')
+        assert last_click.loc['A', 'attributed_revenue'] == 10.0
+
+    def test_matches_brute_force_on_generated_data(self):
+        """Test the vectorized join against a per-conversion loop"""
+        generator = DataGenerator(DataGenerationConfig(
+            start_date="2024-01-01", end_date="2024-03-31",
+            num_campaigns=10, num_users=300, daily_volume_scale="small", seed=5
+        ))
+        generator.generate_dimension_data()
+        facts = generator.generate_fact_data()
+        sessions, conversions = facts['fact_web_analytics'], facts['fact_conversions']
+
+        pairs = match_touchpoints(sessions, conversions, lookback_days=10)
+        paid = sessions[sessions['campaign_key'].notna()].copy()
+        paid['ts'] = paid['session_start_timestamp'].dt.floor('s')
+        by_user = dict(tuple(paid.groupby('user_key')))
+        window = pd.Timedelta(days=10)
+        expected = set()
+        for row, conversion in enumerate(conversions.itertuples()):
+            touches = by_user.get(conversion.user_key)
+            if touches is None:
+                continue
+            ts = conversion.conversion_timestamp.floor('s')
+            matches = touches[(touches['ts'] >= ts - window) & (touches['ts'] <= ts)]
+            expected.update((row, i) for i in matches.index)
+
+        assert len(expected) > 50
+        assert set(zip(pairs['conversion_row'], pairs['touch_row'])) == expected
+
+        # Every model hands out exactly one conversion per attributed conversion
+        table = build_attribution_table(sessions, conversions, pairs)
+        totals = table.groupby('attribution_model')['attributed_conversions'].sum()
+        assert np.allclose(totals, pairs['conversion_row'].nunique(), atol=0.01)
+
+    def test_attribute_files(self, tmp_path):
+        """Test CSVs are attributed in place for out-of-core and sharded runs"""
+        _sessions([('u1', 'A', '2024-02-01 00:00')]).to_csv(tmp_path / 'fact_web_analytics.csv', index=False)
+        _conversions([('u1', '2024-02-02 00:00', 10.0)]).to_csv(tmp_path / 'fact_conversions.csv', index=False)
+
+        table = attribute_files(str(tmp_path))
+        assert len(table) == len(ATTRIBUTION_MODELS)
+        assert pd.read_csv(tmp_path / 'fact_conversions.csv')['campaign_key'].tolist() == ['A']
+        assert len(pd.read_csv(tmp_path / f"{ATTRIBUTION_TABLE}.csv")) == len(ATTRIBUTION_MODELS)
@@ -0,0 +1,67 @@
+"""
+Tests for the generated dataset cache
+"""
+
+import os
+
+import pytest
+import pandas as pd
+
+from etl.data_generator import DataGenerationConfig
+from etl.cache import GenerationCache, cached_generate, config_fingerprint
+
+
+@pytest.fixture
+def config():
+    """Small test configuration"""
+    return DataGenerationConfig(
+        start_date="2024-01-01",
+        end_date="2024-01-07",
+        num_campaigns=5,
+        num_users=50,
+        daily_volume_scale="small",
+        seed=42
+    )
+
+
+class TestGenerationCache:
+    """Test content-addressed caching of generated datasets"""
+
+    def test_fingerprint_tracks_config(self, config):
+        """Test that the key changes with any config value"""
+        same = DataGenerationConfig(**{**config.__dict__})
+        other = DataGenerationConfig(**{**config.__dict__, 'seed': 7})
+
+        assert config_fingerprint(config) == config_fingerprint(same)
+        assert config_fingerprint(config) != config_fingerprint(other)
+
+    def test_cache_hit_round_trips_tables(self, config, tmp_path):
+        """Test that a hit returns identical frames with memory-mapped columns"""
+        cache = GenerationCache(str(tmp_path))
+        dimensions, facts = cached_generate(config, cache)
+        cached_dims, cached_facts = cached_generate(config, cache)
+
+        for name, df in {**dimensions, **facts}.items():
+            pd.testing.assert_frame_equal(df, {**cached_dims, **cached_facts}[name])
+
+        date_keys = cached_dims['dim_date']['date_key'].to_numpy()
+        assert not date_keys.flags.owndata  # Backed by the mapped file
+        assert os.listdir(tmp_path / 'attribute_pools')  # Pools persisted beside the datasets
+
+    def test_lru_eviction(self, config, tmp_path):
+        """Test that the least recently used entry is evicted first"""
+        cache = GenerationCache(str(tmp_path), max_entries=2)
+        configs = [DataGenerationConfig(**{**config.__dict__, 'end_date': end})
+                   for end in ("2024-01-02", "2024-01-03", "2024-01-04")]
+        keys = [config_fingerprint(c) for c in configs]
+
+        cached_generate(configs[0], cache)
+        cached_generate(configs[1], cache)
+        os.utime(os.path.join(cache.cache_dir, keys[0], 'manifest.json'), (0, 0))
+        os.utime(os.path.join(cache.cache_dir, keys[1], 'manifest.json'), (1, 1))
+        cache.get(keys[0])  # Most recently used now
+        cached_generate(configs[2], cache)
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
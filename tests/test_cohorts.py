@@ -0,0 +1,122 @@
+"""
+Tests for retention cohort building
+"""
+
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+
+from etl.cohorts import (
+    RETENTION_COLUMNS,
+    build_customer_retention,
+    build_retention_files,
+    parse_months,
+    refresh_customer_retention,
+    retention_months,
+)
+from etl.data_generator import DataGenerator, DataGenerationConfig
+
+
+class TestCohorts:
+    """Test retention periods, metrics and incremental months"""
+
+    def test_periods_and_metrics(self):
+        """Test period numbers, transactions, revenue and acquisition campaign"""
+        users = pd.DataFrame({
+            'user_key': ['u1', 'u2'],
+            'first_session_date': pd.to_datetime(['2024-01-20', '2024-03-05']).date,
+        })
+        sessions = pd.DataFrame({
+            'user_key': ['u1', 'u1', 'u1', 'u2', 'ghost'],
+            'campaign_key': [None, 'A', 'B', None, 'C'],
+            'date_key': [20240115, 20240210, 20240401, 20240301, 20240101],  # u1's first row predates acquisition
+            'session_start_timestamp': pd.to_datetime(['2024-01-15', '2024-02-10', '2024-04-01',
+                                                       '2024-03-01', '2024-01-01']),
+        })
+        conversions = pd.DataFrame({
+            'user_key': ['u1', 'u1', 'u2'],
+            'date_key': [20240212, 20240220, 20240310],
+            'conversion_value': [10.0, 5.5, 7.0],
+        })
+
+        retention = build_customer_retention(users, sessions, conversions)
+        assert list(retention.columns) == RETENTION_COLUMNS
+        rows = {(r.user_key, r.period_number): r for r in retention.itertuples()}
+        assert set(rows) == {('u1', 0), ('u1', 1), ('u1', 3), ('u2', 0)}
+
+        assert rows[('u1', 1)].transactions_count == 2
+        assert rows[('u1', 1)].revenue_amount == 15.5
+        assert rows[('u1', 1)].retention_date_key == 20240210  # First active day of the month
+        assert rows[('u1', 0)].retention_date_key == 20240120
+        assert rows[('u2', 0)].transactions_count == 1  # Same-month conversion is period 0
+        assert rows[('u1', 3)].acquisition_campaign_key == 'A'
+        assert pd.isna(rows[('u2', 0)].acquisition_campaign_key)
+
+    def test_incremental_months_match_full_build(self, tmp_path):
+        """Test building only some months yields exactly those rows of a full build"""
+        generator = DataGenerator(DataGenerationConfig(
+            start_date="2024-01-01", end_date="2024-05-31",
+            num_campaigns=10, num_users=400, daily_volume_scale="small", seed=9
+        ))
+        dimensions = generator.generate_dimension_data()
+        facts = generator.generate_fact_data()
+        for name in ('dim_user', 'fact_web_analytics', 'fact_conversions'):
+            {**dimensions, **facts}[name].to_csv(tmp_path / f"{name}.csv", index=False)
+
+        full = build_customer_retention(dimensions['dim_user'], facts['fact_web_analytics'],
+                                        facts['fact_conversions'])
+        assert full['period_number'].max() == 4
+        assert (full['period_number'] == 0).sum() == 400
+
+        partial = build_retention_files(str(tmp_path), months=[202403, 202405])
+        expected = full[(full['retention_date_key'] // 100).isin([202403, 202405])]
+        pd.testing.assert_frame_equal(partial.reset_index(drop=True), expected.reset_index(drop=True))
+        assert retention_months(str(tmp_path / "fact_customer_retention.csv")) == [202403, 202405]
+
+        # A compressed rebuild replaces the plain file instead of sitting beside it
+        build_retention_files(str(tmp_path), months=[202403], compression='gzip')
+        assert not (tmp_path / "fact_customer_retention.csv").exists()
+        assert retention_months(str(tmp_path / "fact_customer_retention.csv.gz")) == [202403]
+
+    def test_batch_months_by_default(self, tmp_path):
+        """Test a file build covers only the batch's months unless months are given"""
+        generator = DataGenerator(DataGenerationConfig(
+            start_date="2024-01-01", end_date="2024-04-30",
+            num_campaigns=5, num_users=200, daily_volume_scale="small", seed=4
+        ))
+        dimensions = generator.generate_dimension_data()
+        facts = generator.generate_fact_data()
+        full = build_customer_retention(dimensions['dim_user'], facts['fact_web_analytics'],
+                                        facts['fact_conversions'])
+
+        # A later batch holds only March and April activity; all users are still in dim_user
+        dimensions['dim_user'].to_csv(tmp_path / "dim_user.csv", index=False)
+        for name in ('fact_web_analytics', 'fact_conversions'):
+            facts[name][facts[name]['date_key'] >= 20240301].to_csv(tmp_path / f"{name}.csv", index=False)
+        batch = build_retention_files(str(tmp_path))
+        expected = full[full['retention_date_key'] >= 20240301]
+        assert retention_months(str(tmp_path / "fact_customer_retention.csv")) == [202403, 202404]
+        assert len(batch) == len(expected)
+        assert batch['revenue_amount'].sum() == pytest.approx(expected['revenue_amount'].sum())
+
+        assert parse_months("202411-202502, 202404") == [202404, 202411, 202412, 202501, 202502]
+        for bad in ("2024-13", "202413", "202405-202403", ""):
+            with pytest.raises(ValueError):
+                parse_months(bad)
+
+    def test_refresh_rebuilds_months_in_one_transaction(self):
+        """Test affected months are deleted and rebuilt from the warehouse before one commit"""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.rowcount = 3
+
+        assert refresh_customer_retention(conn, [202405, 202403]) == 3
+        (delete_sql, params), (insert_sql, insert_params) = [c[0] for c in cursor.execute.call_args_list]
+        assert delete_sql.startswith("DELETE FROM ad_dashboard.fact_customer_retention")
+        assert "retention_date_key / 100 = ANY(%(months)s)" in delete_sql
+        assert "FROM ad_dashboard.fact_conversions" in insert_sql and "date_key / 100 = ANY" in insert_sql
+        assert params == insert_params == {'first_date_key': 20240301, 'last_date_key': 20240531,
+                                           'months': [202403, 202405]}
+        conn.commit.assert_called_once()
+
+        assert refresh_customer_retention(MagicMock(), []) == 0
@@ -0,0 +1,84 @@
+"""
+Tests for the out-of-core columnar fact store
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.aggregations import build_summary_tables, build_summary_tables_from_store
+from etl.columnar_store import ColumnarStore, generate_facts_to_store, validate_store_table
+from etl.data_generator import DataGenerator, DataGenerationConfig
+
+
+@pytest.fixture(scope="module")
+def generated(tmp_path_factory):
+    """Facts generated in memory and into a store for a config spanning two months"""
+    generator = DataGenerator(DataGenerationConfig(
+        start_date="2024-01-25",
+        end_date="2024-02-05",
+        num_campaigns=20,
+        num_users=200,
+        seed=3
+    ))
+    dimensions = generator.generate_dimension_data()
+    facts = generator.generate_fact_data()
+
+    store = ColumnarStore(str(tmp_path_factory.mktemp("store")))
+    generate_facts_to_store(generator, store)
+    return dimensions, facts, store
+
+
+class TestColumnarStore:
+    """Test storage, scanning and downstream consumers of the store"""
+
+    def test_round_trip_matches_generated_facts(self, generated):
+        """Test stored tables read back identical to the in-memory facts"""
+        _, facts, store = generated
+        assert store.partitions('fact_ad_performance') == ['202401', '202402']
+
+        for table, df in facts.items():
+            stored = store.to_frame(table)
+            pd.testing.assert_frame_equal(stored, df, check_dtype=False)
+
+    def test_fixed_width_columns_are_memory_mapped(self, generated):
+        """Test numeric columns are scanned zero-copy and strings keep nulls"""
+        _, facts, store = generated
+        data = store.read_partition('fact_ad_performance', '202401', ['impressions', 'ab_test_id'])
+
+        assert isinstance(data['impressions'], np.memmap)
+        assert not data['impressions'].flags.writeable
+        assert list(data) == ['impressions', 'ab_test_id']
+        assert pd.isna(data['ab_test_id']).any()
+
+    def test_append_and_reopen(self, tmp_path):
+        """Test appends accumulate and survive reopening the store"""
+        store = ColumnarStore(str(tmp_path))
+        batch = pd.DataFrame({'id': [1, 2], 'name': ['ä', None]})
+        store.append('t', '202401', batch)
+        store.append('t', '202401', batch)
+
+        reopened = ColumnarStore(str(tmp_path))
+        df = reopened.to_frame('t')
+        assert df['id'].tolist() == [1, 2, 1, 2]
+        assert df['name'].isna().tolist() == [False, True, False, True]
+        assert (df['name'].dropna() == 'ä').all()
+
+        reopened.drop_partition('t', '202401')
+        assert reopened.row_count('t') == 0
+
+        with pytest.raises(ValueError):
+            reopened.append('t', '202402', pd.DataFrame({'other': [1]}))
+
+    def test_consumers_scan_the_store(self, generated):
+        """Test summary tables and validation work from the store alone"""
+        dimensions, facts, store = generated
+
+        expected = build_summary_tables(dimensions, facts)
+        summaries = build_summary_tables_from_store(dimensions, store)
+        for name, df in expected.items():
+            pd.testing.assert_frame_equal(summaries[name], df, check_dtype=False)
+
+        report = validate_store_table(store, 'fact_web_analytics')
+        assert report['total_rows'] == len(facts['fact_web_analytics'])
+        assert report['null_counts']['geo_key'] == 0
@@ -0,0 +1,68 @@
+"""
+Tests for the parallel block-compressed CSV writer
+"""
+
+import gzip
+import os
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.compression import ParallelGzipWriter, csv_path, data_file, open_csv
+from etl.loader import TableLoader
+from etl.settings import ProcessingSettings
+
+
+@pytest.fixture
+def frame():
+    """A few hundred kilobytes of CSV"""
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({'date_key': np.arange(20_000) % 31 + 20240101, 'value': rng.random(20_000)})
+
+
+class TestCompression:
+    """Test block-parallel gzip output, format resolution and streaming loads"""
+
+    def test_members_concatenate_to_the_plain_csv(self, frame, tmp_path):
+        """Test blocks written by several workers decompress to exactly the uncompressed CSV"""
+        path = str(tmp_path / "fact_a.csv.gz")
+        with ParallelGzipWriter(path, workers=4, block_size=16_384) as writer:
+            frame.to_csv(writer, index=False, chunksize=3_000, mode='wb')
+
+        expected = frame.to_csv(index=False).encode()
+        assert writer.bytes_in == len(expected)
+        with open(path, 'rb') as f:
+            data = f.read()
+        assert data.count(b'\x1f\x8b\x08') >= len(expected) // 16_384
+        assert gzip.decompress(data) == expected
+        pd.testing.assert_frame_equal(pd.concat(pd.read_csv(path, chunksize=5_000), ignore_index=True), frame)
+
+    def test_data_file_resolves_either_format(self, frame, tmp_path):
+        """Test the newer of .csv and .csv.gz is read, and unknown codecs are rejected"""
+        directory = str(tmp_path)
+        assert data_file(directory, 'fact_a') == os.path.join(directory, 'fact_a.csv')
+
+        frame.to_csv(csv_path(directory, 'fact_a'), index=False)
+        with open_csv(csv_path(directory, 'fact_a', 'gzip')) as f:
+            frame.to_csv(f, index=False)
+        os.utime(csv_path(directory, 'fact_a'), ns=(0, 0))
+        assert data_file(directory, 'fact_a') == os.path.join(directory, 'fact_a.csv.gz')
+
+        with pytest.raises(ValueError, match="Unsupported compression"):
+            csv_path(directory, 'fact_a', 'lz4')
+
+    def test_loader_streams_compressed_files(self, frame, tmp_path):
+        """Test the loader finds a .csv.gz table and copies it in batches"""
+        with open_csv(csv_path(str(tmp_path), 'fact_a', 'gzip')) as f:
+            frame.head(25).to_csv(f, index=False)
+        engine = MagicMock()
+
+        chunks = []
+        loaded = TableLoader(engine, ProcessingSettings(batch_size=10)).load_tables(
+            ['fact_a'], str(tmp_path), on_chunk=lambda table, chunk: chunks.append(len(chunk))
+        )
+
+        assert loaded == {'fact_a': 25}
+        assert chunks == [10, 10, 5]
@@ -0,0 +1,62 @@
+"""
+Tests for the vectorized date dimension and holiday calendars
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.date_dimension import (
+    HOLIDAY_CALENDARS, build_date_dimension, easter_sundays, holiday_masks, volume_effects
+)
+
+
+class TestDateDimension:
+    """Test calendar and fiscal columns, holiday rules and volume effects"""
+
+    def test_calendar_and_fiscal_columns(self):
+        """Test columns match per-date calendar arithmetic across an ISO year boundary"""
+        dates = pd.date_range("2024-09-25", "2025-01-08", freq='D')
+        dim = build_date_dimension(dates, ['Germany', 'France'])
+
+        assert dim['date_key'].tolist() == [int(d.strftime('%Y%m%d')) for d in dates]
+        assert dim['day_name'].tolist() == [d.strftime('%A') for d in dates]
+        assert dim['week_of_year'].tolist() == [d.isocalendar()[1] for d in dates]
+        assert dim['day_of_week'].tolist() == [d.weekday() + 1 for d in dates]
+        assert dim['date_value'].iloc[0] == dates[0].date()
+
+        # Apple-style fiscal year: October starts Q1 of the next year's FY
+        by_key = dim.set_index('date_key')
+        assert by_key.loc[20240930, ['fiscal_year', 'fiscal_quarter']].tolist() == [2024, 4]
+        assert by_key.loc[20241001, ['fiscal_year', 'fiscal_quarter']].tolist() == [2025, 1]
+        assert by_key.loc[20250102, ['fiscal_year', 'fiscal_quarter']].tolist() == [2025, 2]
+        calendar_fy = build_date_dimension(dates, ['Germany'], fiscal_year_start_month=1)
+        assert (calendar_fy['fiscal_year'] == calendar_fy['year']).all()
+        assert (calendar_fy['fiscal_quarter'] == calendar_fy['quarter']).all()
+        with pytest.raises(ValueError):
+            build_date_dimension(dates, ['Germany'], fiscal_year_start_month=13)
+
+    def test_country_holidays(self):
+        """Test Easter-relative, Orthodox, nth-weekday and fixed holidays per country"""
+        assert easter_sundays([2024, 2025, 2038]).astype(str).tolist() == ['2024-03-31', '2025-04-20', '2038-04-25']
+        assert easter_sundays([2024, 2021], orthodox=True).astype(str).tolist() == ['2024-05-05', '2021-05-02']
+
+        dates = pd.date_range("2024-01-01", "2024-12-31", freq='D')
+        masks = holiday_masks(dates, list(HOLIDAY_CALENDARS) + ['Atlantis'])
+        holidays = {country: set(masks.index[masks[country]].strftime('%m-%d')) for country in masks.columns}
+        assert {'03-29', '04-01', '05-06', '05-27', '08-26'} <= holidays['United Kingdom']
+        assert {'05-09', '05-20', '10-03'} <= holidays['Germany']
+        assert {'05-03', '05-06', '06-24'} <= holidays['Greece']  # Orthodox Good Friday, Easter and Whit Monday
+        assert {'02-05', '08-05', '10-28'} <= holidays['Ireland']
+        assert '07-14' in holidays['France'] and '07-14' not in holidays['Germany']
+        assert holidays['Atlantis'] == {'01-01', '12-25', '12-26'}
+
+        # is_holiday needs a majority of the configured countries
+        dim = build_date_dimension(dates, list(HOLIDAY_CALENDARS)).set_index('date_key')
+        assert dim.loc[[20240101, 20240401, 20241225], 'is_holiday'].all()
+        assert not dim.loc[[20240714, 20241003, 20240506], 'is_holiday'].any()
+
+    def test_volume_effects(self):
+        """Test weekend and seasonal multipliers for a whole range at once"""
+        dates = pd.DatetimeIndex(['2024-03-04', '2024-03-09', '2024-07-15', '2024-12-01'])
+        np.testing.assert_allclose(volume_effects(dates), [1.0, 0.7, 0.8, 0.7 * 1.3])
@@ -0,0 +1,82 @@
+"""
+Tests for the dimension index and vectorized fact generation
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.dimension_index import DimensionIndex
+
+
+@pytest.fixture(scope="module")
+def generated():
+    """Dimensions and facts for a small two-week config"""
+    generator = DataGenerator(DataGenerationConfig(
+        start_date="2024-01-01",
+        end_date="2024-01-14",
+        num_campaigns=40,
+        num_users=500,
+        seed=7
+    ))
+    dimensions = generator.generate_dimension_data()
+    facts = generator.generate_fact_data()
+    return generator, dimensions, facts
+
+
+class TestDimensionIndex:
+    """Test index sampling and the facts generated from it"""
+
+    def test_weighted_sampling_without_replacement(self):
+        """Test sampled geo sets never repeat a geo within a row"""
+        index = DimensionIndex.from_dimensions({
+            'dim_campaign': pd.DataFrame({'campaign_key': ['a', 'b'], 'status': ['Active', 'Paused']}),
+            'dim_geo': pd.DataFrame({'geo_key': [f"g{i}" for i in range(10)]}),
+            'dim_device': pd.DataFrame({'device_key': ['d1']}),
+            'dim_user': pd.DataFrame({'user_key': []}),
+        })
+        rng = np.random.default_rng(0)
+
+        geo_sets = index.sample_geo_sets(rng, 200, 8)
+        assert geo_sets.shape == (200, 8)
+        assert all(len(set(row)) == 8 for row in geo_sets)
+
+        assert list(index.campaign_keys[index.sample_campaigns(rng, 30)]) == ['a']
+        assert all(key is None for key in index.sample_users(rng, 3))
+
+    def test_facts_reference_dimension_keys(self, generated):
+        """Test every fact foreign key exists in its dimension"""
+        _, dimensions, facts = generated
+        keys = {
+            'campaign_key': set(dimensions['dim_campaign']['campaign_key']),
+            'geo_key': set(dimensions['dim_geo']['geo_key']),
+            'device_key': set(dimensions['dim_device']['device_key']),
+            'user_key': set(dimensions['dim_user']['user_key']),
+        }
+
+        for table, df in facts.items():
+            for column, valid in keys.items():
+                if column in df.columns:
+                    assert set(df[column].dropna()) <= valid, f"{table}.{column}"
+
+        ad = facts['fact_ad_performance']
+        assert not ad.duplicated(['date_key', 'campaign_key', 'geo_key']).any()
+        assert (ad['clicks'] <= ad['impressions']).all()
+
+    def test_bounce_logic_matches_schema(self, generated):
+        """Test sessions satisfy the bounce_logic check constraint"""
+        _, _, facts = generated
+        web = facts['fact_web_analytics']
+        bounces = web[web['is_bounce']]
+        assert ((bounces['page_views'] <= 1) | (bounces['session_duration_seconds'] < 10)).all()
+
+    def test_date_slice_matches_full_run(self, generated):
+        """Test generating a subset of dates reproduces the same rows"""
+        generator, _, facts = generated
+        dates = pd.date_range("2024-01-05", "2024-01-07")
+        sliced = generator.generate_fact_data(dates)
+
+        for table, df in sliced.items():
+            expected = facts[table][facts[table]['date_key'].between(20240105, 20240107)]
+            pd.testing.assert_frame_equal(df, expected.reset_index(drop=True))
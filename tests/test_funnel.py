@@ -0,0 +1,83 @@
+"""
+Tests for funnel event building
+"""
+
+import pandas as pd
+import pytest
+
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.funnel import (
+    FUNNEL_COLUMNS,
+    FUNNEL_TABLE,
+    build_funnel_files,
+    funnel_events,
+    write_funnel_events,
+)
+from etl.memory import AdaptiveChunker
+
+
+def _sessions():
+    """Generated sessions for a small two-month config"""
+    generator = DataGenerator(DataGenerationConfig(
+        start_date="2024-01-01", end_date="2024-02-29",
+        num_campaigns=10, num_users=300, daily_volume_scale="small", seed=4
+    ))
+    generator.generate_dimension_data()
+    return generator.generate_fact_data()['fact_web_analytics']
+
+
+class TestFunnel:
+    """Test step survival, event values and chunked output"""
+
+    def test_steps_follow_survival(self):
+        """Test each session's steps are consecutive and only its last can fail"""
+        sessions = _sessions()
+        events = funnel_events(sessions, seed=4)
+        assert list(events.columns) == FUNNEL_COLUMNS
+
+        steps = events.groupby('session_id', sort=False).agg(
+            first=('funnel_step_number', 'min'),
+            last=('funnel_step_number', 'max'),
+            count=('funnel_step_number', 'size'),
+            completed=('step_completed', 'sum'),
+        )
+        assert len(steps) == len(sessions)
+        assert (steps['first'] == 1).all() and (steps['count'] == steps['last']).all()
+        dropped = steps['completed'] < steps['count']
+        assert (steps.loc[dropped, 'completed'] == steps.loc[dropped, 'count'] - 1).all()
+
+        # Bounced sessions never get past the landing page
+        bounced = sessions.loc[sessions['is_bounce'], 'session_id']
+        assert (steps.loc[bounced, 'count'] == 1).all()
+
+        purchases = events['funnel_step'] == 'purchase'
+        assert (events.loc[purchases & events['step_completed'], 'event_value'] >= 10).all()
+        assert (events.loc[~(purchases & events['step_completed']), 'event_value'] == 0).all()
+
+        # Completion rates per step follow the configured step rates
+        rates = events[events['funnel_step_number'] > 1].groupby('funnel_step_number')['step_completed'].mean()
+        assert rates.to_numpy() == pytest.approx([0.35, 0.55, 0.70], abs=0.03)
+
+    def test_chunked_files_match_in_memory(self, tmp_path):
+        """Test streaming from a frame or a CSV in any chunk size gives the same rows"""
+        sessions = _sessions()
+        expected = funnel_events(sessions, seed=4)
+        sessions.to_csv(tmp_path / 'fact_web_analytics.csv', index=False)
+
+        written = write_funnel_events(sessions, str(tmp_path / 'frame.csv'), 4,
+                                      AdaptiveChunker(initial_rows=97, min_rows=1))
+        assert written == len(expected)
+        assert build_funnel_files(str(tmp_path), 4, AdaptiveChunker(initial_rows=1000, min_rows=1)) == written
+
+        from_frame = pd.read_csv(tmp_path / 'frame.csv')
+        from_csv = pd.read_csv(tmp_path / f"{FUNNEL_TABLE}.csv")
+        pd.testing.assert_frame_equal(from_frame, from_csv)
+        assert from_csv['step_completed'].sum() == expected['step_completed'].sum()
+        assert from_csv['event_value'].sum() == pytest.approx(expected['event_value'].sum())
+
+    def test_invalid_step_rates(self):
+        """Test step rates must be one probability per step after page_view"""
+        with pytest.raises(ValueError):
+            funnel_events(_sessions().head(), seed=1, step_rates=(0.5, 0.5))
+        with pytest.raises(ValueError):
+            funnel_events(_sessions().head(), seed=1, step_rates=(0.5, 1.5, 0.5))
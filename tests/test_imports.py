@@ -0,0 +1,67 @@
+"""
+Import-time budget tests for the CLI and lightweight helpers
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+HEAVY_MODULES = ['pandas', 'numpy', 'faker', 'psycopg2', 'sqlalchemy', 'colorlog']
+
+# Generous enough for slow CI machines, far below the cost of importing pandas + Faker
+IMPORT_BUDGET_SECONDS = 0.5
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps([elapsed, heavy]))
+"""
+
+
+def _probe(imports: str):
+    """Import modules in a fresh interpreter and report time and heavy modules loaded"""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(imports=imports, heavy=HEAVY_MODULES)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    elapsed, heavy = json.loads(result.stdout.strip().splitlines()[-1])
+    return elapsed, heavy
+
+
+class TestImportBudget:
+    """Test that heavy dependencies load on first use only"""
+
+    @pytest.mark.parametrize('imports', [
+        'import etl',
+        'import etl.utils',
+        'import run_etl',
+        'from etl.utils import check_database_connection, format_number',
+    ])
+    def test_light_imports_skip_heavy_modules(self, imports):
+        """Test that package, utils and CLI imports stay within budget"""
+        elapsed, heavy = _probe(imports)
+        assert heavy == []
+        assert elapsed < IMPORT_BUDGET_SECONDS
+
+    def test_lazy_exports_resolve_on_access(self):
+        """Test that package-level names still resolve"""
+        _, heavy = _probe('import etl; etl.DataGenerationConfig')
+        assert 'pandas' in heavy
+
+    def test_cli_help_is_fast(self):
+        """Test that --help does not import heavy dependencies"""
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', 'run_etl.py', '--help'],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+        assert '--step' in result.stdout
+        imported = {line.split('|')[-1].strip() for line in result.stderr.splitlines()}
+        assert not imported & set(HEAVY_MODULES)
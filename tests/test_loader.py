@@ -0,0 +1,101 @@
+"""
+Tests for the settings-driven warehouse loader
+"""
+
+from dataclasses import replace
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from etl.loader import TableLoader, merge_sql
+from etl.settings import ErrorHandlingSettings, PerformanceSettings, ProcessingSettings
+
+
+class TestTableLoader:
+    """Test that processing settings drive the loader"""
+
+    @pytest.fixture
+    def raw_path(self, tmp_path):
+        pd.DataFrame({'date_key': range(25), 'value': range(25)}).to_csv(
+            tmp_path / "fact_a.csv", index=False
+        )
+        return str(tmp_path)
+
+    def _loader(self, engine, **processing):
+        settings = replace(
+            ProcessingSettings(),
+            error_handling=ErrorHandlingSettings(max_retries=2, retry_delay_seconds=0),
+            performance=PerformanceSettings(use_bulk_loading=True),
+            **processing
+        )
+        return TableLoader(engine, settings)
+
+    def test_copy_in_batches_with_retries(self, raw_path):
+        """Test batch_size chunks are COPYed and a failed chunk is retried"""
+        engine = MagicMock()
+        cursor = engine.raw_connection.return_value.cursor.return_value.__enter__.return_value
+        cursor.copy_expert.side_effect = [RuntimeError("deadlock"), None, None, None]
+
+        chunks = []
+        loaded = self._loader(engine, batch_size=10).load_tables(
+            ['fact_a', 'missing'], raw_path, on_chunk=lambda table, chunk: chunks.append(len(chunk))
+        )
+
+        assert loaded == {'fact_a': 25}
+        assert chunks == [10, 10, 5]
+        assert cursor.copy_expert.call_count == 4
+        assert "COPY ad_dashboard.fact_a (date_key, value)" in cursor.copy_expert.call_args[0][0]
+
+    def test_continue_on_error(self, raw_path):
+        """Test a failing table is skipped only when continue_on_error is set"""
+        engine = MagicMock()
+        cursor = engine.raw_connection.return_value.cursor.return_value.__enter__.return_value
+        cursor.copy_expert.side_effect = RuntimeError("constraint violation")
+
+        with pytest.raises(RuntimeError):
+            self._loader(engine).load_tables(['fact_a'], raw_path)
+
+        loader = self._loader(engine)
+        loader.settings = replace(loader.settings, error_handling=ErrorHandlingSettings(
+            max_retries=0, retry_delay_seconds=0, continue_on_error=True
+        ))
+        assert loader.load_tables(['fact_a'], raw_path, parallel=True) == {'fact_a': 0}
+
+    def test_merge_mode_upserts_through_staging(self, raw_path):
+        """Test merge loads COPY into a staging table and upsert on the natural key"""
+        engine = MagicMock()
+        cursor = engine.raw_connection.return_value.cursor.return_value.__enter__.return_value
+        loader = TableLoader(engine, replace(ProcessingSettings(), batch_size=10), load_mode='merge')
+
+        pd.DataFrame({'date_key': [20240101], 'day_name': ['Monday']}).to_csv(
+            f"{raw_path}/dim_date.csv", index=False
+        )
+        assert loader.load_tables(['dim_date'], raw_path) == {'dim_date': 1}
+
+        # The staging table is a temp table scoped to the chunk's transaction
+        statements = [call[0][0] for call in cursor.execute.call_args_list]
+        assert statements == [
+            "CREATE TEMP TABLE dim_date_staging (LIKE ad_dashboard.dim_date INCLUDING DEFAULTS) ON COMMIT DROP",
+            merge_sql("ad_dashboard.dim_date", "dim_date_staging", ['date_key', 'day_name'], ['date_key']),
+        ]
+        assert "COPY dim_date_staging" in cursor.copy_expert.call_args[0][0]
+        engine.raw_connection.return_value.commit.assert_called_once()
+
+        # Tables without a natural key are refused before anything is staged
+        with pytest.raises(ValueError, match="natural key"):
+            loader.load_tables(['fact_a'], raw_path)
+        assert cursor.execute.call_count == 2
+
+    def test_merge_sql(self):
+        """Test non-key columns are updated, surrogate keys kept and nullable keys coalesced"""
+        sql = merge_sql("s.dim_geo", "s.dim_geo_staging", ['geo_key', 'country_code', 'city', 'region'],
+                        ['country_code', 'city'], preserved=['geo_key'])
+        assert sql == ("INSERT INTO s.dim_geo (geo_key, country_code, city, region) "
+                       "SELECT geo_key, country_code, city, region "
+                       "FROM s.dim_geo_staging ON CONFLICT (country_code, (COALESCE(city, ''))) "
+                       "DO UPDATE SET region = EXCLUDED.region")
+        assert merge_sql("t", "t_staging", ['k', 'a'], ['a'], preserved=['k']).endswith("DO NOTHING")
+        assert merge_sql("t", "t_staging", ['a'], ['a']).endswith("ON CONFLICT (a) DO NOTHING")
+        with pytest.raises(ValueError):
+            merge_sql("t", "t_staging", ['a'], ['b'])
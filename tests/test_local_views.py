@@ -0,0 +1,105 @@
+"""
+Tests for dashboard views computed from local files
+"""
+
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from etl.cohorts import build_customer_retention
+from etl.columnar_store import ColumnarStore, generate_facts_to_store
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.funnel import write_funnel_events
+from etl.local_views import VIEW_COLUMNS, LocalBackend
+from etl.queries import DASHBOARD_VIEWS, DashboardQueries, query_request
+
+
+@pytest.fixture(scope="module")
+def generated(tmp_path_factory):
+    """Raw files and a columnar store for a config spanning three months"""
+    generator = DataGenerator(DataGenerationConfig(
+        start_date="2024-01-20", end_date="2024-03-10",
+        num_campaigns=6, num_users=300, daily_volume_scale="small", seed=3
+    ))
+    dimensions = generator.generate_dimension_data()
+    facts = generator.generate_fact_data()
+
+    raw_path = tmp_path_factory.mktemp("raw")
+    for table, df in {**dimensions, **facts}.items():
+        df.to_csv(raw_path / f"{table}.csv", index=False)
+    write_funnel_events(facts['fact_web_analytics'], str(raw_path / 'fact_funnel_events.csv'), 3)
+    build_customer_retention(dimensions['dim_user'], facts['fact_web_analytics'], facts['fact_conversions']) \
+        .to_csv(raw_path / 'fact_customer_retention.csv', index=False)
+
+    store_path = str(tmp_path_factory.mktemp("store"))
+    generate_facts_to_store(generator, ColumnarStore(store_path))
+    return str(raw_path), store_path, facts
+
+
+class TestLocalViews:
+    """Test local views match the view shapes and prune without changing results"""
+
+    def test_every_view_shape_and_totals(self, generated):
+        """Test each view returns its columns and the campaign views keep the fact totals"""
+        raw_path, _, facts = generated
+        backend = LocalBackend(raw_path)
+        views = {view: backend.query(query_request(view)) for view in DASHBOARD_VIEWS}
+
+        for view, frame in views.items():
+            assert list(frame.columns) == VIEW_COLUMNS[view]
+        assert len(views['v_executive_summary']) == 1
+
+        ad = facts['fact_ad_performance']
+        for view in ['v_daily_campaign_summary', 'v_monthly_campaign_summary']:
+            assert views[view]['total_impressions'].sum() == ad['impressions'].sum()
+            assert views[view]['total_spend'].sum() == pytest.approx(ad['spend'].sum(), abs=0.01 * len(ad))
+        assert views['v_web_analytics_daily']['total_sessions'].sum() == len(facts['fact_web_analytics'])
+
+        # Each acquisition month's cohort size is the number of users acquired in it
+        retention = views['v_cohort_retention']
+        cohorts = retention[retention['period_number'] == 0]
+        assert (cohorts['cohort_size'] == cohorts['active_users']).all()
+        assert (retention.loc[retention['period_number'] > 0, 'cohort_size'] == 0).all()
+
+    def test_pruned_queries_match_filtered_full_views(self, generated):
+        """Test date and partition pruning give the same rows as filtering the full view"""
+        raw_path, store_path, _ = generated
+        csv_backend = LocalBackend(raw_path, chunksize=500)
+        store_backend = LocalBackend(raw_path, store_path)
+        start, end = pd.Timestamp('2024-02-01'), pd.Timestamp('2024-02-20')
+
+        for view, column in [('v_daily_campaign_summary', 'date_value'), ('v_emea_geo_performance', 'month_year'),
+                             ('v_conversion_funnel', 'week_start'), ('agg_campaign_trends', 'date_value')]:
+            full = csv_backend.query(query_request(view))
+            expected = full[(full[column] >= start) & (full[column] <= end)].reset_index(drop=True)
+            pruned = csv_backend.query(query_request(view, start_date=start, end_date=end))
+            pd.testing.assert_frame_equal(pruned.drop(columns='refreshed_at', errors='ignore'),
+                                          expected.drop(columns='refreshed_at', errors='ignore'))
+
+        request = query_request('v_daily_campaign_summary', start_date=start, end_date=end, device_type='Mobile')
+        with patch.object(store_backend.store, 'to_frame', wraps=store_backend.store.to_frame) as to_frame:
+            from_store = store_backend.query(request)
+        assert to_frame.call_args[0][2] == ['202402']
+        assert set(to_frame.call_args[0][1]) == {'date_key', 'campaign_key', 'geo_key', 'device_key',
+                                                 'impressions', 'clicks', 'spend',
+                                                 'attributed_conversions', 'attributed_revenue'}
+        assert (from_store['device_type'] == 'Mobile').all() and len(from_store)
+        pd.testing.assert_frame_equal(from_store, csv_backend.query(request), check_dtype=False)
+
+    def test_cached_until_files_change(self, generated):
+        """Test DashboardQueries serves local results from cache until a raw file changes"""
+        raw_path, _, _ = generated
+        backend = LocalBackend(raw_path)
+        queries = DashboardQueries(backend)
+        with patch.object(backend, 'facts', wraps=backend.facts) as facts:
+            queries.query('v_ab_test_performance')
+            queries.query('v_ab_test_performance')
+            assert facts.call_count == 1
+
+            stat = os.stat(os.path.join(raw_path, 'fact_ad_performance.csv'))
+            os.utime(os.path.join(raw_path, 'fact_ad_performance.csv'),
+                     ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            queries.query('v_ab_test_performance')
+            assert facts.call_count == 2
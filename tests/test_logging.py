@@ -0,0 +1,68 @@
+"""
+Tests for queue-based logging
+"""
+
+import logging
+import logging.handlers
+
+import pytest
+
+from etl import utils
+from etl.settings import load_settings
+from etl.utils import ProgressLogger, setup_logging
+
+
+class TestQueueLogging:
+    """Test idempotent queue logging, rotation settings and rate limiting"""
+
+    def test_repeated_setup_does_not_duplicate_handlers(self, tmp_path):
+        """Test that setup can be called repeatedly and records reach the file once"""
+        log_file = tmp_path / "etl.log"
+        for _ in range(3):
+            setup_logging(level="INFO", log_file=str(log_file), max_bytes=10_000, backup_count=2,
+                          log_format="%(levelname)s | %(message)s")
+
+        root = logging.getLogger()
+        queue_handlers = [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]
+        assert queue_handlers == [utils._queue_handler]
+
+        logging.getLogger("etl.test").info("written once")
+        utils._stop_queue_logging()  # Drains the queue
+
+        assert log_file.read_text().count("INFO | written once") == 1
+
+    def test_file_rotates_by_size(self, tmp_path):
+        """Test that the file handler honours max_bytes and backup_count"""
+        log_file = tmp_path / "etl.log"
+        setup_logging(log_file=str(log_file), max_bytes=2_000, backup_count=2)
+        logger = logging.getLogger("etl.test")
+        for i in range(200):
+            logger.info(f"message {i:04d}")
+        utils._stop_queue_logging()
+
+        files = sorted(p.name for p in tmp_path.iterdir())
+        assert files == ["etl.log", "etl.log.1", "etl.log.2"]
+
+    def test_rotation_settings_from_config(self, tmp_path):
+        """Test rotation settings are read from etl_config.yaml"""
+        logging_settings = load_settings("config/etl_config.yaml").logging
+        assert (logging_settings.max_bytes, logging_settings.backup_count) == (100 * 1024 * 1024, 5)
+
+        config = tmp_path / "etl_config.yaml"
+        config.write_text("logging:\n  file_rotation:\n    max_size_mb: 1\n    backup_count: 3\n")
+        logging_settings = load_settings(str(config)).logging
+        assert (logging_settings.max_bytes, logging_settings.backup_count) == (1024 * 1024, 3)
+        with pytest.raises(FileNotFoundError):
+            load_settings(str(tmp_path / "missing.yaml"))
+
+    def test_progress_logger_is_rate_limited(self, caplog):
+        """Test that tight-loop updates log at most once per interval"""
+        logger = logging.getLogger("etl.progress_test")
+        progress = ProgressLogger("Rows", total=1000, interval_seconds=3600, logger=logger)
+        with caplog.at_level(logging.INFO, logger="etl.progress_test"):
+            for _ in range(1000):
+                progress.update()
+            progress.done()
+
+        assert len(caplog.records) == 1
+        assert "1,000/1,000 (100%)" in caplog.records[0].getMessage()
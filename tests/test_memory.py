@@ -0,0 +1,81 @@
+"""
+Tests for memory-aware chunk sizing
+"""
+
+import pandas as pd
+import pytest
+
+from etl.columnar_store import ColumnarStore, generate_facts_to_store
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.memory import AdaptiveChunker, current_rss_bytes, parse_memory_size
+
+MB = 1024 ** 2
+
+
+class FakeRSS:
+    """Settable RSS reading"""
+
+    def __init__(self, value: int):
+        self.value = value
+
+    def __call__(self) -> int:
+        return self.value
+
+
+class TestAdaptiveChunker:
+    """Test chunk sizes follow row width and memory pressure"""
+
+    def test_parse_memory_size(self):
+        """Test human-readable budgets are parsed"""
+        assert parse_memory_size("512MB") == 512 * MB
+        assert parse_memory_size("2g") == 2 * 1024 * MB
+        assert parse_memory_size("1.5GiB") == int(1.5 * 1024 * MB)
+        assert parse_memory_size("4096") == 4096
+        with pytest.raises(ValueError):
+            parse_memory_size("lots")
+
+        assert current_rss_bytes() > 0
+
+    def test_fixed_size_without_budget(self):
+        """Test the initial size is kept when no budget is given"""
+        chunker = AdaptiveChunker(initial_rows=5000)
+        chunker.observe(5000, 5000 * 200)
+        assert chunker.next_size() == 5000
+
+    def test_grows_with_headroom_and_shrinks_under_pressure(self):
+        """Test sizing reacts to RSS and row width"""
+        rss = FakeRSS(100 * MB)
+        chunker = AdaptiveChunker(1024 * MB, initial_rows=1000, rss_reader=rss)
+        chunker.observe(1000, 1000 * 100)
+
+        sizes = [chunker.next_size() for _ in range(5)]
+        assert sizes == sorted(sizes) and sizes[-1] > 1000  # Grows, at most 2x per step
+        assert all(b <= 2 * a for a, b in zip(sizes, sizes[1:]))
+
+        rss.value = 1100 * MB  # Over budget
+        assert chunker.next_size() == sizes[-1] // 2
+
+        # Wider rows mean fewer rows for the same headroom
+        rss.value = 900 * MB
+        narrow = AdaptiveChunker(1024 * MB, initial_rows=10 ** 6, rss_reader=rss)
+        wide = AdaptiveChunker(1024 * MB, initial_rows=10 ** 6, rss_reader=rss)
+        narrow.observe(100, 100 * 50)
+        wide.observe(100, 100 * 5000)
+        assert wide.next_size() < narrow.next_size()
+
+    def test_chunked_generation_matches_monthly(self, tmp_path):
+        """Test generating a month in day batches stores the same rows"""
+        generator = DataGenerator(DataGenerationConfig(
+            start_date="2024-03-01", end_date="2024-03-20",
+            num_campaigns=10, num_users=100, daily_volume_scale="small"
+        ))
+        generator.generate_dimension_data()
+
+        whole = ColumnarStore(str(tmp_path / "whole"))
+        generate_facts_to_store(generator, whole)
+        batched = ColumnarStore(str(tmp_path / "batched"))
+        generate_facts_to_store(generator, batched,
+                                chunker=AdaptiveChunker(initial_rows=3, min_rows=1))
+
+        for table in whole.tables():
+            pd.testing.assert_frame_equal(batched.to_frame(table), whole.to_frame(table))
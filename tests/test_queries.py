@@ -0,0 +1,111 @@
+"""
+Tests for the cached dashboard query layer
+"""
+
+from datetime import date
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from etl.queries import (
+    DashboardQueries,
+    date_ranges,
+    query_request,
+    record_load_generation,
+    view_sql,
+)
+
+
+def _backend(generations=None):
+    """Backend returning a fresh frame per query and the given generation rows"""
+    backend = MagicMock()
+    backend.query.side_effect = lambda request: pd.DataFrame({'view': [request.view]})
+    backend.load_generations.side_effect = lambda since: [g for g in (generations or []) if g[0] > since]
+    return backend
+
+
+class TestDashboardQueries:
+    """Test caching, generation-based invalidation and query building"""
+
+    def test_loads_invalidate_only_overlapping_results(self):
+        """Test a load drops cached results covering its dates and keeps the rest"""
+        generations = [(1, None, None)]
+        backend = _backend(generations)
+        queries = DashboardQueries(backend)
+
+        january = dict(start_date='2024-01-01', end_date='2024-01-31')
+        queries.query('v_daily_campaign_summary', **january)
+        queries.query('v_daily_campaign_summary', **january, country='Germany')
+        queries.query('v_monthly_campaign_summary', start_date='2024-02-01', end_date='2024-02-01')
+        queries.query('v_ab_test_performance')
+        assert backend.query.call_count == 4
+        queries.query('v_daily_campaign_summary', **january)
+        assert (queries.hits, queries.misses) == (1, 4)
+
+        # A late-February load reaches the February month row but not January's daily rows
+        generations.append((2, 20240220, 20240222))
+        queries.query('v_daily_campaign_summary', **january)
+        queries.query('v_daily_campaign_summary', **january, country='Germany')
+        queries.query('v_monthly_campaign_summary', start_date='2024-02-01', end_date='2024-02-01')
+        queries.query('v_ab_test_performance')
+        assert backend.query.call_count == 6
+        assert [call.args[0].view for call in backend.query.call_args_list[4:]] == [
+            'v_monthly_campaign_summary', 'v_ab_test_performance']
+
+    def test_disk_cache_shared_and_lru_bounded(self, tmp_path):
+        """Test results survive across instances on disk and memory holds max_entries"""
+        generations = [(1, 20240101, 20240131)]
+        first = DashboardQueries(_backend(generations), max_entries=1, cache_dir=str(tmp_path))
+        first.query('v_conversion_funnel', start_date='2024-01-01', end_date='2024-01-29')
+        first.query('v_executive_summary')
+        assert len(first._entries) == 1 and len(list(tmp_path.glob('*.pkl'))) == 2
+
+        second_backend = _backend(generations)
+        second = DashboardQueries(second_backend, cache_dir=str(tmp_path))
+        funnel = second.query('v_conversion_funnel', start_date='2024-01-01', end_date='2024-01-29')
+        assert funnel['view'].tolist() == ['v_conversion_funnel']
+        assert second_backend.query.call_count == 0
+
+        # The week starting Jan 29 runs into February, so a Feb 3 load makes it stale
+        generations.append((2, 20240203, 20240203))
+        third = DashboardQueries(_backend(generations), cache_dir=str(tmp_path))
+        third.query('v_conversion_funnel', start_date='2024-01-01', end_date='2024-01-29')
+        assert third.misses == 1
+
+    def test_view_sql_and_validation(self):
+        """Test filters become bound parameters and unknown views or columns are rejected"""
+        request = query_request('v_emea_geo_performance', start_date=date(2024, 3, 1),
+                                end_date='2024-03-31', country=['France', 'Spain'])
+        sql, params = view_sql(request)
+        assert "FROM ad_dashboard.v_emea_geo_performance" in sql
+        assert "month_year >= %(start_date)s AND month_year <= %(end_date)s" in sql
+        assert "country = ANY(%(country)s)" in sql
+        assert params == {'start_date': date(2024, 3, 1), 'end_date': date(2024, 3, 31),
+                          'country': ['France', 'Spain']}
+        assert request.date_key_range() == (20240301, 20240331)
+        assert query_request('v_emea_geo_performance', country='Spain').key != request.key
+
+        with pytest.raises(ValueError):
+            query_request('fact_ad_performance')
+        with pytest.raises(ValueError):
+            query_request('v_daily_campaign_summary', spend=1)
+        with pytest.raises(ValueError):
+            query_request('v_cohort_retention', start_date='2024-01-01')
+
+    def test_record_load_generation(self):
+        """Test a load records one generation with its runs of consecutive dates"""
+        assert date_ranges([20240229, 20240301, 20240302, 20240305, 20231231, 20240101]) == [
+            (20231231, 20240101), (20240229, 20240302), (20240305, 20240305)]
+
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (7,)
+        assert record_load_generation(conn, {20240102, 20240101}) == 7
+        assert cursor.execute.call_args[0][1] == {'starts': [20240101], 'ends': [20240102]}
+        conn.commit.assert_called_once()
+
+        record_load_generation(conn, [])
+        assert cursor.execute.call_args[0][1] == {'starts': [None], 'ends': [None]}
+        record_load_generation(conn, {20240101}, all_dates=True)
+        assert cursor.execute.call_args[0][1] == {'starts': [None], 'ends': [None]}
@@ -0,0 +1,117 @@
+"""
+Tests for partition-fingerprint reconciliation
+"""
+
+import hashlib
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from etl.reconcile import (
+    RECONCILE_TABLES,
+    batch_partitions,
+    compare_fingerprints,
+    fingerprint_csv,
+    fingerprint_frame,
+    key_hashes,
+    partitions_to_reload,
+    reconcile,
+)
+
+
+def _ad_rows():
+    """Ad performance rows spread over four months"""
+    dates = pd.date_range('2024-01-01', '2024-04-30', freq='D')
+    return pd.DataFrame({
+        'date_key': dates.strftime('%Y%m%d').astype(int),
+        'campaign_key': [f"c{i % 7}" for i in range(len(dates))],
+        'geo_key': 'g1',
+        'impressions': range(100, 100 + len(dates)),
+        'clicks': 5,
+        'spend': 12.34,
+        'attributed_conversions': 1,
+        'attributed_revenue': 50.5,
+    })
+
+
+def _warehouse(frames):
+    """Connection whose cursor returns warehouse fingerprint rows for each table in turn"""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.side_effect = [
+        [(partition, *row) for partition, row in zip(fp.index, fp.itertuples(index=False))]
+        for fp in frames
+    ]
+    return conn, cursor
+
+
+class TestReconcile:
+    """Test fingerprints catch altered partitions and nothing else"""
+
+    def test_key_hash_matches_sql_definition(self):
+        """Test the hash is the first 60 bits of md5 over '|'-joined keys"""
+        df = pd.DataFrame({'date_key': [20240101], 'campaign_key': ['abc']})
+        expected = int(hashlib.md5(b'20240101|abc').hexdigest()[:15], 16)
+        assert int(key_hashes(df, ['date_key', 'campaign_key'])[0]) == expected
+
+    def test_flags_only_tampered_partitions(self, tmp_path):
+        """Test dropped, duplicated and altered rows flag just their months"""
+        spec = RECONCILE_TABLES['fact_ad_performance']
+        source = _ad_rows()
+        source.to_csv(tmp_path / 'fact_ad_performance.csv', index=False)
+
+        warehouse = source.copy()
+        warehouse = warehouse.drop(index=40)                                  # February row lost
+        warehouse = pd.concat([warehouse, warehouse[warehouse['date_key'] == 20240315]])  # March duplicate
+        warehouse.loc[warehouse['date_key'] == 20240410, 'spend'] = 12.35     # April value changed
+
+        conn, cursor = _warehouse([fingerprint_frame(warehouse, spec, 'day')])
+        report = reconcile(str(tmp_path), conn, tables=['fact_ad_performance'])
+
+        status = dict(zip(report['partition'], report['status']))
+        assert status == {202401: 'match', 202402: 'mismatch', 202403: 'mismatch', 202404: 'mismatch'}
+        fields = dict(zip(report['partition'], report['differing_fields']))
+        assert fields[202404] == 'spend'
+        assert 'key_hash' in fields[202402] and 'row_count' in fields[202403]
+        assert partitions_to_reload(report) == {'fact_ad_performance': [202402, 202403, 202404]}
+        assert "GROUP BY 1" in cursor.execute.call_args[0][0]
+
+    def test_csv_chunks_and_missing_partitions(self, tmp_path):
+        """Test chunked CSV fingerprints equal in-memory ones and unloaded months are flagged"""
+        spec = RECONCILE_TABLES['fact_ad_performance']
+        source = _ad_rows()
+        source.to_csv(tmp_path / 'fact_ad_performance.csv', index=False)
+
+        in_memory = fingerprint_frame(source, spec, granularity='day')
+        pd.testing.assert_frame_equal(
+            fingerprint_csv(str(tmp_path / 'fact_ad_performance.csv'), spec, 'day', chunksize=17), in_memory
+        )
+
+        report = compare_fingerprints(fingerprint_frame(source, spec),
+                                      fingerprint_frame(source[source['date_key'] < 20240301], spec))
+        assert list(report['status']) == ['match', 'match', 'missing_in_warehouse', 'missing_in_warehouse']
+        assert pd.isna(report['warehouse_rows'].iloc[-1])
+
+    def test_partial_months_of_a_batch_compare_by_day(self, tmp_path):
+        """Test a batch ending mid-month matches a cumulative warehouse and flags only its days"""
+        spec = RECONCILE_TABLES['fact_ad_performance']
+        rows = _ad_rows()
+        batch = rows[(rows['date_key'] >= 20240201) & (rows['date_key'] <= 20240310)]
+        batch.to_csv(tmp_path / 'fact_ad_performance.csv', index=False)
+
+        # The cumulative warehouse holds January to April; the query keeps the batch's dates
+        warehouse = rows.copy()
+        warehouse.loc[warehouse['date_key'] == 20240305, 'clicks'] = 6
+        in_range = warehouse[warehouse['date_key'].between(20240201, 20240310)]
+        conn, cursor = _warehouse([fingerprint_frame(in_range, spec, 'day')])
+        report = reconcile(str(tmp_path), conn, tables=['fact_ad_performance'])
+
+        assert cursor.execute.call_args[0][1] == {'first_date_key': 20240201, 'last_date_key': 20240310}
+        assert "BETWEEN %(first_date_key)s AND %(last_date_key)s" in cursor.execute.call_args[0][0]
+        assert list(report['partition']) == [202402, *range(20240301, 20240311)]
+        assert partitions_to_reload(report) == {'fact_ad_performance': [20240305]}
+
+        daily = fingerprint_frame(batch, spec, 'day')
+        assert list(batch_partitions(daily, 'day', (20240201, 20240310)).index) == list(daily.index)
+        february = daily[daily.index <= 20240229]
+        assert list(batch_partitions(february, 'month', (20240201, 20240229)).index) == [202402]
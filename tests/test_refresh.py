@@ -0,0 +1,82 @@
+"""
+Tests for incremental rollup refresh
+"""
+
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock
+
+from etl.refresh import (
+    AffectedGroups,
+    build_campaign_trends_refresh,
+    build_monthly_campaign_refresh,
+    refresh_campaign_trends,
+    refresh_monthly_campaign,
+)
+
+
+class TestIncrementalRefresh:
+    """Test delta refresh of agg_campaign_trends and agg_monthly_campaign"""
+
+    @pytest.fixture
+    def conn(self):
+        """Mock psycopg2 connection capturing executed statements"""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.rowcount = 4
+        return conn
+
+    def test_affected_groups_collects_batch_keys(self):
+        """Test that only keys present in loaded chunks are collected"""
+        affected = AffectedGroups()
+        assert not affected
+
+        affected.add(pd.DataFrame({'date_key': [20240101, 20240102], 'campaign_key': ['a', 'b']}))
+        affected.add(pd.DataFrame({'date_key': [20240102] * 2, 'campaign_key': ['c', 'c'],
+                                   'ab_test_id': ['test_003', None]}))
+
+        assert affected
+        assert affected.date_keys == {20240101, 20240102}
+        assert affected.campaign_keys == {'a', 'b', 'c'}
+        assert affected.ab_test_ids == {'test_003'}
+
+    def test_refresh_is_scoped_to_affected_groups(self, conn):
+        """Test that the upsert filters on the batch's dates and campaigns"""
+        upserted = refresh_campaign_trends(conn, {20240102, 20240101}, {'b', 'a'})
+
+        cursor = conn.cursor.return_value.__enter__.return_value
+        sql, params = cursor.execute.call_args[0]
+
+        assert upserted == 4
+        assert 'ON CONFLICT' in sql
+        assert 'f.date_key = ANY(%(date_keys)s)' in sql
+        assert params == {'date_keys': [20240101, 20240102], 'campaign_keys': ['a', 'b']}
+        conn.commit.assert_called_once()
+
+    def test_empty_batch_skips_refresh(self, conn):
+        """Test that a batch with no dates does not touch the database"""
+        assert refresh_campaign_trends(conn, [], []) == 0
+        conn.cursor.assert_not_called()
+
+    def test_full_rebuild_has_no_filter(self):
+        """Test that omitting keys rebuilds every group"""
+        sql, params = build_campaign_trends_refresh()
+        assert 'WHERE' not in sql
+        assert params == {}
+
+    def test_monthly_refresh_recomputes_whole_months(self, conn):
+        """Test a partial-month batch recomputes its months from every fact row of the month"""
+        upserted = refresh_monthly_campaign(conn, {20240131, 20240301, 20240302}, {'b', 'a'})
+
+        cursor = conn.cursor.return_value.__enter__.return_value
+        sql, params = cursor.execute.call_args[0]
+
+        assert upserted == 4
+        assert 'ON CONFLICT (year, month, campaign_key) DO UPDATE' in sql
+        assert 'f.date_key / 100 = ANY(%(months)s)' in sql
+        assert params == {'first_date_key': 20240101, 'last_date_key': 20240331,
+                          'months': [202401, 202403], 'campaign_keys': ['a', 'b']}
+        conn.commit.assert_called_once()
+
+        assert refresh_monthly_campaign(conn, [], []) == 0
+        assert 'WHERE' not in build_monthly_campaign_refresh()[0]
@@ -0,0 +1,87 @@
+"""
+Tests for the stratified dataset sampler
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.funnel import write_funnel_events
+from etl.sampling import DIMENSION_KEYS, BottomKSampler, sample_dataset
+
+
+@pytest.fixture(scope="module")
+def raw_path(tmp_path_factory):
+    """Generated raw files for a small one-month config"""
+    generator = DataGenerator(DataGenerationConfig(
+        start_date="2024-01-01", end_date="2024-01-31",
+        num_campaigns=8, num_users=300, daily_volume_scale="small", seed=5
+    ))
+    dimensions = generator.generate_dimension_data()
+    facts = generator.generate_fact_data()
+    # Link some conversions to sessions, as attribution does
+    sessions = facts['fact_web_analytics']['session_id']
+    conversions = facts['fact_conversions']
+    conversions['session_id'] = np.where(np.arange(len(conversions)) % 2 == 0,
+                                         sessions.to_numpy()[:len(conversions)], None)
+
+    path = tmp_path_factory.mktemp("raw")
+    for table, df in {**dimensions, **facts}.items():
+        df.to_csv(path / f"{table}.csv", index=False)
+    write_funnel_events(facts['fact_web_analytics'], str(path / 'fact_funnel_events.csv'), 5)
+    return path
+
+
+class TestSampling:
+    """Test bottom-k stratified sampling and referential integrity of the sample"""
+
+    def test_bottom_k_matches_in_memory_selection(self):
+        """Test streaming chunks keeps exactly the k lowest priorities per stratum"""
+        rng = np.random.default_rng(0)
+        frame = pd.DataFrame({'value': np.arange(10_000)})
+        strata = rng.integers(0, 300, len(frame)).astype(np.uint64)
+        priorities = rng.random(len(frame))
+
+        sampler = BottomKSampler(4)
+        for start in range(0, len(frame), 777):
+            stop = start + 777
+            sampler.add(frame.iloc[start:stop], strata[start:stop], priorities[start:stop])
+
+        expected = pd.DataFrame({'stratum': strata, 'priority': priorities}) \
+            .sort_values('priority').groupby('stratum').head(4).index
+        assert sampler.result()['value'].tolist() == sorted(expected)
+
+    def test_sample_is_small_complete_and_chunk_independent(self, raw_path, tmp_path):
+        """Test every stratum is represented, capped at k, and chunk size does not matter"""
+        written = sample_dataset(str(raw_path), str(tmp_path / 'a'), rows_per_stratum=2, seed=9, chunksize=3_000)
+        sample_dataset(str(raw_path), str(tmp_path / 'b'), rows_per_stratum=2, seed=9, chunksize=1_000_000)
+        for table in written:
+            pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'a' / f"{table}.csv"),
+                                          pd.read_csv(tmp_path / 'b' / f"{table}.csv"))
+
+        geo = pd.read_csv(raw_path / 'dim_geo.csv').set_index('geo_key')['country']
+        full = pd.read_csv(raw_path / 'fact_web_analytics.csv')
+        sample = pd.read_csv(tmp_path / 'a' / 'fact_web_analytics.csv')
+
+        def strata(df):
+            return df.groupby([df['date_key'], df['campaign_key'].fillna(''), df['geo_key'].map(geo)]).size()
+
+        assert strata(sample).max() == 2
+        assert strata(sample).index.equals(strata(full).index)
+        assert len(sample) < len(full) / 3
+
+    def test_sample_is_referentially_intact(self, raw_path, tmp_path):
+        """Test child rows follow sampled sessions and dimensions hold only referenced keys"""
+        sample_dataset(str(raw_path), str(tmp_path), rows_per_stratum=1, seed=1)
+        tables = {path.stem: pd.read_csv(path) for path in tmp_path.glob('*.csv')}
+        sessions = set(tables['fact_web_analytics']['session_id'])
+
+        assert set(tables['fact_funnel_events']['session_id']) == sessions
+        linked = tables['fact_conversions']['session_id'].dropna()
+        assert len(linked) and linked.isin(sessions).all()
+
+        for dimension, key in DIMENSION_KEYS.items():
+            referenced = set().union(*(set(df[key].dropna()) for name, df in tables.items()
+                                       if name.startswith('fact_') and key in df.columns))
+            assert set(tables[dimension][key]) == referenced
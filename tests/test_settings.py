@@ -0,0 +1,72 @@
+"""
+Tests for typed settings
+"""
+
+import pytest
+
+from etl.settings import (
+    build_settings,
+    deep_merge,
+    generation_config,
+    load_settings,
+)
+
+CONFIG_PATH = "config/etl_config.yaml"
+
+
+class TestSettings:
+    """Test loading, environment overrides and validation"""
+
+    def test_base_and_environment_overrides(self):
+        """Test the production profile and development volume take effect"""
+        base = load_settings(CONFIG_PATH)
+        assert base.processing.batch_size == 10000
+        assert base.processing.parallel_workers == 4
+        assert base.logging.max_bytes == 100 * 1024 * 1024
+
+        production = load_settings(CONFIG_PATH, "production")
+        assert production.processing.batch_size == 50000
+        assert production.processing.parallel_workers == 8
+        assert production.processing.validation == base.processing.validation
+
+        development = load_settings(CONFIG_PATH, "development")
+        config = generation_config(development, seed=7)
+        assert (config.daily_volume_scale, config.num_campaigns, config.num_users) == ("small", 10, 1000)
+        assert config.seed == 7
+        assert config.emea_countries[0] == "United Kingdom"
+
+        assert load_settings(CONFIG_PATH) is base  # Parsed once
+
+        with pytest.raises(ValueError, match="Unknown environment"):
+            load_settings(CONFIG_PATH, "staging")
+
+    def test_missing_files(self, tmp_path, monkeypatch):
+        """Test only a missing default file falls back to defaults"""
+        monkeypatch.delenv('ETL_CONFIG_PATH', raising=False)
+        monkeypatch.chdir(tmp_path)
+        assert load_settings().processing == build_settings({}).processing
+
+        with pytest.raises(FileNotFoundError):
+            load_settings("missing.yaml")
+        monkeypatch.setenv('ETL_CONFIG_PATH', "missing.yaml")
+        with pytest.raises(FileNotFoundError):
+            load_settings()
+
+    def test_deep_merge(self):
+        """Test nested overrides keep sibling keys"""
+        merged = deep_merge({'a': {'b': 1, 'c': 2}, 'd': 3}, {'a': {'b': 5}})
+        assert merged == {'a': {'b': 5, 'c': 2}, 'd': 3}
+
+    @pytest.mark.parametrize('raw', [
+        {'processing': {'batch_size': 0}},
+        {'processing': {'validation': {'null_threshold': 1.5}}},
+        {'processing': {'performance': {'use_bulk_loading': 'yes'}}},
+        {'processing': {'error_handling': {'max_retry': 3}}},
+        {'processing': {'load_mode': 'upsert'}},
+        {'data_generation': {'volume': {'scale': 'huge'}}},
+        {'data_generation': {'date_range': {'start_date': '2024-02-01', 'end_date': '2024-01-01'}}},
+    ])
+    def test_invalid_values_are_rejected(self, raw):
+        """Test validation errors name the offending setting"""
+        with pytest.raises(ValueError):
+            build_settings(raw)
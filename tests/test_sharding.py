@@ -0,0 +1,121 @@
+"""
+Tests for shard-aware generation
+"""
+
+import pandas as pd
+import pytest
+
+from etl.columnar_store import ColumnarStore, generate_facts_to_store
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.sharding import (
+    build_shard_manifest,
+    build_store_shard_manifest,
+    combine_shard_files,
+    merge_shard_manifests,
+    parse_shard,
+    verify_against_single_node,
+)
+
+SHARD_COUNT = 3
+
+
+def _config(**overrides) -> DataGenerationConfig:
+    """Small config spanning five months"""
+    return DataGenerationConfig(**{
+        'start_date': "2024-01-20",
+        'end_date': "2024-05-10",
+        'num_campaigns': 10,
+        'num_users': 100,
+        'daily_volume_scale': "small",
+        'seed': 11,
+        **overrides
+    })
+
+
+def _generate(config):
+    generator = DataGenerator(config)
+    dimensions = generator.generate_dimension_data()
+    return dimensions, generator.generate_fact_data()
+
+
+@pytest.fixture(scope="module")
+def shards():
+    """Manifests and facts for every shard of the test dataset"""
+    outputs = []
+    for index in range(SHARD_COUNT):
+        config = _config(shard_index=index, shard_count=SHARD_COUNT)
+        dimensions, facts = _generate(config)
+        outputs.append((build_shard_manifest(config, dimensions, facts), facts))
+    return outputs
+
+
+class TestSharding:
+    """Test disjoint shards and manifest verification"""
+
+    def test_parse_shard(self):
+        """Test shard specs are parsed and validated"""
+        assert parse_shard("2/4") == (2, 4)
+        for bad in ["4/4", "-1/2", "1", "a/b"]:
+            with pytest.raises(ValueError):
+                parse_shard(bad)
+        with pytest.raises(ValueError):
+            _config(shard_index=3, shard_count=3)
+
+    def test_shards_are_disjoint_months(self, shards):
+        """Test each month belongs to exactly one shard"""
+        months = [
+            set(facts['fact_ad_performance']['date_key'] // 100)
+            for _, facts in shards
+        ]
+        assert sum(len(m) for m in months) == len(set().union(*months)) == 5
+
+    def test_union_matches_single_node(self, shards):
+        """Test merged shard fingerprints equal a single-node run"""
+        merged = merge_shard_manifests(manifest for manifest, _ in shards)
+        assert verify_against_single_node(merged, _config()) == []
+
+        _, single_facts = _generate(_config())
+        union = pd.concat([facts['fact_web_analytics'] for _, facts in shards])
+        assert len(union) == len(single_facts['fact_web_analytics'])
+
+    def test_merge_rejects_incomplete_or_mismatched_shards(self, shards):
+        """Test missing shards and different configs are detected"""
+        manifests = [manifest for manifest, _ in shards]
+        with pytest.raises(ValueError, match="exactly once"):
+            merge_shard_manifests(manifests[:-1])
+
+        other = build_shard_manifest(_config(seed=12, shard_index=2, shard_count=SHARD_COUNT), {}, {})
+        with pytest.raises(ValueError, match="different configurations"):
+            merge_shard_manifests(manifests[:-1] + [other])
+
+    def test_store_manifest_matches_in_memory(self, shards, tmp_path):
+        """Test a shard generated into the columnar store fingerprints the same"""
+        config = _config(shard_index=1, shard_count=SHARD_COUNT)
+        generator = DataGenerator(config)
+        dimensions = generator.generate_dimension_data()
+        store = ColumnarStore(str(tmp_path))
+        generate_facts_to_store(generator, store)
+
+        assert build_store_shard_manifest(config, dimensions, store) == shards[1][0]
+
+    def test_combine_shard_files(self, shards, tmp_path):
+        """Test shard files combine into one copy of each dimension and the union of the facts"""
+        directories = []
+        for index, (_, facts) in enumerate(shards):
+            directory = tmp_path / f"shard{index}"
+            directory.mkdir()
+            pd.DataFrame({'geo_key': ['g1', 'g2']}).to_csv(directory / "dim_geo.csv", index=False)
+            facts['fact_web_analytics'].to_csv(directory / "fact_web_analytics.csv", index=False)
+            directories.append(str(directory))
+        (tmp_path / "shard1" / "fact_web_analytics.csv").unlink()
+        shards[1][1]['fact_web_analytics'].to_csv(tmp_path / "shard1" / "fact_web_analytics.csv.gz", index=False)
+
+        combined = tmp_path / "combined"
+        assert combine_shard_files(directories, str(combined), ['dim_geo'], 'gzip') == ['dim_geo', 'fact_web_analytics']
+        assert len(pd.read_csv(combined / "dim_geo.csv.gz")) == 2
+        union = pd.read_csv(combined / "fact_web_analytics.csv.gz")
+        assert len(union) == sum(len(facts['fact_web_analytics']) for _, facts in shards)
+        assert list(union.columns) == list(shards[0][1]['fact_web_analytics'].columns)
+
+        with pytest.raises(ValueError, match="other than the shards"):
+            combine_shard_files(directories, directories[0], ['dim_geo'])
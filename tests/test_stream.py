@@ -0,0 +1,97 @@
+"""
+Tests for the event stream simulator
+"""
+
+import socket
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.stream import (
+    FileSink,
+    SocketSink,
+    TokenBucket,
+    aggregate_events,
+    daily_totals,
+    day_events,
+    stream_events,
+)
+
+
+@pytest.fixture(scope="module")
+def generator():
+    """Small generator with dimensions"""
+    generator = DataGenerator(DataGenerationConfig(
+        start_date="2024-01-05", end_date="2024-01-07",
+        num_campaigns=10, num_users=200, daily_volume_scale="small", seed=5
+    ))
+    generator.generate_dimension_data()
+    return generator
+
+
+class TestEventStream:
+    """Test ordering, aggregation and delivery of streamed events"""
+
+    def test_events_are_timestamp_ordered(self, generator):
+        """Test a day's events come out sorted, one hourly slice at a time, and cover every event type"""
+        slices = list(day_events(generator, pd.Timestamp("2024-01-06")))
+        assert len(slices) == 24
+        for hour, (lines, timestamps) in enumerate(slices):
+            assert len(lines) == len(timestamps)
+            assert (timestamps.astype('datetime64[h]') == np.datetime64('2024-01-06T00', 'h') + hour).all()
+        lines = np.concatenate([lines for lines, _ in slices])
+        timestamps = np.concatenate([timestamps for _, timestamps in slices])
+        assert (timestamps[1:] >= timestamps[:-1]).all()
+        kinds = {line.split('"', 4)[3] for line in lines}
+        assert kinds == {'impression', 'click', 'session', 'conversion'}
+
+    def test_events_aggregate_to_daily_fact_totals(self, generator, tmp_path):
+        """Test NDJSON events sum back to the batch generator's daily totals"""
+        path = str(tmp_path / "events.ndjson")
+        stats = stream_events(generator, FileSink(path), batch_events=5000, max_queued_batches=2)
+
+        expected = daily_totals(generator.generate_fact_data())
+        actual = aggregate_events(path)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        assert stats['events'] == expected[['impressions', 'clicks', 'sessions', 'conversions']].sum().sum()
+
+    def test_socket_sink_with_backpressure(self, generator, tmp_path):
+        """Test a slow unix socket reader still receives every event"""
+        path = str(tmp_path / "events.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        received = []
+
+        def read_slowly():
+            conn, _ = server.accept()
+            while True:
+                data = conn.recv(1 << 16)
+                if not data:
+                    break
+                received.append(data)
+                time.sleep(0.0005)
+            conn.close()
+
+        reader = threading.Thread(target=read_slowly)
+        reader.start()
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(path)
+        stats = stream_events(generator, SocketSink(client), dates=generator.date_range[:1],
+                              batch_events=2000, max_queued_batches=1)
+        reader.join()
+        server.close()
+
+        assert b''.join(received).count(b'\n') == stats['events']
+
+    def test_token_bucket_limits_rate(self):
+        """Test the limiter paces consumption to the configured rate"""
+        bucket = TokenBucket(rate=20_000, burst=1000)
+        start = time.monotonic()
+        for _ in range(10):
+            bucket.consume(1000)
+        assert time.monotonic() - start >= 0.4  # 10k events at 20k/s, minus the initial burst
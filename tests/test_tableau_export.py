@@ -0,0 +1,68 @@
+"""
+Tests for the Tableau extract exporter
+"""
+
+import os
+
+import pytest
+import pandas as pd
+
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.tableau_export import export_tableau_extracts
+
+REPO_EXTRACTS = os.path.join(os.path.dirname(__file__), '..', 'tableau_data')
+
+
+@pytest.fixture(scope="module")
+def dimensions():
+    """Small generated dimension set"""
+    config = DataGenerationConfig(
+        start_date="2024-01-01",
+        end_date="2024-01-31",
+        num_campaigns=5,
+        num_users=100,
+        seed=42
+    )
+    return DataGenerator(config).generate_dimension_data()
+
+
+class TestTableauExport:
+    """Test extract generation and change detection"""
+
+    def test_extract_layout_matches_committed_files(self, dimensions, tmp_path):
+        """Test that exported headers match the committed tableau_data extracts"""
+        export_tableau_extracts(dimensions, output_dir=str(tmp_path))
+
+        for filename in ['campaigns.csv', 'geography.csv', 'dates.csv',
+                         'campaign_geography_combined.csv']:
+            expected = pd.read_csv(os.path.join(REPO_EXTRACTS, filename), nrows=0).columns
+            exported = pd.read_csv(tmp_path / filename, nrows=0).columns
+            assert list(exported) == list(expected)
+
+    def test_combined_is_campaign_geo_cross_join(self, dimensions, tmp_path):
+        """Test that chunked streaming produces the full cross join"""
+        export_tableau_extracts(dimensions, output_dir=str(tmp_path), chunk_rows=10)
+        combined = pd.read_csv(tmp_path / 'campaign_geography_combined.csv')
+
+        assert len(combined) == len(dimensions['dim_campaign']) * len(dimensions['dim_geo'])
+        assert (combined['campaign_count'] == 1).all()
+        assert combined['quarter'].str.match(r'^Q[1-4]$').all()
+
+        dates = pd.read_csv(tmp_path / 'dates.csv')
+        assert set(dates['is_weekend']) <= {'t', 'f'}
+
+    def test_unchanged_inputs_are_skipped(self, dimensions, tmp_path):
+        """Test that only extracts with changed inputs are rewritten"""
+        first = export_tableau_extracts(dimensions, output_dir=str(tmp_path))
+        assert set(first.values()) == {'written'}
+
+        second = export_tableau_extracts(dimensions, output_dir=str(tmp_path))
+        assert set(second.values()) == {'skipped'}
+
+        changed = dict(dimensions)
+        changed['dim_campaign'] = dimensions['dim_campaign'].assign(budget=1.0)
+        third = export_tableau_extracts(changed, output_dir=str(tmp_path))
+        assert third['campaigns.csv'] == 'written'
+        assert third['campaign_geography_combined.csv'] == 'written'
+        assert third['geography.csv'] == 'skipped'
+        assert third['dates.csv'] == 'skipped'
@@ -0,0 +1,99 @@
+"""
+Tests for workload profiles (hot keys, burst days, growth)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.data_generator import DataGenerator, DataGenerationConfig
+from etl.workload import WorkloadProfile, day_multipliers, launch_multipliers, zipf_popularity
+
+
+def _facts(workload, **overrides):
+    """Dimensions and facts for a small six-month config"""
+    generator = DataGenerator(DataGenerationConfig(**{
+        'start_date': "2024-01-01",
+        'end_date': "2024-06-30",
+        'num_campaigns': 40,
+        'num_users': 200,
+        'daily_volume_scale': "small",
+        'seed': 3,
+        'workload': workload,
+        **overrides
+    }))
+    dimensions = generator.generate_dimension_data()
+    return generator, dimensions, generator.generate_fact_data()
+
+
+def _top_share(values: pd.Series, n: int) -> float:
+    return values.sort_values(ascending=False).head(n).sum() / values.sum()
+
+
+class TestWorkloadProfiles:
+    """Test profiles skew volume while staying deterministic"""
+
+    def test_zipf_popularity(self):
+        """Test Zipf weights sum to 1, volumes average 1 and zero exponent is uniform"""
+        weights, volume = zipf_popularity(50, 1.5, np.random.default_rng(0))
+        assert weights.sum() == pytest.approx(1.0)
+        assert volume.mean() == pytest.approx(1.0)
+        assert weights.max() / weights.min() == pytest.approx(50 ** 1.5)
+
+        weights, volume = zipf_popularity(7, 0.0, np.random.default_rng(0))
+        assert np.all(weights == 1 / 7) and np.all(volume == 1.0)
+
+    def test_day_and_launch_multipliers(self):
+        """Test growth compounds yearly and bursts depend only on the date"""
+        dates = pd.date_range("2024-01-01", "2025-12-31")
+        date_keys = dates.strftime('%Y%m%d').astype(int).to_numpy()
+        elapsed = (dates - dates[0]).days.to_numpy()
+
+        growth = day_multipliers(WorkloadProfile(annual_growth=1.0), date_keys, elapsed, seed=1)
+        assert growth[0] == 1.0 and growth[365] == pytest.approx(2.0)
+
+        bursty = WorkloadProfile(burst_probability=0.1, burst_multiplier=4.0)
+        full = day_multipliers(bursty, date_keys, elapsed, seed=1)
+        assert set(np.unique(full)) == {1.0, 4.0}
+        assert 0.05 < (full == 4.0).mean() < 0.15
+        np.testing.assert_array_equal(day_multipliers(bursty, date_keys[100:], elapsed[100:], seed=1), full[100:])
+
+        spikes = launch_multipliers(WorkloadProfile(launch_multiplier=3.0, launch_days=4), np.array([-1, 0, 2, 4, 9]))
+        np.testing.assert_allclose(spikes, [1.0, 3.0, 2.0, 1.0, 1.0])
+
+    def test_skewed_profile_concentrates_volume(self):
+        """Test hot campaigns and geos dominate volume and busy days stand out"""
+        _, _, uniform = _facts('uniform')
+        _, _, skewed = _facts('skewed')
+
+        def shares(facts):
+            ad = facts['fact_ad_performance']
+            sessions = facts['fact_web_analytics'].groupby('date_key').size()
+            return (_top_share(ad.groupby('campaign_key')['impressions'].sum(), 3),
+                    _top_share(ad.groupby('geo_key')['impressions'].sum(), 1),
+                    sessions.max() / sessions.median())
+
+        uniform_campaigns, uniform_geos, uniform_peak = shares(uniform)
+        skewed_campaigns, skewed_geos, skewed_peak = shares(skewed)
+        assert skewed_campaigns > 3 * uniform_campaigns
+        assert skewed_geos > 3 * uniform_geos
+        assert skewed_peak > uniform_peak
+
+    def test_profiles_keep_date_subsets_reproducible(self):
+        """Test a skewed subset of dates reproduces the full run's rows for those dates"""
+        generator, _, facts = _facts('hot_keys', end_date="2024-02-29")
+        dates = pd.DatetimeIndex(generator.date_range[40:50])
+        subset = generator.generate_fact_data(dates)
+        date_keys = set(dates.strftime('%Y%m%d').astype(int))
+
+        for table, df in subset.items():
+            expected = facts[table][facts[table]['date_key'].isin(date_keys)].reset_index(drop=True)
+            pd.testing.assert_frame_equal(df.reset_index(drop=True), expected)
+
+    def test_unknown_workload_rejected(self):
+        """Test invalid profiles fail at configuration time"""
+        with pytest.raises(ValueError, match="Unknown workload"):
+            DataGenerationConfig(workload='viral')
+        with pytest.raises(ValueError):
+            WorkloadProfile(burst_probability=1.5)
+        assert DataGenerationConfig(workload='skewed').workload.campaign_zipf > 0